@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AccountBookConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'account_book'
+
+    def ready(self):
+        from . import signals  # noqa: F401  거래내역 저장/삭제 시 월별 카테고리 합계 갱신
@@ -0,0 +1,197 @@
+# account_book/balances.py
+# 거래내역 잔액(cash_balance / txn_balance) 다시 계산
+#
+# 잔액은 같은 잔액 묶음(현금: 사용자, 계좌: 내 계좌) 안에서 (날짜, id) 순서로 쌓은 누적 금액입니다.
+# 예전에는 새 거래의 잔액을 "가장 최근 거래의 잔액 +/- 금액"으로만 정해서, 지난 날짜로 입력하면 그 거래의 잔액이 틀리고
+# 그 뒤 거래들의 잔액도 고쳐지지 않았습니다. (삭제해도 마찬가지)
+#
+# 이제는 거래를 추가/수정/삭제하면 바뀐 위치부터 뒤쪽 거래만 다시 계산합니다.
+#   1. 바뀐 위치 바로 앞 거래의 잔액을 기준값으로 읽고 (앞 거래가 없으면 묶음의 시작 잔액)
+#   2. 뒤쪽 거래를 (날짜, id) 순서로 REPROPAGATE_CHUNK_SIZE개씩 (id, 구분, 금액, 잔액)만 읽어 누적하면서
+#   3. 잔액이 달라진 거래를 차이값별로 묶어 UPDATE ... SET 잔액 = 잔액 + 차이 WHERE id IN (...) 로 씁니다.
+#      거래 하나를 넣거나 고치거나 지우면 그 뒤 거래는 모두 같은 금액만큼 바뀌므로 보통 청크마다 UPDATE 한 번입니다.
+# 지난 날짜 거래 하나를 고치는 비용은 전체 이력이 아니라 그 뒤 거래 수에 비례하고, 문장 수는 뒤 거래 수 / 청크 크기입니다.
+#
+# 시작 잔액은 바꾸기 전 묶음의 첫 거래에서 구합니다. (첫 거래의 잔액 - 첫 거래 금액)
+# 묶음에 거래가 없었으면 현금은 0, 계좌는 새 거래가 저장될 때 받은 잔액에서 구합니다. (송금 시 acc_money 기준)
+#
+# 한 건 저장/수정/삭제는 signals.py가 같은 트랜잭션 안에서 처리하고,
+# 여러 건을 한 번에 바꾸는 경우는 capture_openings() -> 변경 -> repropagate_all() 순서로 직접 호출합니다.
+# (거래를 다른 묶음으로 옮기면 바꾸기 전/후의 suffix_starts()를 merge_starts()로 합쳐서 넘깁니다.)
+
+from collections import defaultdict
+
+from django.db.models import F, Min, Q
+
+from manage_account.models import TransactionAccount, TransactionCash
+
+# 거래출처 -> (모델, 필드). credit: 잔액을 늘리는 거래 구분
+SOURCES = {
+    'cash': {
+        'model': TransactionCash,
+        'partition': 'cash_user',
+        'date': 'use_date',
+        'side': 'cash_side',
+        'amount': 'cash_amount',
+        'balance': 'cash_balance',
+        'credit': ('수입',),
+    },
+    'account': {
+        'model': TransactionAccount,
+        'partition': 'my_acc',
+        'date': 'txn_date',
+        'side': 'txn_side',
+        'amount': 'txn_amount',
+        'balance': 'txn_balance',
+        'credit': ('입금',),
+    },
+}
+
+# 한 번에 읽고 쓰는 거래 수
+REPROPAGATE_CHUNK_SIZE = 1000
+
+
+def signed_amount(source, side, amount):
+    """잔액에 더해지는 금액 (입금/수입은 +, 출금/지출은 -)"""
+    amount = int(amount or 0)
+    return amount if side in SOURCES[source]['credit'] else -amount
+
+
+def stored_state(source, pk):
+    """DB에 저장된 거래의 (잔액 묶음 id, 날짜, 구분, 금액, 잔액). 없으면 None"""
+    spec = SOURCES[source]
+    return spec['model'].objects.filter(pk=pk).values_list(
+        spec['partition'], spec['date'], spec['side'], spec['amount'], spec['balance'],
+    ).first()
+
+
+def instance_state(source, instance):
+    """인스턴스의 (잔액 묶음 id, 날짜, 구분, 금액, 잔액) (stored_state와 비교용)"""
+    spec = SOURCES[source]
+    return (
+        getattr(instance, spec['partition'] + '_id'),
+        getattr(instance, spec['date']),
+        getattr(instance, spec['side']),
+        int(getattr(instance, spec['amount'])),
+        int(getattr(instance, spec['balance'])),
+    )
+
+
+def opening_balance(source, partition_id):
+    """
+    묶음의 시작 잔액 (첫 거래의 잔액 - 첫 거래 금액). 거래가 없으면 None
+    바꾸기 전에 읽어 두어야 첫 거래를 고치거나 지울 때도 시작 잔액이 유지됩니다.
+    """
+    spec = SOURCES[source]
+    row = (
+        spec['model'].objects.filter(**{spec['partition']: partition_id})
+        .order_by(spec['date'], 'pk')
+        .values_list(spec['balance'], spec['side'], spec['amount'])
+        .first()
+    )
+    if row is None:
+        return None
+    balance, side, amount = row
+    return int(balance) - signed_amount(source, side, amount)
+
+
+def default_opening(source, instance):
+    """거래가 없던 묶음에 처음 저장하는 거래의 시작 잔액 (현금: 0, 계좌: 저장할 때 받은 잔액 - 금액)"""
+    if source == 'cash':
+        return 0
+    spec = SOURCES[source]
+    return int(getattr(instance, spec['balance'])) - signed_amount(
+        source, getattr(instance, spec['side']), getattr(instance, spec['amount'])
+    )
+
+
+def _before(spec, date, pk):
+    # (날짜, id) 순서로 (date, pk)보다 앞인 거래
+    return Q(**{spec['date'] + '__lt': date}) | Q(**{spec['date']: date, 'pk__lt': pk})
+
+
+def repropagate(source, partition_id, date, pk, opening=0):
+    """
+    묶음 partition_id에서 (date, pk) 이후(포함) 거래의 잔액을 다시 계산합니다.
+    앞 거래가 없으면 opening에서 시작합니다.
+    반환값: {id: 새 잔액} (잔액이 바뀐 거래만)
+    """
+    spec = SOURCES[source]
+    model = spec['model']
+    partition = model.objects.filter(**{spec['partition']: partition_id})
+
+    previous = (
+        partition.filter(_before(spec, date, pk))
+        .order_by('-' + spec['date'], '-pk')
+        .values_list(spec['balance'], flat=True)
+        .first()
+    )
+    balance = int(previous) if previous is not None else int(opening or 0)
+
+    changed = {}
+    suffix = partition.exclude(_before(spec, date, pk)).order_by(spec['date'], 'pk')
+    while True:
+        # (날짜, id) 키 기준으로 이어 읽습니다. (열린 커서 없이 읽기/쓰기를 번갈아 함)
+        rows = list(suffix.values_list('pk', spec['date'], spec['side'], spec['amount'], spec['balance'])[:REPROPAGATE_CHUNK_SIZE])
+        shifts = defaultdict(list)
+        for row_pk, _, side, amount, stored in rows:
+            balance += signed_amount(source, side, amount)
+            if stored != balance:
+                shifts[balance - int(stored)].append(row_pk)
+                changed[row_pk] = balance
+        for shift, pks in shifts.items():
+            model.objects.filter(pk__in=pks).update(**{spec['balance']: F(spec['balance']) + shift})
+        if len(rows) < REPROPAGATE_CHUNK_SIZE:
+            return changed
+        last_pk, last_date = rows[-1][0], rows[-1][1]
+        suffix = partition.filter(
+            Q(**{spec['date'] + '__gt': last_date}) | Q(**{spec['date']: last_date, 'pk__gt': last_pk})
+        ).order_by(spec['date'], 'pk')
+
+
+def capture_openings(source, partition_ids):
+    """여러 묶음의 시작 잔액 {묶음 id: 시작 잔액} (바꾸기 전에 호출)"""
+    return {partition_id: opening_balance(source, partition_id) for partition_id in partition_ids}
+
+
+def suffix_starts(source, queryset):
+    """
+    쿼리셋 거래들이 묶음마다 가장 앞서는 위치 {묶음 id: (날짜, id)} (GROUP BY 한 번 + 묶음마다 한 번)
+    여러 건을 지우거나 넣은 뒤 어디부터 다시 계산할지 정하는 데 씁니다.
+    """
+    spec = SOURCES[source]
+    firsts = (
+        queryset.order_by()
+        .values_list(spec['partition'])
+        .annotate(first_date=Min(spec['date']))
+    )
+    starts = {}
+    for partition_id, first_date in firsts:
+        first_pk = (
+            queryset.filter(**{spec['partition']: partition_id, spec['date']: first_date})
+            .order_by('pk').values_list('pk', flat=True).first()
+        )
+        starts[partition_id] = (first_date, first_pk)
+    return starts
+
+
+def merge_starts(*starts_list):
+    """suffix_starts() 결과 여러 개를 묶음마다 가장 앞서는 위치로 합칩니다."""
+    merged = {}
+    for starts in starts_list:
+        for partition_id, start in starts.items():
+            merged[partition_id] = min(merged[partition_id], start) if partition_id in merged else start
+    return merged
+
+
+def repropagate_all(source, starts, openings=None):
+    """
+    starts: {묶음 id: (날짜, id)} 위치부터 묶음마다 잔액을 다시 계산합니다.
+    openings: capture_openings()로 바꾸기 전에 읽어 둔 시작 잔액 (없거나 None이면 0)
+    반환값: 잔액이 바뀐 거래 수
+    """
+    openings = openings or {}
+    changed = 0
+    for partition_id, (date, pk) in starts.items():
+        changed += len(repropagate(source, partition_id, date, pk, openings.get(partition_id)))
+    return changed
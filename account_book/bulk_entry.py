@@ -0,0 +1,150 @@
+# account_book/bulk_entry.py
+# 현금거래내역 일괄 입력 (하단 패널의 여러 줄 입력 표)
+#
+# 예전에는 줄마다 카테고리 조회 1번 + TransactionCash.objects.create 1번(저장 시그널 포함)을 해서
+# 1,000줄을 붙여 넣으면 수천 번 DB를 왕복했고, 형식이 틀린 줄은 아무 말 없이 건너뛰었습니다.
+# 이제는
+#   1. 모든 줄을 먼저 읽어 검증하고 (구분, 금액, 날짜, 자산종류, 카테고리, 글자 수)
+#   2. 카테고리는 카테고리 레지스트리(categories.py)의 (카테고리종류, 구분) -> id 맵에서 찾고
+#   3. 날짜 순서로 잔액을 메모리에서 누적한 뒤 bulk_create로 BULK_BATCH_SIZE줄씩 넣고
+#   4. 월별 카테고리 합계(rollup.py)와, 지난 날짜가 섞여 있으면 그 뒤 거래의 잔액(balances.py)을 한 번에 고칩니다.
+# 줄마다 저장 / 제외 여부와 이유를 돌려줍니다.
+
+from datetime import datetime
+
+from django.db import transaction
+from django.utils import timezone
+
+from manage_account.models import TransactionCash
+from . import balances, categories, rollup
+
+# bulk_create 한 번에 넣는 줄 수
+BULK_BATCH_SIZE = 500
+
+# 구분 -> 카테고리 구분 (AccountBookCategory.cat_kind)
+CATEGORY_KINDS = {'수입': 'income', '지출': 'expense'}
+
+ASSET_TYPES = [code for code, _ in TransactionCash.ASSET_TYPE_CHOICES]
+DEFAULT_ASSET_TYPE = TransactionCash._meta.get_field('asset_type').default
+
+TEXT_LIMITS = {
+    'content': ('내용', TransactionCash._meta.get_field('cash_cont').max_length),
+    'memo': ('메모', TransactionCash._meta.get_field('memo').max_length),
+}
+
+
+def category_map():
+    """{(카테고리종류, 카테고리 구분): 카테고리 id} (카테고리 레지스트리, 보통 쿼리 없음)"""
+    return categories.get_registry()['by_key']
+
+
+def _text(value):
+    return '' if value is None else str(value).strip()
+
+
+def parse_items(items, categories):
+    """
+    요청 JSON의 transactions 목록을 검증합니다.
+    줄 번호는 항목의 'row' 값(입력 표의 줄 번호), 없으면 목록 순서(1부터)입니다.
+    반환값: (저장할 줄 [{'row', 'cash_side', 'cash_amount', 'use_date', 'cash_cat_id', 'cash_cont', 'memo', 'asset_type'}],
+            제외한 줄 [{'row', 'errors': [메시지]}])
+    """
+    entries, rejected = [], []
+    for position, item in enumerate(items, start=1):
+        if not isinstance(item, dict):
+            rejected.append({'row': position, 'errors': ["잘못된 형식의 줄입니다."]})
+            continue
+        row = item.get('row') or position
+        errors = []
+
+        cash_side = _text(item.get('type'))
+        if cash_side not in CATEGORY_KINDS:
+            errors.append("구분은 수입 또는 지출이어야 합니다.")
+
+        cash_amount = None
+        amount_text = _text(item.get('amount')).replace(',', '')
+        try:
+            cash_amount = int(amount_text)
+        except ValueError:
+            errors.append("금액을 숫자로 입력해주세요." if amount_text else "금액을 입력해주세요.")
+        else:
+            if cash_amount <= 0:
+                errors.append("금액은 0보다 커야 합니다.")
+
+        use_date = None
+        date_text = _text(item.get('date'))
+        try:
+            use_date = timezone.make_aware(datetime.strptime(date_text, '%Y-%m-%d'))
+        except ValueError:
+            errors.append("날짜를 YYYY-MM-DD 형식으로 입력해주세요." if date_text else "날짜를 입력해주세요.")
+
+        asset_type = _text(item.get('asset')) or DEFAULT_ASSET_TYPE
+        if asset_type not in ASSET_TYPES:
+            errors.append(f"자산종류는 {', '.join(ASSET_TYPES)} 중 하나여야 합니다.")
+
+        category_id = None
+        category_name = _text(item.get('category'))
+        if category_name and cash_side in CATEGORY_KINDS:
+            category_id = categories.get((category_name, CATEGORY_KINDS[cash_side]))
+            if category_id is None:
+                errors.append(f"'{category_name}'은(는) {cash_side} 카테고리가 아닙니다.")
+
+        texts = {}
+        for key, (label, limit) in TEXT_LIMITS.items():
+            texts[key] = _text(item.get(key))
+            if limit and len(texts[key]) > limit:
+                errors.append(f"{label}은(는) {limit}자까지 입력할 수 있습니다.")
+
+        if errors:
+            rejected.append({'row': row, 'errors': errors})
+            continue
+        entries.append({
+            'row': row,
+            'cash_side': cash_side,
+            'cash_amount': cash_amount,
+            'use_date': use_date,
+            'cash_cat_id': category_id,
+            'cash_cont': texts['content'],
+            'memo': texts['memo'] or None,
+            'asset_type': asset_type,
+        })
+    return entries, rejected
+
+
+def save_entries(user, entries):
+    """
+    검증한 줄을 사용자의 현금거래내역으로 한 트랜잭션 안에서 저장합니다.
+    반환값: [{'row': 줄 번호, 'id': 저장한 거래 id}] (날짜 순서)
+    """
+    if not entries:
+        return []
+    entries = sorted(entries, key=lambda entry: entry['use_date'])   # 같은 날짜는 입력 순서대로
+
+    with transaction.atomic():
+        opening = balances.opening_balance('cash', user.pk)
+        if opening is None:
+            opening = 0
+        first_date = entries[0]['use_date']
+        # 가장 이른 날짜 이전(같은 날짜 포함)의 마지막 잔액에서 누적합니다. (새 거래는 같은 날짜의 기존 거래 뒤)
+        previous = (
+            TransactionCash.objects.filter(cash_user=user, use_date__lte=first_date)
+            .order_by('-use_date', '-pk').values_list('cash_balance', flat=True).first()
+        )
+        balance = previous if previous is not None else opening
+
+        objects = []
+        for entry in entries:
+            balance += balances.signed_amount('cash', entry['cash_side'], entry['cash_amount'])
+            objects.append(TransactionCash(
+                cash_user=user,
+                cash_balance=balance,
+                **{key: value for key, value in entry.items() if key != 'row'},
+            ))
+        TransactionCash.objects.bulk_create(objects, batch_size=BULK_BATCH_SIZE)
+
+        # bulk_create는 저장 시그널을 보내지 않으므로 합계와 잔액을 직접 고칩니다.
+        # 모두 기존 거래 뒤에 붙는 경우 잔액은 이미 맞으므로 읽기만 하고 쓰지 않습니다.
+        rollup.record_objects('cash', objects)
+        balances.repropagate('cash', user.pk, objects[0].use_date, objects[0].pk or 0, opening)
+
+    return [{'row': entry['row'], 'id': obj.pk} for entry, obj in zip(entries, objects)]
@@ -0,0 +1,109 @@
+# account_book/categories.py
+# 가계부 카테고리(AccountBookCategory) 목록을 프로세스마다 한 번만 읽어 두는 레지스트리
+#
+# 카테고리는 수십 줄이고 거의 바뀌지 않는데, 예전에는 가계부 홈, 카테고리 목록 API, 거래 저장/일괄 입력,
+# 거래 검색, 대시보드가 요청마다 카테고리 테이블을 조회하거나 거래내역에 조인해서 이름을 읽었습니다.
+# (거래 검색은 줄마다 카테고리를 따로 조회했습니다.)
+# 이제는 워커마다 처음 한 번 전체를 읽어
+#   - by_id:   {카테고리 id: {'id', 'cat_type', 'cat_kind'}}
+#   - by_key:  {(카테고리종류, 카테고리 구분): 카테고리 id}
+#   - by_kind: {카테고리 구분: [카테고리, ...] (이름 순)}
+#   - names:   {카테고리 id: 이름(cat_type)}
+# 로 들고 있고, 거래내역은 카테고리 id만 읽은 뒤 이름은 여기서 찾습니다.
+# 여러 줄의 이름을 찾을 때는 category_names()로 dict를 한 번 받아 반복문 안에서 찾습니다.
+# (get_registry()는 부를 때마다 공용 캐시의 버전 키를 확인하므로 줄마다 부르지 않습니다.)
+#
+# 카테고리를 저장/삭제하면 signals.py가 커밋 뒤에 invalidate()를 호출해 공용 캐시의 버전 키를 바꾸고,
+# 다른 워커는 다음 요청에서 버전이 달라진 것을 보고 다시 읽습니다. (financial_data/listings.py와 같은 방식)
+# 버전 키가 없으면(카테고리를 한 번도 바꾸지 않았거나 캐시에서 밀려난 경우) 처음 읽을 때 cache.add로 기록해 둡니다.
+# 키가 없는 채로 두면 공용 캐시가 없는 값을 기억하지 않으므로 확인할 때마다 공용 캐시 파일을 읽게 됩니다.
+# 시그널을 거치지 않는 변경(queryset.update, 직접 SQL 등) 뒤에는 invalidate()를 직접 호출합니다.
+
+import time
+import uuid
+
+from django.core.cache import cache
+
+from manage_account.models import AccountBookCategory
+
+# 카테고리 목록 버전을 모든 워커에 알리는 공용 캐시 키
+VERSION_CACHE_KEY = 'account_book:categories:version'
+
+# 공용 캐시가 비었을 때를 대비해 카테고리 테이블을 다시 읽는 주기(초)
+RELOAD_INTERVAL = 300
+
+_loaded = {'version': None, 'registry': None, 'checked_at': 0.0}
+
+
+def load_registry():
+    """카테고리 테이블을 한 번 읽어 레지스트리 dict를 만듭니다. (쿼리 1번)"""
+    by_id, by_key, by_kind, names = {}, {}, {}, {}
+    rows = AccountBookCategory.objects.order_by('cat_type', 'id').values_list('id', 'cat_type', 'cat_kind')
+    for pk, cat_type, cat_kind in rows:
+        category = {'id': pk, 'cat_type': cat_type, 'cat_kind': cat_kind}
+        by_id[pk] = category
+        names[pk] = cat_type
+        by_key.setdefault((cat_type, cat_kind), pk)   # 같은 이름이 여러 개면 먼저 만든 것
+        by_kind.setdefault(cat_kind, []).append(category)
+    return {'by_id': by_id, 'by_key': by_key, 'by_kind': by_kind, 'names': names}
+
+
+def get_registry():
+    """
+    현재 카테고리 레지스트리를 반환합니다. 프로세스마다 한 번만 읽고,
+    공용 캐시의 버전 키가 바뀌었거나 RELOAD_INTERVAL이 지나면 다시 읽습니다.
+    """
+    now = time.monotonic()
+    published = cache.get(VERSION_CACHE_KEY)
+    if (
+        _loaded['registry'] is None
+        or published != _loaded['version']
+        or now - _loaded['checked_at'] > RELOAD_INTERVAL
+    ):
+        if published is None:
+            published = _publish_initial_version()
+        _loaded['registry'] = load_registry()
+        _loaded['version'] = published
+        _loaded['checked_at'] = now
+    return _loaded['registry']
+
+
+def _publish_initial_version():
+    # 아직 버전이 없으면 기록하고(이미 다른 워커가 기록했으면 그 값을) 반환합니다.
+    try:
+        cache.add(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+        return cache.get(VERSION_CACHE_KEY)
+    except Exception as e:
+        print(f"가계부 카테고리 버전 공유 중 오류 발생: {e}")
+        return None
+
+
+def invalidate():
+    """
+    이 워커의 레지스트리를 버리고, 공용 캐시에 새 버전을 기록해 모든 워커가 다음 요청에서 다시 읽게 합니다.
+    """
+    _loaded['registry'] = None
+    try:
+        cache.set(VERSION_CACHE_KEY, uuid.uuid4().hex, None)
+    except Exception as e:
+        print(f"가계부 카테고리 버전 공유 중 오류 발생: {e}")
+
+
+def all_categories():
+    """전체 카테고리 [{'id', 'cat_type', 'cat_kind'}] (이름 순)"""
+    return list(get_registry()['by_id'].values())
+
+
+def categories_of(cat_kind):
+    """카테고리 구분('income' / 'expense')의 카테고리 목록 (이름 순)"""
+    return list(get_registry()['by_kind'].get(cat_kind, []))
+
+
+def category_id(cat_type, cat_kind):
+    """(카테고리종류, 카테고리 구분)의 카테고리 id, 없으면 None"""
+    return get_registry()['by_key'].get((cat_type, cat_kind))
+
+
+def category_names():
+    """{카테고리 id: 이름(cat_type)} (여러 줄의 이름을 찾을 때 한 번 받아서 씁니다)"""
+    return get_registry()['names']
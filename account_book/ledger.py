@@ -0,0 +1,141 @@
+# account_book/ledger.py
+# 가계부 통합 거래내역 (현금거래내역 + 계좌거래내역)
+#
+# 예전에는 가계부 홈 화면이 이번 달 TransactionCash / TransactionAccount를 모델 인스턴스로 모두 읽고,
+# 한 줄마다 카테고리(cash_cat, txn_cat)와 계좌(my_acc)를 따로 조회(1 + 3N 쿼리)한 뒤
+# 파이썬에서 합치고 정렬하고 수입/지출 합계를 더했습니다.
+# 이제는
+#   - 두 테이블에서 화면에 필요한 컬럼만 같은 이름/순서로 뽑아 UNION ALL 한 번으로 날짜 내림차순 목록을 읽고
+#     (카테고리는 조인하지 않고 id만 읽어 카테고리 레지스트리(categories.py)에서 이름을 찾습니다.)
+#   - 이번 달 수입/지출 합계는 월별 카테고리 합계 테이블(rollup.py)에서 한 번에 읽습니다.
+#     (월 단위가 아닌 기간은 테이블마다 조건부 집계(Sum + filter) 한 번씩)
+# 거래 건수와 상관없이 쿼리 수가 일정합니다.
+#
+# 여러 거래를 한 번에 지울 때는 delete_transactions()가 월별 합계와 잔액을 함께 고칩니다.
+
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import CharField, F, Q, Sum, Value
+from django.utils import timezone
+
+from manage_account.models import TransactionAccount, TransactionCash
+from . import balances, categories, rollup
+from .rollup import EXPENSE_SIDES, INCOME_SIDES, month_span, side_totals
+
+# 통합 목록 컬럼 -> (현금거래내역 식, 계좌거래내역 식)
+# UNION은 컬럼 순서로 맞추므로 두 쪽 모두 이 순서대로 뽑습니다.
+LEDGER_COLUMNS = {
+    'id': (F('id'), F('id')),
+    'type': (Value('cash', output_field=CharField()), Value('account', output_field=CharField())),
+    'date': (F('use_date'), F('txn_date')),
+    'side': (F('cash_side'), F('txn_side')),
+    'amount': (F('cash_amount'), F('txn_amount')),
+    'category': (F('cash_cat_id'), F('txn_cat_id')),                           # 카테고리 id (이름은 ledger_entries에서)
+    'content': (F('cash_cont'), F('txn_cont')),
+    'memo': (F('memo'), Value('', output_field=CharField())),                  # 계좌거래내역에는 메모/사진이 없음
+    'photo': (F('photo'), Value(None, output_field=CharField())),
+    'asset_type': (F('asset_type'), F('my_acc__acc_bank')),                     # 계좌거래내역은 은행 이름
+}
+
+# 모델 필드와 이름이 겹치지 않도록 별칭에 붙이는 접두사
+_ALIAS_PREFIX = 'ledger_'
+
+
+def month_range(year, month):
+    """
+    (해당 월 1일 0시, 다음 달 1일 0시) 현재 시간대 aware datetime.
+    __year / __month 조회와 같은 범위지만 날짜 컬럼에 범위 조건으로 걸립니다.
+    """
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    start = timezone.make_aware(datetime(year, month, 1))
+    end = timezone.make_aware(datetime(next_year, next_month, 1))
+    return start, end
+
+
+def _cash_queryset(start, end, user=None):
+    queryset = TransactionCash.objects.filter(use_date__gte=start, use_date__lt=end)
+    if user is not None:
+        queryset = queryset.filter(cash_user=user)
+    return queryset
+
+
+def _account_queryset(start, end, user=None):
+    queryset = TransactionAccount.objects.filter(txn_date__gte=start, txn_date__lt=end)
+    if user is not None:
+        queryset = queryset.filter(my_acc__acc_user_name=user)
+    return queryset
+
+
+def _project(queryset, source):
+    # source: 0 = 현금거래내역, 1 = 계좌거래내역
+    aliases = {_ALIAS_PREFIX + name: expressions[source] for name, expressions in LEDGER_COLUMNS.items()}
+    return queryset.order_by().annotate(**aliases).values_list(*aliases)
+
+
+def ledger_queryset(start, end, user=None):
+    """
+    start <= 날짜 < end 인 현금/계좌 거래내역을 UNION ALL 한 쿼리로 합친 values_list 쿼리셋.
+    컬럼은 LEDGER_COLUMNS 순서이고, 날짜 내림차순(같은 시각이면 현금 -> 계좌, 나중에 만든 것 먼저)입니다.
+    user를 주면 그 사용자의 거래만 (현금: cash_user, 계좌: my_acc의 소유자)
+    """
+    cash = _project(_cash_queryset(start, end, user), 0)
+    account = _project(_account_queryset(start, end, user), 1)
+    return cash.union(account, all=True).order_by(
+        '-' + _ALIAS_PREFIX + 'date', '-' + _ALIAS_PREFIX + 'type', '-' + _ALIAS_PREFIX + 'id'
+    )
+
+
+def ledger_entries(start, end, user=None):
+    """
+    ledger_queryset 결과를 화면에서 쓰는 dict 목록으로 바꿉니다.
+    (date는 현재 시간대로, category는 카테고리 이름으로, photo는 photo_url로 바꿉니다.)
+    """
+    storage = TransactionCash._meta.get_field('photo').storage
+    names = categories.category_names()
+    entries = []
+    for row in ledger_queryset(start, end, user):
+        entry = dict(zip(LEDGER_COLUMNS, row))
+        entry['date'] = timezone.localtime(entry['date'])
+        entry['category'] = names.get(entry['category']) or ''
+        photo = entry.pop('photo')
+        entry['photo_url'] = storage.url(photo) if photo else None
+        entries.append(entry)
+    return entries
+
+
+def monthly_totals(start, end, user=None):
+    """
+    start <= 날짜 < end 인 거래의 수입/지출 합계 {'income': ..., 'expense': ...}
+    월 단위 기간이면 월별 카테고리 합계 테이블 쿼리 1번, 아니면 테이블마다 조건부 집계 쿼리 한 번씩 (총 2번)
+    """
+    months = month_span(start, end)
+    if months is not None:
+        return side_totals(months, user)
+
+    cash = _cash_queryset(start, end, user).aggregate(
+        income=Sum('cash_amount', filter=Q(cash_side__in=INCOME_SIDES), default=0),
+        expense=Sum('cash_amount', filter=Q(cash_side__in=EXPENSE_SIDES), default=0),
+    )
+    account = _account_queryset(start, end, user).aggregate(
+        income=Sum('txn_amount', filter=Q(txn_side__in=INCOME_SIDES), default=0),
+        expense=Sum('txn_amount', filter=Q(txn_side__in=EXPENSE_SIDES), default=0),
+    )
+    return {
+        'income': cash['income'] + account['income'],
+        'expense': cash['expense'] + account['expense'],
+    }
+
+
+def delete_transactions(source, queryset):
+    """
+    거래내역 쿼리셋(source: 'cash' / 'account')을 지우고, 한 트랜잭션 안에서
+    월별 카테고리 합계에서 빼고 잔액 묶음마다 지운 위치 뒤 거래의 잔액을 다시 계산합니다.
+    반환값: 지운 거래 수
+    """
+    with transaction.atomic():
+        starts = balances.suffix_starts(source, queryset)
+        openings = balances.capture_openings(source, starts)
+        deleted = rollup.delete_queryset(source, queryset)
+        balances.repropagate_all(source, starts, openings)
+    return deleted
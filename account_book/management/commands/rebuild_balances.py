@@ -0,0 +1,46 @@
+# account_book/management/commands/rebuild_balances.py
+# 현금/계좌 거래내역의 잔액을 묶음(현금: 사용자, 계좌: 내 계좌)마다 처음부터 다시 계산합니다.
+#
+# 사용 방법:
+#    > python manage.py rebuild_balances
+#    > python manage.py rebuild_balances --source cash
+#
+# 예전 방식(가장 최근 거래 잔액 +/- 금액)으로 지난 날짜 거래를 넣거나 지워서 틀어진 잔액을 한 번 바로잡을 때 씁니다.
+# 묶음마다 첫 거래의 시작 잔액(첫 거래 잔액 - 금액)은 그대로 두고, 잔액이 달라진 거래만 고칩니다.
+# 이후의 추가/수정/삭제는 account_book/balances.py가 바뀐 위치 뒤쪽만 자동으로 다시 계산합니다.
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from account_book import balances
+
+
+class Command(BaseCommand):
+    help = '현금/계좌 거래내역의 잔액을 처음부터 다시 계산합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            choices=list(balances.SOURCES),
+            help='한 종류만 다시 계산 (기본값: 모두)',
+        )
+
+    def handle(self, *args, **options):
+        sources = [options['source']] if options['source'] else list(balances.SOURCES)
+        for source in sources:
+            spec = balances.SOURCES[source]
+            partitions = list(
+                spec['model'].objects.order_by().values_list(spec['partition'], flat=True).distinct()
+            )
+            fixed = 0
+            for partition_id in partitions:
+                with transaction.atomic():
+                    opening = balances.opening_balance(source, partition_id)
+                    first = (
+                        spec['model'].objects.filter(**{spec['partition']: partition_id})
+                        .order_by(spec['date'], 'pk').values_list(spec['date'], 'pk').first()
+                    )
+                    if first is not None:
+                        fixed += len(balances.repropagate(source, partition_id, first[0], first[1], opening))
+            self.stdout.write(f"{source}: 묶음 {len(partitions):,}개, 잔액을 고친 거래 {fixed:,}건")
+        self.stdout.write(self.style.SUCCESS("완료"))
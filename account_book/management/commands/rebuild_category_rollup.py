@@ -0,0 +1,46 @@
+# account_book/management/commands/rebuild_category_rollup.py
+# 월별 카테고리 합계(MonthlyCategoryTotal)를 현금/계좌 거래내역 전체에서 처음부터 다시 만듭니다.
+#
+# 사용 방법:
+#    > python manage.py rebuild_category_rollup
+#    > python manage.py rebuild_category_rollup --chunk-size 20000
+#
+# 합계 테이블을 처음 만든 뒤(migrate 직후) 한 번, 그리고 시그널을 거치지 않는 일괄 변경
+# (bulk_update, queryset.update, 직접 SQL 등) 뒤에 실행합니다.
+# 거래내역은 id 구간별로 GROUP BY 집계하므로 거래내역 수와 상관없이 메모리를 적게 씁니다.
+# 전체를 한 트랜잭션으로 바꾸므로 실행 중에도 화면에는 이전 합계가 보입니다.
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from account_book import rollup
+
+
+class Command(BaseCommand):
+    help = '월별 카테고리 합계 테이블을 거래내역 전체에서 다시 만듭니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=rollup.REBUILD_CHUNK_SIZE,
+            help=f'한 번에 집계할 거래내역 id 범위 (기본값: {rollup.REBUILD_CHUNK_SIZE})',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        if chunk_size <= 0:
+            raise CommandError("--chunk-size는 1 이상이어야 합니다.")
+
+        def progress(source, done, last):
+            self.stdout.write(f"  {source}: id {done:,} / {last:,}")
+
+        started = time.monotonic()
+        result = rollup.rebuild(chunk_size=chunk_size, progress=progress)
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"완료: 현금거래 {result['cash']:,}건, 계좌거래 {result['account']:,}건 -> "
+            f"합계 {result['rows']:,}줄 ({elapsed:.1f}초)"
+        ))
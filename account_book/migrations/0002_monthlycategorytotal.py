@@ -0,0 +1,36 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_book', '0001_initial'),
+        ('manage_account', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyCategoryTotal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('cash', '현금거래내역'), ('account', '계좌거래내역')], max_length=10, verbose_name='거래출처')),
+                ('month', models.DateField(verbose_name='월')),
+                ('side', models.CharField(max_length=10, verbose_name='거래종류')),
+                ('total', models.BigIntegerField(default=0, verbose_name='금액합계')),
+                ('count', models.IntegerField(default=0, verbose_name='건수')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='manage_account.accountbookcategory', verbose_name='가계부카테고리')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monthly_category_totals', to=settings.AUTH_USER_MODEL, verbose_name='사용자')),
+            ],
+            options={
+                'verbose_name': '월별카테고리합계',
+                'verbose_name_plural': '월별카테고리합계 목록',
+                'indexes': [models.Index(fields=['month', 'user'], name='monthly_total_month_user_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('user', 'source', 'month', 'category', 'side'), name='unique_monthly_category_total'), models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'source', 'month', 'side'), name='unique_monthly_uncategorized_total')],
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# 기존 거래내역으로 월별 카테고리 합계(MonthlyCategoryTotal)를 채웁니다.
+# rollup.rebuild()와 같은 기준(사용자, 거래출처, 현재 시간대 기준 월, 카테고리, 거래종류)으로 GROUP BY 합니다.
+# 마이그레이션 시점의 모델을 써야 하므로 rollup 모듈 대신 apps.get_model로 모델을 가져옵니다.
+
+from collections import defaultdict
+from datetime import date
+
+from django.db import migrations
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+# 거래출처 -> (앱, 모델, 필드). rollup.SOURCES와 같은 값
+SOURCES = {
+    'cash': ('manage_account', 'TransactionCash', 'cash_user', 'use_date', 'cash_cat', 'cash_side', 'cash_amount'),
+    'account': ('manage_account', 'TransactionAccount', 'my_acc__acc_user_name', 'txn_date', 'txn_cat', 'txn_side', 'txn_amount'),
+}
+
+
+def _month_of(value):
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return date(value.year, value.month, 1)
+
+
+def backfill(apps, schema_editor):
+    MonthlyCategoryTotal = apps.get_model('account_book', 'MonthlyCategoryTotal')
+    db_alias = schema_editor.connection.alias
+    MonthlyCategoryTotal.objects.using(db_alias).all().delete()
+
+    for source, (app_label, model_name, user, when, category, side, amount) in SOURCES.items():
+        model = apps.get_model(app_label, model_name)
+        rows = (
+            model.objects.using(db_alias).order_by()
+            .annotate(rollup_month=TruncMonth(when))
+            .values_list(user, 'rollup_month', category, side)
+            .annotate(total=Sum(amount), count=Count('pk'))
+        )
+        totals = defaultdict(lambda: [0, 0])
+        for user_id, month, category_id, side_value, total, count in rows:
+            if user_id is None:
+                continue
+            entry = totals[(user_id, _month_of(month), category_id, side_value)]
+            entry[0] += int(total or 0)
+            entry[1] += count
+
+        MonthlyCategoryTotal.objects.using(db_alias).bulk_create([
+            MonthlyCategoryTotal(
+                user_id=user_id, source=source, month=month, category_id=category_id, side=side_value,
+                total=total, count=count,
+            )
+            for (user_id, month, category_id, side_value), (total, count) in totals.items()
+        ], batch_size=1000)
+
+
+def clear(apps, schema_editor):
+    MonthlyCategoryTotal = apps.get_model('account_book', 'MonthlyCategoryTotal')
+    MonthlyCategoryTotal.objects.using(schema_editor.connection.alias).all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_book', '0002_monthlycategorytotal'),
+        ('manage_account', '0002_transaction_balance_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill, clear),
+    ]
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.db import models
 
 # Create your models here.
@@ -13,3 +14,57 @@ class Category(models.Model):
     def __str__(self):
         return f"{self.cat_kind} - {self.cat_type}"
 
+
+
+class MonthlyCategoryTotal(models.Model):
+    """월별 카테고리 합계 (사용자, 거래출처, 월, 카테고리, 거래종류별 금액 합계와 건수)
+
+    현금/계좌 거래내역을 저장하거나 지울 때 같은 트랜잭션 안에서 함께 갱신됩니다. (account_book/rollup.py)
+    처음부터 다시 만들려면: python manage.py rebuild_category_rollup
+    """
+    SOURCE_CHOICES = [
+        ('cash', '현금거래내역'),
+        ('account', '계좌거래내역'),
+    ]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='monthly_category_totals',
+        verbose_name='사용자'
+    )
+    source = models.CharField('거래출처', max_length=10, choices=SOURCE_CHOICES)
+    month = models.DateField('월')  # 해당 월 1일 (현재 시간대 기준)
+    category = models.ForeignKey(
+        AccountBookCategory,
+        on_delete=models.CASCADE,  # 카테고리를 지우기 전에 미분류(null) 합계로 옮깁니다. (rollup.merge_into_uncategorized)
+        null=True,
+        blank=True,
+        verbose_name='가계부카테고리'
+    )
+    side = models.CharField('거래종류', max_length=10)  # 수입/지출/입금/출금
+    total = models.BigIntegerField('금액합계', default=0)
+    count = models.IntegerField('건수', default=0)
+
+    def __str__(self):
+        return f"{self.month:%Y-%m} {self.side} {self.total:,}원 ({self.count}건)"
+
+    class Meta:
+        verbose_name = "월별카테고리합계"
+        verbose_name_plural = "월별카테고리합계 목록"
+        # 유니크 제약에서 NULL끼리는 서로 다른 값으로 취급되므로 미분류(category=None) 줄은 따로 제약을 둡니다.
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'source', 'month', 'category', 'side'],
+                condition=models.Q(category__isnull=False),
+                name='unique_monthly_category_total',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'source', 'month', 'side'],
+                condition=models.Q(category__isnull=True),
+                name='unique_monthly_uncategorized_total',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['month', 'user'], name='monthly_total_month_user_idx'),
+        ]
@@ -0,0 +1,333 @@
+# account_book/rollup.py
+# 월별 카테고리 합계(MonthlyCategoryTotal) 유지
+#
+# 가계부 홈, 대시보드의 월 수입/지출 합계, 카테고리별 지출, 월별 추이는 예전에는 요청마다 거래내역 전체를 다시 집계했습니다.
+# 이제는 (사용자, 거래출처, 월, 카테고리, 거래종류)별 합계와 건수를 MonthlyCategoryTotal에 미리 쌓아 두고,
+# 월 단위 조회는 이 테이블의 몇십 줄만 읽습니다.
+#
+# 갱신 방법
+#   - 한 건 저장/수정: signals.py의 pre_save/post_save가 같은 트랜잭션 안에서 증감분을 반영합니다.
+#     (수정은 저장 전 값을 빼고 새 값을 더합니다.)
+#   - 삭제(사용자/계좌 삭제에 딸린 cascade 포함): signals.py가 삭제 한 번의 증감분을 모아 키별로 한 번씩 반영합니다.
+#   - 여러 건 삭제: delete_queryset()이 지울 줄을 GROUP BY 한 번으로 집계해 키별로 한 번씩 반영합니다.
+#   - bulk_create: 시그널이 없으므로 record_objects()를 같은 트랜잭션 안에서 직접 호출합니다.
+#   - 그 밖의 일괄 변경(bulk_update, queryset.update): rebuild()로 처음부터 다시 만듭니다.
+
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, Min, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from manage_account.models import Account, TransactionAccount, TransactionCash
+from . import categories
+from .models import MonthlyCategoryTotal
+
+# 거래출처 -> (모델, 필드). user는 조회 경로(계좌거래내역은 계좌의 소유자)
+SOURCES = {
+    'cash': {
+        'model': TransactionCash,
+        'user': 'cash_user',
+        'date': 'use_date',
+        'category': 'cash_cat',
+        'side': 'cash_side',
+        'amount': 'cash_amount',
+    },
+    'account': {
+        'model': TransactionAccount,
+        'user': 'my_acc__acc_user_name',
+        'date': 'txn_date',
+        'category': 'txn_cat',
+        'side': 'txn_side',
+        'amount': 'txn_amount',
+    },
+}
+
+# 수입 / 지출로 보는 거래종류 (현금: 수입/지출, 계좌: 입금/출금)
+INCOME_SIDES = ('수입', '입금')
+EXPENSE_SIDES = ('지출', '출금')
+
+# rebuild()가 한 번에 집계하는 거래내역 id 범위
+REBUILD_CHUNK_SIZE = 50000
+
+_state = threading.local()
+
+
+def source_of(model):
+    """모델 클래스의 거래출처 이름 ('cash' / 'account'), 거래내역 모델이 아니면 None"""
+    for source, spec in SOURCES.items():
+        if spec['model'] is model:
+            return source
+    return None
+
+
+def month_of(value):
+    """datetime -> 현재 시간대 기준 해당 월 1일 (date)"""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return date(value.year, value.month, 1)
+
+
+def month_span(start, end):
+    """
+    start <= 날짜 < end 가 정확히 몇 개의 달(1일 0시 ~ 다음 달 1일 0시)이면 그 달들의 1일 목록, 아니면 None.
+    월 단위로 맞아떨어지는 범위만 합계 테이블로 답할 수 있습니다.
+    """
+    start, end = timezone.localtime(start), timezone.localtime(end)
+    for value in (start, end):
+        if (value.day, value.hour, value.minute, value.second, value.microsecond) != (1, 0, 0, 0, 0):
+            return None
+    months = []
+    current = date(start.year, start.month, 1)
+    while current < date(end.year, end.month, 1):
+        months.append(current)
+        current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+    return months
+
+
+def is_suspended():
+    return getattr(_state, 'suspended', False)
+
+
+@contextmanager
+def suspended():
+    """
+    이 블록 안에서는 거래내역 시그널로 합계와 잔액(balances.py)을 갱신하지 않습니다.
+    (증감분과 잔액을 직접 반영하는 일괄 처리용)
+    """
+    previous = is_suspended()
+    _state.suspended = True
+    try:
+        yield
+    finally:
+        _state.suspended = previous
+
+
+def _key_filter(source, key):
+    user_id, month, category_id, side = key
+    return {'user_id': user_id, 'source': source, 'month': month, 'category_id': category_id, 'side': side}
+
+
+def apply_deltas(source, deltas):
+    """
+    deltas: {(user_id, month, category_id, side): [금액 증감, 건수 증감]}
+    키마다 UPDATE 한 번으로 반영하고(없는 키는 모아서 INSERT 한 번), 건수가 0이 된 줄은 지웁니다.
+    호출하는 쪽의 트랜잭션 안에서 실행됩니다.
+    """
+    emptied, missing = [], []
+    for key, (amount, count) in deltas.items():
+        if not amount and not count:
+            continue
+        rows = MonthlyCategoryTotal.objects.filter(**_key_filter(source, key))
+        if rows.update(total=F('total') + amount, count=F('count') + count):
+            if count < 0:
+                emptied.append(key)
+        elif count > 0:
+            # 합계 줄이 없는데 빼야 하는 경우 (사용자 삭제로 함께 지워지는 중 등)는 새로 만들지 않습니다.
+            missing.append(key)
+
+    if missing:
+        try:
+            with transaction.atomic():
+                MonthlyCategoryTotal.objects.bulk_create([
+                    MonthlyCategoryTotal(total=deltas[key][0], count=deltas[key][1], **_key_filter(source, key))
+                    for key in missing
+                ])
+        except IntegrityError:
+            # 다른 요청이 같은 키를 먼저 만든 경우: 키마다 다시 반영합니다.
+            for key in missing:
+                apply_deltas(source, {key: deltas[key]})
+
+    if emptied:
+        condition = Q()
+        for key in emptied:
+            condition |= Q(**_key_filter(source, key))
+        MonthlyCategoryTotal.objects.filter(condition, count__lte=0).delete()
+
+
+def instance_key(source, instance):
+    """거래내역 인스턴스의 합계 키 (user_id, month, category_id, side)"""
+    spec = SOURCES[source]
+    if source == 'account':
+        if TransactionAccount.my_acc.is_cached(instance):
+            user_id = instance.my_acc.acc_user_name_id
+        else:
+            user_id = Account.objects.filter(pk=instance.my_acc_id).values_list('acc_user_name', flat=True).first()
+    else:
+        user_id = getattr(instance, spec['user'] + '_id')
+    return (
+        user_id,
+        month_of(getattr(instance, spec['date'])),
+        getattr(instance, spec['category'] + '_id'),
+        getattr(instance, spec['side']),
+    )
+
+
+def stored_key(source, pk):
+    """DB에 저장된 거래내역의 (합계 키, 금액). 없으면 None (수정 전 값을 빼는 데 사용)"""
+    spec = SOURCES[source]
+    row = spec['model'].objects.filter(pk=pk).values_list(
+        spec['user'], spec['date'], spec['category'], spec['side'], spec['amount'],
+    ).first()
+    if row is None:
+        return None
+    user_id, value, category_id, side, amount = row
+    return (user_id, month_of(value), category_id, side), int(amount)
+
+
+def record_objects(source, objects, sign=1):
+    """
+    bulk_create 등으로 시그널 없이 저장한(sign=1) / 지운(sign=-1) 거래내역 인스턴스를 합계에 반영합니다.
+    """
+    spec = SOURCES[source]
+    deltas = defaultdict(lambda: [0, 0])
+    for instance in objects:
+        delta = deltas[instance_key(source, instance)]
+        delta[0] += sign * int(getattr(instance, spec['amount']))
+        delta[1] += sign
+    apply_deltas(source, deltas)
+
+
+def grouped_totals(source, queryset):
+    """
+    거래내역 쿼리셋을 합계 키별로 GROUP BY 한 번에 집계합니다.
+    반환값: {(user_id, month, category_id, side): [금액 합계, 건수]}
+    """
+    spec = SOURCES[source]
+    rows = (
+        queryset.order_by()
+        .annotate(rollup_month=TruncMonth(spec['date']))
+        .values_list(spec['user'], 'rollup_month', spec['category'], spec['side'])
+        .annotate(total=Sum(spec['amount']), count=Count('pk'))
+    )
+    totals = defaultdict(lambda: [0, 0])
+    for user_id, month, category_id, side, total, count in rows:
+        # TruncMonth는 현재 시간대 기준 월 1일 0시(datetime)를 돌려줍니다.
+        entry = totals[(user_id, month_of(month), category_id, side)]
+        entry[0] += int(total or 0)
+        entry[1] += count
+    return totals
+
+
+def delete_queryset(source, queryset):
+    """
+    거래내역 쿼리셋을 지우고 합계에서 뺍니다. (지울 줄 집계 1번 + 삭제 + 키별 UPDATE)
+    반환값: 지운 거래내역 수
+    """
+    with transaction.atomic():
+        totals = grouped_totals(source, queryset)
+        with suspended():
+            queryset.delete()
+        apply_deltas(source, {key: [-amount, -count] for key, (amount, count) in totals.items()})
+    return sum(count for _, count in totals.values())
+
+
+def merge_into_uncategorized(category):
+    """
+    카테고리를 지우기 전에 그 카테고리의 합계를 미분류(category=None) 합계로 옮깁니다.
+    (거래내역의 카테고리는 on_delete=SET_NULL로 None이 됩니다.)
+    """
+    rows = MonthlyCategoryTotal.objects.filter(category=category)
+    by_source = defaultdict(lambda: defaultdict(lambda: [0, 0]))
+    for row in rows:
+        entry = by_source[row.source][(row.user_id, row.month, None, row.side)]
+        entry[0] += row.total
+        entry[1] += row.count
+    rows.delete()
+    for source, deltas in by_source.items():
+        apply_deltas(source, deltas)
+
+
+def rebuild(chunk_size=REBUILD_CHUNK_SIZE, progress=None):
+    """
+    거래내역 전체에서 합계 테이블을 처음부터 다시 만듭니다. (한 트랜잭션)
+    거래내역은 id 범위 chunk_size개씩 GROUP BY로 집계하므로 거래내역을 메모리에 올리지 않습니다.
+    progress(source, 처리한 id 상한, 최대 id)를 주면 구간마다 호출합니다.
+    반환값: {'cash': 거래 수, 'account': 거래 수, 'rows': 만든 합계 줄 수}
+    """
+    result = {}
+    with transaction.atomic():
+        MonthlyCategoryTotal.objects.all().delete()
+        created = 0
+        for source, spec in SOURCES.items():
+            model = spec['model']
+            bounds = model.objects.aggregate(low=Min('pk'), high=Max('pk'))
+            totals = defaultdict(lambda: [0, 0])
+            if bounds['low'] is not None:
+                for low in range(bounds['low'], bounds['high'] + 1, chunk_size):
+                    chunk = model.objects.filter(pk__gte=low, pk__lt=low + chunk_size)
+                    for key, (amount, count) in grouped_totals(source, chunk).items():
+                        totals[key][0] += amount
+                        totals[key][1] += count
+                    if progress:
+                        progress(source, min(low + chunk_size - 1, bounds['high']), bounds['high'])
+
+            rows = [
+                MonthlyCategoryTotal(total=amount, count=count, **_key_filter(source, key))
+                for key, (amount, count) in totals.items()
+                if key[0] is not None
+            ]
+            MonthlyCategoryTotal.objects.bulk_create(rows, batch_size=1000)
+            created += len(rows)
+            result[source] = sum(count for _, count in totals.values())
+        result['rows'] = created
+    return result
+
+
+def side_totals(months, user=None, source=None):
+    """
+    months(월 1일 목록) 동안의 수입/지출 합계 {'income': ..., 'expense': ...} (합계 테이블 쿼리 1번)
+    """
+    rows = MonthlyCategoryTotal.objects.filter(month__in=months)
+    if user is not None:
+        rows = rows.filter(user=user)
+    if source is not None:
+        rows = rows.filter(source=source)
+    totals = rows.aggregate(
+        income=Sum('total', filter=Q(side__in=INCOME_SIDES), default=0),
+        expense=Sum('total', filter=Q(side__in=EXPENSE_SIDES), default=0),
+    )
+    return {'income': totals['income'], 'expense': totals['expense']}
+
+
+def category_totals(months, user=None, source=None, sides=EXPENSE_SIDES):
+    """
+    months 동안 sides 거래의 카테고리별 합계 [{'category': 카테고리 이름(미분류는 None), 'total': ...}] (큰 순서)
+    """
+    rows = MonthlyCategoryTotal.objects.filter(month__in=months, side__in=sides)
+    if user is not None:
+        rows = rows.filter(user=user)
+    if source is not None:
+        rows = rows.filter(source=source)
+    # 카테고리 id별로 집계하고 이름은 카테고리 레지스트리에서 찾습니다. (이름이 같은 카테고리는 합침)
+    names = categories.category_names()
+    totals = defaultdict(int)
+    for category_id, total in rows.order_by().values_list('category').annotate(sum=Sum('total')):
+        totals[names.get(category_id)] += total
+    ordered = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [{'category': name, 'total': total} for name, total in ordered]
+
+
+def month_side_totals(months, user=None, source=None):
+    """
+    months 동안 (월, 거래종류)별 합계 [{'month': 월 1일 0시(aware datetime), 'side': ..., 'total': ...}] (월, 거래종류 순)
+    월 값은 TruncMonth로 집계했을 때와 같은 형태입니다.
+    """
+    rows = MonthlyCategoryTotal.objects.filter(month__in=months)
+    if user is not None:
+        rows = rows.filter(user=user)
+    if source is not None:
+        rows = rows.filter(source=source)
+    rows = rows.values('month', 'side').annotate(sum=Sum('total')).order_by('month', 'side')
+    return [
+        {
+            'month': timezone.make_aware(datetime(row['month'].year, row['month'].month, 1)),
+            'side': row['side'],
+            'total': row['sum'],
+        }
+        for row in rows
+    ]
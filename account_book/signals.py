@@ -0,0 +1,213 @@
+# account_book/signals.py
+# 현금/계좌 거래내역을 저장하거나 지울 때 월별 카테고리 합계(MonthlyCategoryTotal)와
+# 그 뒤 거래들의 잔액(balances.py)을 함께 갱신합니다.
+# 가계부 카테고리를 저장하거나 지우면 커밋 뒤에 카테고리 레지스트리(categories.py)를 다시 읽게 합니다.
+# 시그널은 저장/삭제와 같은 트랜잭션 안에서 실행되므로, 저장이 롤백되면 합계 변경도 롤백됩니다.
+# (AccountBookConfig.ready()에서 연결)
+#
+# 삭제는 한 건이든 여러 건이든(사용자/계좌 삭제에 딸린 cascade, 관리자 일괄 삭제) 삭제 한 번을 묶어서 처리합니다.
+# Django는 지울 줄 전체의 pre_delete를 먼저 보내고, 지운 뒤 post_delete를 보냅니다.
+#   - pre_delete: 줄마다 합계 증감분과 잔액 묶음별 시작 위치만 모읍니다. (시작 잔액은 묶음마다 한 번 읽음)
+#   - 마지막 post_delete: 합계 키마다 UPDATE 한 번, 잔액 묶음마다 다시 계산 한 번
+# 함께 지워지는 사용자/계좌(삭제를 시작한 origin)의 합계와 잔액은 어차피 사라지므로 건너뜁니다.
+
+import threading
+from collections import defaultdict
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from manage_account.models import Account, AccountBookCategory, TransactionAccount, TransactionCash
+from . import balances, categories, rollup
+
+
+@receiver(pre_save, sender=TransactionCash)
+@receiver(pre_save, sender=TransactionAccount)
+def remember_stored_key(sender, instance, raw=False, **kwargs):
+    # 수정이면 저장 전 값을 기억해 두었다가 post_save에서 뺍니다.
+    instance._rollup_previous = None
+    if raw or rollup.is_suspended() or instance._state.adding or instance.pk is None:
+        return
+    instance._rollup_previous = rollup.stored_key(rollup.source_of(sender), instance.pk)
+
+
+@receiver(post_save, sender=TransactionCash)
+@receiver(post_save, sender=TransactionAccount)
+def add_to_rollup(sender, instance, raw=False, **kwargs):
+    if raw or rollup.is_suspended():
+        return
+    source = rollup.source_of(sender)
+    amount = int(getattr(instance, rollup.SOURCES[source]['amount']))
+    deltas = {}
+    previous = getattr(instance, '_rollup_previous', None)
+    if previous is not None:
+        previous_key, previous_amount = previous
+        deltas[previous_key] = [-previous_amount, -1]
+    key = rollup.instance_key(source, instance)
+    delta = deltas.setdefault(key, [0, 0])
+    delta[0] += amount
+    delta[1] += 1
+    rollup.apply_deltas(source, deltas)
+    instance._rollup_previous = None
+
+
+@receiver(pre_delete, sender=AccountBookCategory)
+def uncategorize_rollup(sender, instance, **kwargs):
+    rollup.merge_into_uncategorized(instance)
+
+
+@receiver(post_save, sender=AccountBookCategory)
+@receiver(post_delete, sender=AccountBookCategory)
+def invalidate_category_registry(sender, **kwargs):
+    # 롤백되면 다시 읽을 필요가 없고, 커밋 전에 다른 워커가 다시 읽으면 이전 목록을 읽으므로 커밋 뒤에 알립니다.
+    transaction.on_commit(categories.invalidate)
+
+
+# --- 잔액 다시 계산 (balances.py) ---
+
+@receiver(pre_save, sender=TransactionCash)
+@receiver(pre_save, sender=TransactionAccount)
+def remember_balance_state(sender, instance, raw=False, **kwargs):
+    # 저장 전 위치와, 관련된 잔액 묶음의 시작 잔액을 기억해 둡니다.
+    instance._balance_previous = None
+    if raw or rollup.is_suspended():
+        return
+    source = rollup.source_of(sender)
+    partition_field = balances.SOURCES[source]['partition'] + '_id'
+    previous = None if instance._state.adding or instance.pk is None else balances.stored_state(source, instance.pk)
+    partitions = {getattr(instance, partition_field)}
+    if previous is not None:
+        partitions.add(previous[0])
+    instance._balance_previous = (previous, balances.capture_openings(source, partitions))
+
+
+@receiver(post_save, sender=TransactionCash)
+@receiver(post_save, sender=TransactionAccount)
+def repropagate_balances(sender, instance, raw=False, **kwargs):
+    state = getattr(instance, '_balance_previous', None)
+    instance._balance_previous = None
+    if raw or rollup.is_suspended() or state is None:
+        return
+    source = rollup.source_of(sender)
+    previous, openings = state
+    current = balances.instance_state(source, instance)
+    if previous is not None and tuple(previous[:4]) == current[:4] and int(previous[4]) == current[4]:
+        return  # 잔액에 영향이 없는 수정 (내용, 메모, 카테고리 등)
+
+    partition_id, date = current[0], current[1]
+    starts = {partition_id: (date, instance.pk)}
+    if previous is not None:
+        previous_start = (previous[1], instance.pk)
+        if previous[0] == partition_id:
+            starts[partition_id] = min(starts[partition_id], previous_start)
+        else:
+            starts[previous[0]] = previous_start
+    if openings.get(partition_id) is None:
+        openings[partition_id] = balances.default_opening(source, instance)
+
+    balance_field = balances.SOURCES[source]['balance']
+    for partition, (start_date, start_pk) in starts.items():
+        changed = balances.repropagate(source, partition, start_date, start_pk, openings.get(partition))
+        if instance.pk in changed:
+            setattr(instance, balance_field, changed[instance.pk])
+
+
+# --- 거래내역 삭제 (합계 + 잔액, 삭제 한 번에 한 번) ---
+
+_deleting = threading.local()
+
+
+def _deleted_owners(origin):
+    """
+    삭제를 시작한 origin(인스턴스 또는 쿼리셋)과 함께 지워지는 사용자/계좌 id
+    {'users': {...}, 'accounts': {...}} (사용자/계좌 삭제가 아니면 빈 집합)
+    """
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if model is get_user_model():
+        users = set(origin.values_list('pk', flat=True)) if isinstance(origin, QuerySet) else {origin.pk}
+        accounts = set(Account.objects.filter(acc_user_name__in=users).values_list('pk', flat=True))
+        return {'users': users, 'accounts': accounts}
+    if model is Account:
+        accounts = set(origin.values_list('pk', flat=True)) if isinstance(origin, QuerySet) else {origin.pk}
+        return {'users': set(), 'accounts': accounts}
+    return {'users': set(), 'accounts': set()}
+
+
+def _delete_batch(origin):
+    # 같은 origin의 삭제가 진행 중이면 그 묶음을, 아니면 새 묶음을 반환합니다.
+    # (이전 묶음이 남아 있으면 삭제가 도중에 실패해 롤백된 것이므로 버립니다.)
+    batch = getattr(_deleting, 'batch', None)
+    if batch is None or batch['origin'] is not origin:
+        owners = _deleted_owners(origin)
+        batch = {
+            'origin': origin,
+            'pending': 0,
+            'dead_users': owners['users'],
+            'dead_partitions': {'cash': owners['users'], 'account': owners['accounts']},
+            'sources': defaultdict(lambda: {
+                'users': {},                            # 잔액 묶음 id -> 사용자 id
+                'deltas': defaultdict(lambda: [0, 0]),  # 합계 키 -> [금액 증감, 건수 증감]
+                'starts': {},                           # 잔액 묶음 id -> 가장 앞서는 (날짜, id)
+                'openings': {},                         # 잔액 묶음 id -> 지우기 전 시작 잔액
+            }),
+        }
+        _deleting.batch = batch
+    return batch
+
+
+@receiver(pre_delete, sender=TransactionCash)
+@receiver(pre_delete, sender=TransactionAccount)
+def collect_deleted(sender, instance, origin=None, **kwargs):
+    if rollup.is_suspended():
+        return
+    batch = _delete_batch(origin)
+    batch['pending'] += 1
+
+    source = rollup.source_of(sender)
+    spec = balances.SOURCES[source]
+    entry = batch['sources'][source]
+    partition_id = getattr(instance, spec['partition'] + '_id')
+    when = getattr(instance, spec['date'])
+
+    # 합계 키의 사용자는 잔액 묶음마다 한 번만 찾습니다. (계좌거래내역은 계좌의 소유자)
+    if partition_id not in entry['users']:
+        entry['users'][partition_id] = rollup.instance_key(source, instance)[0]
+    user_id = entry['users'][partition_id]
+    if user_id not in batch['dead_users']:
+        key = (
+            user_id,
+            rollup.month_of(when),
+            getattr(instance, rollup.SOURCES[source]['category'] + '_id'),
+            getattr(instance, spec['side']),
+        )
+        delta = entry['deltas'][key]
+        delta[0] -= int(getattr(instance, spec['amount']))
+        delta[1] -= 1
+
+    if partition_id in batch['dead_partitions'][source]:
+        return
+    if partition_id not in entry['openings']:
+        entry['openings'][partition_id] = balances.opening_balance(source, partition_id)
+    start = (when, instance.pk)
+    entry['starts'][partition_id] = min(entry['starts'].get(partition_id, start), start)
+
+
+@receiver(post_delete, sender=TransactionCash)
+@receiver(post_delete, sender=TransactionAccount)
+def apply_deleted(sender, instance, origin=None, **kwargs):
+    if rollup.is_suspended():
+        return
+    batch = getattr(_deleting, 'batch', None)
+    if batch is None or batch['origin'] is not origin:
+        return
+    batch['pending'] -= 1
+    if batch['pending'] > 0:
+        return
+    # 이번 삭제에서 지울 거래내역을 모두 지웠습니다.
+    _deleting.batch = None
+    for source, entry in batch['sources'].items():
+        rollup.apply_deltas(source, entry['deltas'])
+        balances.repropagate_all(source, entry['starts'], entry['openings'])
@@ -263,7 +263,7 @@ document.addEventListener('DOMContentLoaded', () => {
             const dateRegex = /^\d{4}-\d{2}-\d{2}$/;
             let hasError = false;
 
-            for (const row of tableRows) {
+            for (const [index, row] of tableRows.entries()) {
                 const type = row.cells[1].querySelector('select')?.value || '';
                 const date = row.cells[2].querySelector('input')?.value.trim() || '';
                 const asset = row.cells[3].querySelector('select')?.value || '';
@@ -280,7 +280,7 @@ document.addEventListener('DOMContentLoaded', () => {
                         break;
                     }
 
-                    transactions.push({ type, date, asset, category, amount, content, memo });
+                    transactions.push({ row: index + 1, type, date, asset, category, amount, content, memo });
                 }
             }
 
@@ -299,11 +299,15 @@ document.addEventListener('DOMContentLoaded', () => {
             })
             .then(res => res.json())
             .then(data => {
+                // 제외된 줄: "3번째 줄: 금액은 0보다 커야 합니다."
+                const rejected = (data.rejected || [])
+                    .map(item => `${item.row}번째 줄: ${item.errors.join(' / ')}`)
+                    .join('\n');
                 if (data.success) {
-                    alert('저장되었습니다.');
+                    alert(`${data.saved.length}건 저장되었습니다.` + (rejected ? `\n\n저장하지 않은 줄:\n${rejected}` : ''));
                     window.location.reload();
                 } else {
-                    alert('저장 실패: ' + (data.error || '알 수 없는 오류'));
+                    alert('저장 실패: ' + (data.error || '알 수 없는 오류') + (rejected ? `\n\n${rejected}` : ''));
                 }
             })
             .catch(err => {
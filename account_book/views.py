@@ -1,6 +1,6 @@
 from django.shortcuts import render, redirect
 from dashboard.models import Transaction
-from manage_account.models import Account, AccountBookCategory, TransactionAccount, TransactionCash
+from manage_account.models import Account, TransactionAccount, TransactionCash
 from django.contrib.auth import get_user_model
 from django.views.decorators.http import require_POST
 from django.utils import timezone
@@ -11,13 +11,16 @@ from django.contrib.auth.decorators import login_required
 from datetime import datetime, timedelta, date # Added date import explicitly
 from django.db import transaction
 import calendar # Added calendar import
-from django.utils.timezone import make_aware
 from django.utils.timezone import localtime
 import openpyxl
 from django.http import HttpResponse
 from manage_account.models import TransactionAccount, TransactionCash
 from django.http import JsonResponse
 from .models import Category
+from .ledger import ledger_entries, month_range, monthly_totals
+from .ledger import delete_transactions as delete_ledger_transactions
+from . import bulk_entry
+from . import categories as account_categories
 
 User = get_user_model()
 
@@ -28,13 +31,13 @@ def get_categories_json(request):
     category_type = request.GET.get('type')
     categories = []
     if category_type in ['income', 'expense']:
-        filtered_categories = AccountBookCategory.objects.filter(cat_kind=category_type).order_by('cat_type')
-        categories = [{'id': category.id, 'name': category.cat_type} for category in filtered_categories]
+        # 카테고리 레지스트리에서 읽습니다. (이름 순, 보통 쿼리 없음)
+        categories = [{'id': category['id'], 'name': category['cat_type']} for category in account_categories.categories_of(category_type)]
     return JsonResponse({'categories': categories})
 
 
 def home(request):
-    categories = AccountBookCategory.objects.all()
+    categories = account_categories.all_categories()   # 카테고리 레지스트리 (보통 쿼리 없음)
     
     # Get year and month from GET parameters, default to current month
     year = request.GET.get('year')
@@ -44,62 +47,12 @@ def home(request):
     current_year = int(year) if year else now.year
     current_month = int(month) if month else now.month
 
-    # Filter TransactionCash for the current month
-    cash_transactions = TransactionCash.objects.filter(
-        use_date__year=current_year,
-        use_date__month=current_month
-    )
-
-    # Filter TransactionAccount for the current month
-    account_transactions = TransactionAccount.objects.filter(
-        txn_date__year=current_year,
-        txn_date__month=current_month
-    )
-
-    # Combine and sort all transactions by date
-    combined_transactions = []
-    for t in cash_transactions:
-        combined_transactions.append({
-            'id': t.id,
-            'type': 'cash',
-            'date': localtime(t.use_date),
-            'side': t.cash_side,
-            'amount': t.cash_amount,
-            'category': t.cash_cat.cat_type if t.cash_cat else '',
-            'content': t.cash_cont,
-            'memo': t.memo,
-            'photo_url': t.photo.url if t.photo else None,
-            'asset_type': t.asset_type, # Use actual asset_type from model
-        })
-    for t in account_transactions:
-        combined_transactions.append({
-            'id': t.id,
-            'type': 'account',
-            'date': localtime(t.txn_date),
-            'side': t.txn_side,
-            'amount': t.txn_amount,
-            'category': t.txn_cat.cat_type if t.txn_cat else '',
-            'content': t.txn_cont,
-            'memo': '', # Account transactions don't have memo/photo directly
-            'photo_url': None,
-            'asset_type': t.my_acc.acc_bank, # Use bank name as asset type
-        })
-    
-    # Sort combined transactions by date in descending order
-    combined_transactions.sort(key=lambda x: x['date'], reverse=True)
-    transactions = combined_transactions # Rename for context
-
-    # Calculate total income for the current month from combined transactions
-    monthly_income = sum(
-        t['amount'] for t in combined_transactions
-        if t['side'] == '수입' or t['side'] == '입금'
-    )
-
-    # Calculate total expense for the current month from combined transactions
-    monthly_expense = sum(
-        t['amount'] for t in combined_transactions
-        if t['side'] == '지출' or t['side'] == '출금'
-    )
+    # 이번 달 현금/계좌 거래내역: UNION 한 쿼리로 날짜 내림차순 목록, 수입/지출 합계는 조건부 집계
+    month_start, month_end = month_range(current_year, current_month)
+    transactions = ledger_entries(month_start, month_end)
+    totals = monthly_totals(month_start, month_end)
+    monthly_income = totals['income']
+    monthly_expense = totals['expense']
 
     # Calculate total balance from all bank accounts
     user = User.objects.first() # Placeholder user
@@ -107,8 +60,8 @@ def home(request):
     
     latest_transactions_subquery = TransactionAccount.objects.filter(
         my_acc=OuterRef('pk'),
-        txn_date__year=current_year,
-        txn_date__month=current_month
+        txn_date__gte=month_start,
+        txn_date__lt=month_end
     ).order_by('-txn_date')
     
     accounts_with_latest_balance = accounts.annotate(
@@ -180,41 +133,31 @@ def save_transaction(request):
                 # Handle invalid date format, e.g., log error or return an error response
                 pass # For now, just pass, which means parsed_date_obj will remain None
 
-        # --- Calculate new cash balance ---
-        last_transaction = TransactionCash.objects.order_by('-use_date').first()
-        last_balance = last_transaction.cash_balance if last_transaction else 0
-
-        if cash_side == '수입':
-            new_balance = last_balance + cash_amount
-        else: # 지출
-            new_balance = last_balance - cash_amount
-        # -------------------------------------
-
         # Map front-end '수입'/'지출' to model's 'income'/'expense'
         kind = 'income' if cash_side == '수입' else 'expense'
 
-        category = None
+        category_id = None
         if category_name:
-            try:
-                category = AccountBookCategory.objects.get(cat_type=category_name, cat_kind=kind)
-            except AccountBookCategory.DoesNotExist:
-                # This can happen if JS categories are out of sync with DB
-                pass  # Silently ignore if category does not exist
+            # 카테고리 레지스트리에서 찾고, 없으면 (JS의 카테고리 목록이 DB와 다를 때) 카테고리 없이 저장합니다.
+            category_id = account_categories.category_id(category_name, kind)
 
         user = User.objects.first()  # 🔹 로그인 붙이기 전 임시
 
-        TransactionCash.objects.create(
-            cash_side=cash_side,
-            cash_amount=cash_amount,
-            use_date=parsed_datetime_utc, # Use parsed_datetime_utc here
-            cash_balance=new_balance,  # Use calculated balance
-            cash_cont=content if content else "",
-            memo=memo,
-            photo=photo,
-            cash_cat=category,
-            cash_user=user,
-            asset_type=asset_type, # Save asset_type
-        )
+        # 월별 카테고리 합계와 잔액은 저장 시그널이 같은 트랜잭션 안에서 갱신합니다.
+        # (잔액은 날짜 순서로 바로 앞 거래의 잔액에서 계산하고, 지난 날짜로 넣으면 그 뒤 거래들의 잔액도 다시 계산)
+        with transaction.atomic():
+            TransactionCash.objects.create(
+                cash_side=cash_side,
+                cash_amount=cash_amount,
+                use_date=parsed_datetime_utc, # Use parsed_datetime_utc here
+                cash_balance=0,  # 저장 후 balances.repropagate가 채움
+                cash_cont=content if content else "",
+                memo=memo,
+                photo=photo,
+                cash_cat_id=category_id,
+                cash_user=user,
+                asset_type=asset_type, # Save asset_type
+            )
         return redirect("account_book:home")
 
     return redirect("account_book:home")
@@ -236,7 +179,8 @@ def delete_transactions(request):
 
     if ids:
         # TODO: Add user ownership check when user authentication is fully implemented
-        TransactionCash.objects.filter(id__in=ids).delete()
+        # 지울 거래를 한 번에 집계해 월별 카테고리 합계에서 빼고 지운 뒤, 그 뒤 거래들의 잔액을 다시 계산합니다. (한 트랜잭션)
+        delete_ledger_transactions('cash', TransactionCash.objects.filter(id__in=ids))
 
         # Ajax 요청인 경우 JSON 응답
         if request.headers.get("Content-Type") == "application/json":
@@ -253,77 +197,25 @@ def save_bulk_transactions(request):
     try:
         data = json.loads(request.body)
         transactions_data = data.get('transactions', [])
-    except json.JSONDecodeError:
+    except (json.JSONDecodeError, AttributeError):
+        return JsonResponse({"success": False, "error": "Invalid JSON"}, status=400)
+    if not isinstance(transactions_data, list):
         return JsonResponse({"success": False, "error": "Invalid JSON"}, status=400)
 
     user = User.objects.first()  # 임시 사용자
 
+    # 모든 줄을 먼저 검증하고, 통과한 줄만 bulk_create로 한 번에 저장합니다. (account_book/bulk_entry.py)
+    entries, rejected = bulk_entry.parse_items(transactions_data, bulk_entry.category_map())
     try:
-        with transaction.atomic():
-            # 마지막 잔액 가져오기
-            last_transaction = TransactionCash.objects.order_by('-use_date', '-id').first()
-            current_balance = last_transaction.cash_balance if last_transaction else 0
-
-            # 날짜 기준으로 먼저 정렬 (잔액 계산의 정확성을 위해)
-            transactions_data.sort(key=lambda x: x.get('date', ''))
-
-            for item in transactions_data:
-                cash_side = item.get('type')
-                cash_amount_str = item.get('amount')
-                use_date_str = item.get('date')
-                
-                # 단건 입력 패널의 유효성 검사와 동일하게, 타입, 금액, 날짜가 모두 있어야 함
-                if not all([cash_side, cash_amount_str, use_date_str]):
-                    continue
-
-                # Parse the date string into a datetime object
-                parsed_date = None
-                if use_date_str:
-                    try:
-                        # Assuming YYYY-MM-DD format from frontend
-                        parsed_date = make_aware(datetime.strptime(use_date_str, '%Y-%m-%d'))
-                    except ValueError:
-                        # Handle invalid date format if necessary, e.g., skip or return error
-                        continue # Skip this transaction if date format is invalid
-
-                try:
-                    cash_amount = int(cash_amount_str)
-                except (ValueError, TypeError):
-                    continue # 금액이 유효한 숫자가 아니면 건너뛰기
-
-                category_name = item.get('category')
-                content = item.get('content')
-                memo = item.get('memo')
-                asset_type = item.get('asset') # Retrieve asset_type
-
-                # 잔액 계산
-                if cash_side == '수입':
-                    current_balance += cash_amount
-                else: # 지출
-                    current_balance -= cash_amount
-                
-                kind = 'income' if cash_side == '수입' else 'expense'
-                category = None
-                if category_name:
-                    try:
-                        category = AccountBookCategory.objects.filter(cat_type=category_name, cat_kind=kind).first()
-                    except AccountBookCategory.DoesNotExist:
-                        pass
-
-                TransactionCash.objects.create(
-                    cash_user=user,
-                    use_date=parsed_date,
-                    cash_side=cash_side,
-                    cash_cat=category,
-                    cash_amount=cash_amount,
-                    cash_cont=content,
-                    memo=memo,
-                    cash_balance=current_balance,
-                    asset_type=asset_type # Save asset_type
-                )
-        return JsonResponse({"success": True})
+        saved = bulk_entry.save_entries(user, entries)
     except Exception as e:
+        print(f"일괄 입력 저장 실패: {e}")
         return JsonResponse({"success": False, "error": str(e)}, status=500)
+
+    result = {"success": bool(saved), "saved": saved, "rejected": rejected}
+    if not saved:
+        result["error"] = "저장할 수 있는 줄이 없습니다."
+    return JsonResponse(result, status=200 if saved else 400)
     
 
 def search_transactions(request):
@@ -367,6 +259,8 @@ def search_transactions(request):
 
     transactions = transactions.filter(filters)
 
+    # 카테고리 이름은 줄마다 조회하지 않고 카테고리 레지스트리에서 찾습니다.
+    category_names = account_categories.category_names()
     serialized_transactions = []
     for transaction in transactions:
         serialized_transactions.append({
@@ -374,7 +268,7 @@ def search_transactions(request):
             'use_date': localtime(transaction.use_date).strftime('%Y-%m-%d'),  # ✅ 한국시간 보정
             'cash_side': transaction.cash_side,
             'asset_type': transaction.asset_type,
-            'category_name': transaction.cash_cat.cat_type if transaction.cash_cat else '',
+            'category_name': category_names.get(transaction.cash_cat_id) or '',
             'cash_amount': transaction.cash_amount,
             'cash_cont': transaction.cash_cont,
             'memo': transaction.memo,
@@ -418,6 +312,7 @@ def export_monthly_transactions(request, year, month):
     ws1 = wb.active
     ws1.title = "계좌거래내역"
 
+    category_names = account_categories.category_names()   # 카테고리 이름은 레지스트리에서 (줄마다 조회하지 않음)
     ws1.append(["날짜", "거래종류", "금액", "내용", "잔액", "카테고리"])
     account_txns = TransactionAccount.objects.filter(
         txn_date__year=year,
@@ -431,7 +326,7 @@ def export_monthly_transactions(request, year, month):
             t.txn_amount,
             t.txn_cont,
             t.txn_balance,
-            t.txn_cat.cat_type if t.txn_cat else ""
+            category_names.get(t.txn_cat_id) or ""
         ])
 
     # --- 현금거래내역 시트 ---
@@ -451,7 +346,7 @@ def export_monthly_transactions(request, year, month):
             t.cash_cont,
             t.memo,
             t.cash_balance,
-            t.cash_cat.cat_type if t.cash_cat else ""
+            category_names.get(t.cash_cat_id) or ""
         ])
 
     # 응답 반환
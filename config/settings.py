@@ -165,10 +165,39 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Google Maps API Key
 GOOGLE_MAPS_API_KEY = os.environ.get('GOOGLE_MAPS_API_KEY')
 
+# 금융 데이터 로컬 저장 경로 (종목 목록 스냅샷 등)
+FINDATA_DIR = BASE_DIR / 'findata_store'
+
+# 시세/종목 목록 공급자 (financial_data/providers.py)
+# 'fdr'(FinanceDataReader), 'record'/'replay'(파일 기록/재생), 'synthetic'(가짜 데이터, 부하 테스트용)
+FINDATA_PROVIDER = os.getenv('FINDATA_PROVIDER', 'fdr')
+FINDATA_PROVIDER_OPTIONS = {}
+
+# 금융 데이터 I/O 설정 (financial_data/io_pool.py)
+FINDATA_IO_MAX_WORKERS = 16          # 프로세스 공용 스레드 풀 크기
+FINDATA_UPSTREAM_MAX_INFLIGHT = 8    # 외부 API(FinanceDataReader) 동시 호출 상한
+FINDATA_IO_TIMEOUT = 10              # 작업별 제한 시간(초), 넘기면 'N/A'로 표시
+FINDATA_MARKET_TICKERS = ['KS11', 'IXIC', 'US10YT', 'USD/KRW', 'EUR/KRW']  # 검색 화면 주요 지표 (financial_data/market.py)
+FINDATA_MARKET_TTL = 600             # 주요 지표 스냅샷을 새로 받는 주기(초)
+FINDATA_SYMBOL_ALIASES = {}          # 검색어 한글 별칭 추가 (예: {'마이크로소프트': 'MSFT'}) (financial_data/symbols.py)
+FINDATA_TICKER_VALIDATION_TIMEOUT = 5  # 종목 목록에 없는 코드 확인 제한 시간(초) (financial_data/forms.py)
+FINDATA_FX_TTL = 60 * 60             # 환율 이력을 다시 읽는 주기(초) (financial_data/fx.py)
+FINDATA_ASYNC_MAX_CONCURRENCY = 32   # 비동기 뷰에서 이벤트 루프당 동시에 기다리는 작업 수 (financial_data/async_views.py)
+FINDATA_RISK_BENCHMARKS = ['KS11', 'IXIC']  # 위험 지표 베타 기준 지수 (financial_data/analytics.py)
+FINDATA_RISK_CACHE_TTL = 60 * 60 * 12  # 위험 지표 결과 캐시 시간(초)
+FINDATA_IMPORT_MAX_ROWS = 2000       # 보유 종목 일괄 등록 파일의 최대 줄 수 (financial_data/holdings_import.py)
+
 #주식 현재가 검색 캐시
+# 워커 메모리 LRU + 같은 장비의 모든 워커가 함께 쓰는 SQLite 파일 (financial_data/shared_cache.py)
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
-        'LOCATION': 'unique-snowflake',
+        'BACKEND': 'financial_data.shared_cache.TwoTierCache',
+        'LOCATION': FINDATA_DIR / 'cache.sqlite3',
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'LOCAL_MAX_ENTRIES': 1000,       # 워커 메모리에 두는 최대 항목 수
+            'STAMP_CHECK_INTERVAL': 1.0,     # 다른 워커의 변경을 확인하는 주기(초)
+            'CULL_CHECK_INTERVAL': 100,      # 공용 파일의 항목 수(MAX_ENTRIES)를 확인하는 쓰기 간격
+        },
     }
 }
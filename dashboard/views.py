@@ -5,7 +5,8 @@ from django.db.models import Sum, F
 # from .models import Transaction   # 같은 앱 내의 모델 import - dashboard 앱 테스트를 위해 만든 모델 import
 from django.contrib.auth.decorators import login_required
 from urllib3 import request
-from manage_account.models import TransactionAccount, Account, AccountBookCategory # 가계부 앱 모델을 읽기 위해 import
+from manage_account.models import TransactionAccount, Account # 가계부 앱 모델을 읽기 위해 import
+from account_book import categories, rollup
 from datetime import datetime, date, timedelta
 from django.db.models.functions import TruncMonth
 from django.utils import timezone                       # 이 라인 전체APP Merge후 추가하였음.
@@ -64,7 +65,7 @@ def dashboard_view(request):
     
     # 로그인한 사용자 계좌와 연결된 거래 내역을 조회
     # filter(my_acc__in=user_accounts)를 사용하여 로그인한 사용자의 거래만 필터링
-    # select_related('txn_cat')를 사용하여 TransactionAccount와 AccountBookCategory를 미리 조인하여 쿼리 횟수를 줄인다.
+    # 카테고리는 조인하지 않고 txn_cat(id)만 읽어 카테고리 레지스트리(account_book/categories.py)에서 이름을 찾는다.
     # 또한, txn_date 필드를 사용하여 날짜 범위 필터링
     transactions = TransactionAccount.objects.filter(
         my_acc__in=user_accounts, 
@@ -72,7 +73,7 @@ def dashboard_view(request):
         # range 대신 gte와 lt를 조합하여 날짜 범위 필터링
         txn_date__gte=start_datetime, # 수정
         txn_date__lt=end_datetime, # 수정
-    ).select_related('txn_cat')
+    )
     
     # 각 집계 및 조회 쿼리를 새로운 모델에 맞게 수정
     # 필드명도 'amount' -> 'txn_amount', 'transaction_type' -> 'txn_side', 'category' -> 'txn_cat'으로 변경
@@ -81,45 +82,66 @@ def dashboard_view(request):
     # total_expense = Transaction.objects.filter(transaction_type='지출', transaction_date__range=[start_date, end_date]).aggregate(Sum('amount'))['amount__sum'] or Decimal(0)
     # net_balance = total_income - total_expense
     #
-    # 총 수입/지출/순자산
-    total_income = transactions.filter(txn_side='입금').aggregate(Sum('txn_amount'))['txn_amount__sum'] or Decimal(0)
-    total_expense = transactions.filter(txn_side='출금').aggregate(Sum('txn_amount'))['txn_amount__sum'] or Decimal(0)
-    net_balance = total_income - total_expense   
+    # 조회 기간이 월 단위(1일 ~ 말일)이면 월별 카테고리 합계 테이블(account_book/rollup.py)에서 읽고,
+    # 아니면 거래내역을 직접 집계합니다.
+    # 카테고리 이름은 요청마다 한 번 받은 레지스트리 dict에서 찾습니다. (account_book/categories.py)
+    category_names = categories.category_names()
+    months = rollup.month_span(start_datetime, end_datetime)
+    if months is not None:
+        summary = rollup.side_totals(months, request.user, source='account')
+        total_income = summary['income'] or Decimal(0)
+        total_expense = summary['expense'] or Decimal(0)
+        net_balance = total_income - total_expense
+        expense_by_category = rollup.category_totals(months, request.user, source='account', sides=['출금'])
+        transactions_by_month = [
+            {'month': item['month'], 'transaction_type': item['side'], 'total': item['total']}
+            for item in rollup.month_side_totals(months, request.user, source='account')
+        ]
+    else:
+        # 총 수입/지출/순자산
+        total_income = transactions.filter(txn_side='입금').aggregate(Sum('txn_amount'))['txn_amount__sum'] or Decimal(0)
+        total_expense = transactions.filter(txn_side='출금').aggregate(Sum('txn_amount'))['txn_amount__sum'] or Decimal(0)
+        net_balance = total_income - total_expense   
     
-    # 카테고리별 지출 집계
-    # values()에 'txn_cat' (ForeignKey)을 사용하고 annotate(total=Sum('txn_amount'))로 집계합니다.
-    # 이 경우 'txn_cat' 필드에는 카테고리의 ID가 반환되므로, 템플릿에서 카테고리 이름을 사용하려면 조인된 객체에 접근해야 합니다.
-    # OLD-카테고리별 지출 집계
-    # expense_by_category = list(Transaction.objects.filter(transaction_type='지출', transaction_date__range=[start_date, end_date]).values('category').annotate(total=Sum('amount')).order_by('-total'))
-    #
-    # JSON 직렬화를 위해 리스트를 생성할 때 category 이름을 직접 가져와야 합니다.
-    expense_by_category_data = list(transactions.filter(txn_side='출금').values('txn_cat__cat_type').annotate(total=Sum('txn_amount')).order_by('-total'))
-    # 필드명 변경: 'txn_cat__cat_type'을 'category'로, 'total'을 'total'로 유지합니다.
-    expense_by_category = [{'category': item['txn_cat__cat_type'], 'total': item['total']} for item in expense_by_category_data]
+        # 카테고리별 지출 집계
+        # values()에 'txn_cat' (ForeignKey)을 사용하고 annotate(total=Sum('txn_amount'))로 집계합니다.
+        # 이 경우 'txn_cat' 필드에는 카테고리의 ID가 반환되므로, 템플릿에서 카테고리 이름을 사용하려면 조인된 객체에 접근해야 합니다.
+        # OLD-카테고리별 지출 집계
+        # expense_by_category = list(Transaction.objects.filter(transaction_type='지출', transaction_date__range=[start_date, end_date]).values('category').annotate(total=Sum('amount')).order_by('-total'))
+        #
+        # JSON 직렬화를 위해 리스트를 생성할 때 category 이름을 직접 가져와야 합니다.
+        # 카테고리 id별로 집계하고 이름은 카테고리 레지스트리에서 찾습니다. (이름이 같은 카테고리는 합침)
+        expense_by_category_data = transactions.filter(txn_side='출금').values('txn_cat').annotate(total=Sum('txn_amount'))
+        expense_totals = {}
+        for item in expense_by_category_data:
+            name = category_names.get(item['txn_cat'])
+            expense_totals[name] = expense_totals.get(name, 0) + item['total']
+        # 필드명 변경: 카테고리 이름을 'category'로, 'total'을 'total'로 유지합니다.
+        expense_by_category = [{'category': name, 'total': total} for name, total in sorted(expense_totals.items(), key=lambda item: item[1], reverse=True)]
 
-    # OLD-월별 수입/지출 추이 집계
-    # transactions_by_month = list(Transaction.objects.filter(transaction_date__range=[start_date, end_date]).annotate(month=TruncMonth('transaction_date')).values('month', 'transaction_type').annotate(total=Sum('amount')).order_by('month', 'transaction_type'))
-    # 월별 수입/지출 추이 집계
-    transactions_by_month_data = list(transactions.annotate(month=TruncMonth('txn_date')).values('month', 'txn_side').annotate(total=Sum('txn_amount')).order_by('month', 'txn_side'))
-    # 필드명 변경: 'txn_side'를 'transaction_type'으로, 'total'을 'total'로 유지합니다.
-    transactions_by_month = [{'month': item['month'], 'transaction_type': item['txn_side'], 'total': item['total']} for item in transactions_by_month_data]
+        # OLD-월별 수입/지출 추이 집계
+        # transactions_by_month = list(Transaction.objects.filter(transaction_date__range=[start_date, end_date]).annotate(month=TruncMonth('transaction_date')).values('month', 'transaction_type').annotate(total=Sum('amount')).order_by('month', 'transaction_type'))
+        # 월별 수입/지출 추이 집계
+        transactions_by_month_data = list(transactions.annotate(month=TruncMonth('txn_date')).values('month', 'txn_side').annotate(total=Sum('txn_amount')).order_by('month', 'txn_side'))
+        # 필드명 변경: 'txn_side'를 'transaction_type'으로, 'total'을 'total'로 유지합니다.
+        transactions_by_month = [{'month': item['month'], 'transaction_type': item['txn_side'], 'total': item['total']} for item in transactions_by_month_data]
     
     # OLD-최근 거래 내역 테이블 (수입/지출 분리)
     # recent_transactions = Transaction.objects.filter(transaction_date__range=[start_date, end_date]).order_by('-transaction_date')
     #
     # 최근 거래 내역 테이블 (수입/지출 분리)
-    recent_transactions_income = list(transactions.filter(txn_side='입금').order_by('-txn_date').values('txn_date', 'txn_cat__cat_type', 'txn_cont', 'txn_amount'))
-    recent_transactions_expense = list(transactions.filter(txn_side='출금').order_by('-txn_date').values('txn_date', 'txn_cat__cat_type', 'txn_cont', 'txn_amount'))
+    recent_transactions_income = list(transactions.filter(txn_side='입금').order_by('-txn_date').values('txn_date', 'txn_cat', 'txn_cont', 'txn_amount'))
+    recent_transactions_expense = list(transactions.filter(txn_side='출금').order_by('-txn_date').values('txn_date', 'txn_cat', 'txn_cont', 'txn_amount'))
 
     # recent_income_transactions = list(recent_transactions.filter(transaction_type='수입').values('transaction_date', 'category', 'description', 'amount'))
     # recent_expense_transactions = list(recent_transactions.filter(transaction_type='지출').values('transaction_date', 'category', 'description', 'amount'))
     # JSON 직렬화를 위해 필드 이름을 기존 대시보드 형식에 맞게 변경합니다.
     recent_income_transactions = [
-        {'transaction_date': item['txn_date'].date(), 'category': item['txn_cat__cat_type'], 'description': item['txn_cont'], 'amount': item['txn_amount']}
+        {'transaction_date': item['txn_date'].date(), 'category': category_names.get(item['txn_cat']), 'description': item['txn_cont'], 'amount': item['txn_amount']}
         for item in recent_transactions_income
     ]
     recent_expense_transactions = [
-        {'transaction_date': item['txn_date'].date(), 'category': item['txn_cat__cat_type'], 'description': item['txn_cont'], 'amount': item['txn_amount']}
+        {'transaction_date': item['txn_date'].date(), 'category': category_names.get(item['txn_cat']), 'description': item['txn_cont'], 'amount': item['txn_amount']}
         for item in recent_transactions_expense
     ]
 
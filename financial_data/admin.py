@@ -1,3 +1,10 @@
 from django.contrib import admin
+from .models import PriceSeries
 
-# Register your models here.
+@admin.register(PriceSeries)
+class PriceSeriesAdmin(admin.ModelAdmin):
+    """시세저장상태 Admin (워머가 기록한 종목별 조회 시간/실패 횟수 확인용)"""
+    list_display = ['ticker', 'covered_from', 'last_date', 'synced_at', 'fetch_ms', 'fail_count', 'last_error']
+    search_fields = ['ticker']
+    list_filter = ['fail_count']
+    ordering = ['-fetch_ms']
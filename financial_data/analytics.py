@@ -0,0 +1,221 @@
+# financial_data/analytics.py
+# 보유 종목 위험 지표 (변동성, 최대 낙폭, 지수 대비 베타, 종목 간 상관계수)
+#
+# 로컬 시세 저장소의 일별 종가로 날짜 x 종목 행렬을 한 번 만들고,
+# 모든 지표를 종목 반복문 없이 NumPy 배열 연산으로 한꺼번에 계산합니다.
+#   - 수익률: 행렬 전체의 일간 수익률 (휴일 등 빈 날은 직전 종가로 채워 수익률 0)
+#   - 변동성: 일간 수익률 표준편차 x sqrt(252) (연율화, %)
+#   - 최대 낙폭: 종가 / 그날까지의 최고 종가 - 1 의 최솟값 (%)
+#   - 베타: 지수(BENCHMARKS)와 같이 수익률이 있는 날만 모아 cov(종목, 지수) / var(지수)
+#   - 상관계수: 두 종목의 수익률이 모두 있는 날만 사용 (pairwise)
+# 포트폴리오 지표는 보유 수량과 날짜별 환율로 계산한 원화 평가액(NAV) 기준입니다.
+#
+# 결과는 (사용자, 보유 종목 지문, 기준일, 기간)별로 캐시에 저장해 같은 조건의 재조회는 계산 없이 반환합니다.
+# 보유 종목(종목, 수량, 통화)이 바뀌면 지문이 바뀌므로 따로 무효화할 필요가 없습니다.
+
+import hashlib
+from datetime import date, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .portfolio import close_matrix, ensure_coverage, krw_value_matrix, missing_fx_pairs, shares_by_ticker
+
+# 베타를 계산할 기준 지수
+BENCHMARKS = getattr(settings, 'FINDATA_RISK_BENCHMARKS', ['KS11', 'IXIC'])
+
+# 연율화에 쓰는 1년 거래일 수
+TRADING_DAYS = 252
+
+# 위험 지표 결과 캐시 시간(초)
+RISK_CACHE_TTL = getattr(settings, 'FINDATA_RISK_CACHE_TTL', 60 * 60 * 12)
+
+# 시세나 환율이 없는 종목이 있거나 포트폴리오 지표를 계산할 날이 없는 결과는 곧 다시 계산하도록 짧게만 캐시합니다.
+RISK_PARTIAL_CACHE_TTL = 60
+
+
+def holdings_fingerprint(holdings):
+    """
+    보유 종목(종목 코드, 수량, 통화)의 지문. 순서와 계좌 구성에 상관없이 같은 보유 현황이면 같은 값입니다.
+    """
+    shares, currencies = shares_by_ticker(holdings)
+    payload = '|'.join(f"{ticker}:{shares[ticker]}:{currencies[ticker]}" for ticker in sorted(shares))
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def daily_returns(prices):
+    """
+    날짜 x 종목 가격 배열의 일간 수익률 배열 (첫 날 제외, 가격이 없으면 NaN)
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return prices[1:] / prices[:-1] - 1
+
+
+def annualized_volatility(returns):
+    """
+    컬럼별 연율화 변동성(%). 수익률이 2개 미만이면 NaN.
+    """
+    counts = np.isfinite(returns).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = np.nansum(returns, axis=0) / counts
+        variance = np.nansum((returns - mean) ** 2, axis=0) / (counts - 1)
+    variance[counts < 2] = np.nan
+    return np.sqrt(variance * TRADING_DAYS) * 100
+
+
+def max_drawdown(prices):
+    """
+    컬럼별 최대 낙폭(%, 0 이하). 가격이 없는 컬럼은 NaN.
+    """
+    peaks = np.fmax.accumulate(prices, axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = prices / peaks - 1
+    finite = np.isfinite(drawdowns)
+    worst = np.where(finite, drawdowns, np.inf).min(axis=0)
+    worst[~finite.any(axis=0)] = np.nan
+    return worst * 100
+
+
+def betas(returns, benchmark_returns):
+    """
+    returns(날짜 x 종목)의 컬럼별, benchmark_returns(날짜 x 지수)의 지수별 베타 배열 (종목 x 지수)
+    각 (종목, 지수) 쌍마다 둘 다 수익률이 있는 날만 사용합니다.
+    """
+    x = returns[:, :, None]
+    y = benchmark_returns[:, None, :]
+    mask = np.isfinite(x) & np.isfinite(y)
+    counts = mask.sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_mean = np.where(mask, x, 0).sum(axis=0) / counts
+        y_mean = np.where(mask, y, 0).sum(axis=0) / counts
+        x_dev = np.where(mask, x - x_mean, 0)
+        y_dev = np.where(mask, y - y_mean, 0)
+        covariance = (x_dev * y_dev).sum(axis=0)
+        variance = (y_dev ** 2).sum(axis=0)
+        result = covariance / variance
+    result[(counts < 2) | (variance == 0)] = np.nan
+    return result
+
+
+def correlation_matrix(returns):
+    """
+    컬럼 간 상관계수 행렬 (종목 x 종목). 두 종목의 수익률이 모두 있는 날만 사용합니다.
+    """
+    present = np.isfinite(returns).astype(float)
+    values = np.where(present > 0, returns, 0.0)
+    counts = present.T @ present                # 두 종목 모두 있는 날 수
+    sum_x = values.T @ present                  # [i, j]: j도 있는 날의 i 수익률 합
+    sum_xx = (values ** 2).T @ present
+    sum_xy = values.T @ values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        covariance = sum_xy - sum_x * sum_x.T / counts
+        variance_x = sum_xx - sum_x ** 2 / counts
+        result = covariance / np.sqrt(variance_x * variance_x.T)
+    result[counts < 2] = np.nan
+    np.fill_diagonal(result, np.where(np.diag(counts) >= 2, 1.0, np.nan))
+    return np.clip(result, -1.0, 1.0)
+
+
+def _clean(values, digits=4):
+    # JSON으로 보낼 수 있도록 반올림하고 NaN은 None으로 바꿉니다.
+    values = np.round(np.asarray(values, dtype=float), digits)
+    return [value if value == value else None for value in values.tolist()]
+
+
+def risk_metrics(holdings, as_of=None, days=365):
+    """
+    보유 종목 DataFrame(portfolio.load_holdings)의 위험 지표를 계산합니다. (로컬 시세 저장소만 사용)
+    as_of 날짜(기본: 오늘)까지 days일 동안의 일별 종가를 사용합니다.
+
+    반환값 (JSON으로 보낼 수 있는 dict):
+      - portfolio: {'volatility', 'max_drawdown', 'beta': {지수: 값}}
+      - tickers: [{'ticker', 'weight'(원화 평가액 비중 %), 'volatility', 'max_drawdown', 'beta'}]
+      - correlation: {'tickers': [...], 'matrix': [[...]]}
+      - missing: 시세가 없어 제외한 종목
+      - missing_fx: 기간 내 원화 환율이 없는 환율 종목 코드 (포트폴리오 지표와 비중을 계산할 수 없음)
+    """
+    as_of = as_of or date.today()
+    start = as_of - timedelta(days=days)
+    shares, currencies = shares_by_ticker(holdings)
+    tickers = list(shares)
+
+    # 보유 종목과 지수를 한 번의 조회로 같은 날짜 축에 놓습니다.
+    columns = tickers + [benchmark for benchmark in BENCHMARKS if benchmark not in shares]
+    matrix = close_matrix(columns, start, as_of)
+    available = matrix.notna().any(axis=0)
+    missing = [ticker for ticker in tickers if not available.get(ticker, False)]
+    priced = [ticker for ticker in tickers if ticker not in missing]
+    missing_fx = missing_fx_pairs([currencies[ticker] for ticker in priced], matrix.index)
+
+    closes = matrix[priced]
+    prices = closes.to_numpy(dtype=float)
+    returns = daily_returns(prices)
+    benchmark_returns = daily_returns(matrix.reindex(columns=BENCHMARKS).to_numpy(dtype=float))
+
+    # 포트폴리오 원화 평가액: 모든 종목의 시세가 있는 날부터
+    values = krw_value_matrix(closes, shares, currencies)
+    complete = np.isfinite(values).all(axis=1) if priced else np.zeros(len(values), dtype=bool)
+    nav = np.where(complete, values.sum(axis=1), np.nan)[:, None]
+    nav_returns = daily_returns(nav)
+
+    last_values = values[complete][-1] if complete.any() else np.full(len(priced), np.nan)
+    weights = last_values / last_values.sum() * 100 if complete.any() else last_values
+
+    ticker_volatility = annualized_volatility(returns)
+    ticker_drawdown = max_drawdown(prices)
+    ticker_beta = betas(returns, benchmark_returns)
+    portfolio_beta = betas(nav_returns, benchmark_returns)[0]
+
+    return {
+        'as_of': as_of.isoformat(),
+        'start': start.isoformat(),
+        'days': int(complete.sum()),
+        'benchmarks': list(BENCHMARKS),
+        'portfolio': {
+            'volatility': _clean(annualized_volatility(nav_returns))[0],
+            'max_drawdown': _clean(max_drawdown(nav))[0],
+            'beta': dict(zip(BENCHMARKS, _clean(portfolio_beta))),
+        },
+        'tickers': [
+            {
+                'ticker': ticker,
+                'weight': weight,
+                'volatility': volatility,
+                'max_drawdown': drawdown,
+                'beta': dict(zip(BENCHMARKS, beta)),
+            }
+            for ticker, weight, volatility, drawdown, beta in zip(
+                priced,
+                _clean(weights, 2),
+                _clean(ticker_volatility),
+                _clean(ticker_drawdown),
+                [_clean(row) for row in ticker_beta],
+            )
+        ],
+        'correlation': {
+            'tickers': priced,
+            'matrix': [_clean(row) for row in correlation_matrix(returns)],
+        },
+        'missing': missing,
+        'missing_fx': list(missing_fx.values()),
+    }
+
+
+def portfolio_risk(user, holdings, as_of=None, days=365):
+    """
+    risk_metrics 결과를 (사용자, 보유 종목 지문, 기준일, 기간)별로 캐시해서 반환합니다.
+    캐시에 없으면 모자란 시세만 받아 두고(ensure_coverage) 계산합니다.
+    """
+    as_of = as_of or date.today()
+    key = f"risk:{user.pk}:{holdings_fingerprint(holdings)}:{as_of.isoformat()}:{days}"
+    result = cache.get(key)
+    if result is not None:
+        return result
+
+    start = as_of - timedelta(days=days)
+    ensure_coverage(list(holdings['ticker_code'].unique()) + list(BENCHMARKS), holdings['currency'].unique(), start)
+    result = risk_metrics(holdings, as_of, days)
+    partial = result['missing'] or result['missing_fx'] or result['days'] == 0
+    cache.set(key, result, RISK_PARTIAL_CACHE_TTL if partial else RISK_CACHE_TTL)
+    return result
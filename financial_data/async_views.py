@@ -0,0 +1,131 @@
+# financial_data/async_views.py
+# 금융 데이터 화면의 비동기(ASGI) 버전
+#
+# 동기 뷰는 외부 시세를 기다리는 동안 워커 스레드 하나를 통째로 붙잡습니다.
+# ASGI(uvicorn/daphne 등)로 띄우면 아래 뷰들은 기다리는 동안 이벤트 루프를 양보하므로,
+# 느린 외부 API가 있어도 같은 워커가 다른 요청을 계속 처리할 수 있습니다.
+#   - 외부 호출과 DB 조회는 공용 I/O 풀(io_pool)에서 실행하고 asyncio로 기다립니다.
+#   - 이벤트 루프마다 동시에 기다리는 작업 수를 FINDATA_ASYNC_MAX_CONCURRENCY로 제한합니다.
+#   - 작업마다 제한 시간(FINDATA_IO_TIMEOUT)을 두고, 넘기면 동기 뷰와 똑같이 'N/A'로 표시합니다.
+# 화면 구성(context)은 동기 뷰와 같은 함수(views.py)를 사용합니다.
+
+import asyncio
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from . import io_pool, market
+from .forms import SearchForm
+from .portfolio import HOLDING_COLUMNS, holdings_frame, holdings_queryset
+from .quotes import quote_cache
+from .symbols import get_search_index
+from .views import build_holdings_context, load_search_history, resolve_search_query
+
+# 이벤트 루프 하나에서 동시에 기다리는 I/O 작업 수 상한
+ASYNC_MAX_CONCURRENCY = getattr(settings, 'FINDATA_ASYNC_MAX_CONCURRENCY', 32)
+
+# 이벤트 루프별 세마포어 (asyncio 객체는 만든 루프에서만 쓸 수 있습니다)
+_loop_slots = weakref.WeakKeyDictionary()
+
+_render = sync_to_async(render)
+
+
+def _slots():
+    loop = asyncio.get_running_loop()
+    slots = _loop_slots.get(loop)
+    if slots is None:
+        slots = _loop_slots[loop] = asyncio.Semaphore(ASYNC_MAX_CONCURRENCY)
+    return slots
+
+
+async def run_io(fn, *args, timeout=None):
+    """
+    fn을 공용 I/O 풀에서 실행하고 결과를 기다립니다. (이벤트 루프를 막지 않습니다)
+    제한 시간을 넘기면 asyncio.TimeoutError를 발생시킵니다. (작업은 뒤에서 계속 진행)
+    """
+    async with _slots():
+        future = asyncio.wrap_future(io_pool.submit(fn, *args))
+        return await asyncio.wait_for(future, io_pool.IO_TIMEOUT if timeout is None else timeout)
+
+
+@login_required
+async def my_stock_holdings_async(request):
+    """
+    my_stock_holdings의 비동기 버전
+    """
+    user = await request.auser()
+
+    rows = [row async for row in holdings_queryset(user).values_list(*HOLDING_COLUMNS)]
+    holdings = holdings_frame(rows)
+    unique_tickers = holdings['ticker_code'].unique().tolist()
+
+    # 종목별 조회 Future를 이벤트 루프에서 바로 기다립니다. (조회만 공용 풀에서 실행)
+    # 제한 시간 안에 받지 못한 종목은 'N/A'.
+    price_data = {}
+    if unique_tickers:
+        price_data = await quote_cache.aget_many(unique_tickers)
+
+    # 원화 환산(환율 조회)이 DB를 읽으므로 스레드에서 만듭니다.
+    context = await sync_to_async(build_holdings_context)(holdings, price_data)
+    return await _render(request, 'financial_data/stock_holdings.html', context)
+
+
+async def search_data_async(request):
+    """
+    search_data의 비동기 버전
+    """
+    form = SearchForm(request.GET or None)
+    results = None
+    query = None
+
+    # 주요 지표는 마지막 스냅샷을 바로 보여주고, 오래되었으면 백그라운드에서 새로 받습니다.
+    market_overview = await sync_to_async(market.get_overview)()
+
+    if form.is_valid():
+        query = form.cleaned_data.get('query')
+        start_date = form.cleaned_data.get('start_date')
+        end_date = form.cleaned_data.get('end_date')
+
+        if query:
+            original_query = query
+            found_ticker = await sync_to_async(resolve_search_query, thread_sensitive=False)(query)
+
+            if found_ticker:
+                query = found_ticker
+                try:
+                    df = await run_io(load_search_history, query, start_date, end_date)
+                    results = df.to_html(classes='table table-striped table-hover', border=0)
+                except Exception as e:
+                    messages.error(request, f"'{original_query}'에 대한 데이터를 찾을 수 없습니다. 올바른 검색어를 입력해주세요.")
+                    print(f"Error fetching data for {query}: {e}")
+            else:
+                messages.error(request, f"'{original_query}'에 대한 종목 코드를 찾을 수 없습니다. 올바른 회사 이름 또는 종목 코드를 입력해주세요.")
+
+    context = {
+        'form': form,
+        'results': results,
+        'query': query,
+        'market_data': market_overview['items'],
+        'market_data_updated_at': market_overview['updated_at'],
+    }
+    return await _render(request, 'financial_data/search.html', context)
+
+
+async def search_stock_ticker_async(request):
+    """
+    search_stock_ticker의 비동기 버전
+    """
+    query = request.GET.get('q', '').strip()
+    results = []
+
+    if query:
+        # 인덱스가 처음 만들어질 때는 스냅샷을 읽으므로 스레드에서 실행합니다.
+        index = await sync_to_async(get_search_index, thread_sensitive=False)()
+        results = index.search(query, limit=20)
+
+    return JsonResponse({'results': results}, safe=False)
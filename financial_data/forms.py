@@ -1,9 +1,47 @@
 # financial_data/forms.py
 from django import forms
+from django.conf import settings
 from manage_account.models import StockContent, StockAccount
-import FinanceDataReader as fdr
 import math
+from concurrent.futures import TimeoutError
 from datetime import date, timedelta
+from .symbols import get_symbol_resolver
+from . import io_pool, price_store
+
+# 종목 목록에 없는 코드를 FinanceDataReader로 확인할 때 기다리는 최대 시간(초)
+VALIDATION_TIMEOUT = getattr(settings, 'FINDATA_TICKER_VALIDATION_TIMEOUT', 5)
+
+
+def expected_currency(ticker_code, symbol=None):
+    """
+    종목의 거래 통화. 종목 목록에 있으면 거래소 기준, 없으면 코드 모양으로 판별합니다.
+    ('005930' 같은 숫자 코드와 'BTC/KRW'처럼 원화로 거래되는 코드는 원화, 나머지는 달러)
+    """
+    if symbol and symbol['currency']:
+        return symbol['currency']
+    if ticker_code.isdigit() or ticker_code.endswith('/KRW'):
+        return '원화'
+    return '달러'
+
+
+def currency_error(ticker_code, currency, symbol=None):
+    """
+    종목 코드와 통화가 맞지 않으면 오류 메시지를, 맞으면 None을 반환합니다.
+    symbol: 종목 목록에서 찾은 종목 정보 (SymbolResolver.resolve 결과)
+    """
+    if symbol and symbol['currency']:
+        # 종목 목록의 거래소 정보로 거래 통화를 정합니다.
+        if currency != symbol['currency']:
+            return f"{symbol['name']}({symbol['exchange']}) 종목은 '{symbol['currency']}'를 선택해야 합니다."
+        return None
+
+    # 종목 목록에 없는 코드는 코드 모양으로 판별합니다.
+    if ticker_code.isdigit() and currency == '달러':
+        return "한국 주식 종목은 '원화'를 선택해야 합니다."
+    # 'BTC/KRW'와 같이 원화로 거래되는 종목은 원화를 선택할 수 있습니다.
+    if not ticker_code.isdigit() and currency == '원화' and not ticker_code.endswith('/KRW'):
+        return "해외 주식 종목은 '달러'를 선택해야 합니다."
+    return None
 
 
 class StockHoldingForm(forms.ModelForm):
@@ -33,24 +71,41 @@ class StockHoldingForm(forms.ModelForm):
     def __init__(self, *args, **kwargs):
         user = kwargs.pop('user', None)
         super().__init__(*args, **kwargs)
+        # 종목 목록에서 찾은 종목 정보 (clean_ticker_code에서 채웁니다)
+        self.symbol = None
         if user:
             # 현재 로그인한 사용자의 주식 계좌만 선택지로 제공
             self.fields['st_id'].queryset = StockAccount.objects.filter(st_user_id=user)
     
     def clean_ticker_code(self):
         """
-        입력된 종목 코드가 FinanceDataReader에 존재하는지 검증합니다.
+        입력된 종목 코드가 존재하는지 검증합니다.
+        종목 목록 스냅샷과 로컬 시세 저장소에서 먼저 확인하고,
+        둘 다 없는 코드('BTC/KRW' 등)만 제한 시간 안에서 FinanceDataReader로 확인합니다.
         """
         ticker_code = self.cleaned_data.get('ticker_code')
         if not ticker_code:
             raise forms.ValidationError("종목 코드를 입력해주세요.")
             
-        ticker_code = ticker_code.upper()
+        ticker_code = ticker_code.strip().upper()
+
+        # 'KRX:005930', '005930.KS'처럼 거래소가 붙은 코드는 종목 목록의 정식 코드로 바꿉니다.
+        # 종목 목록에 있으면 상장 종목이므로 네트워크 확인 없이 통과합니다.
+        self.symbol = get_symbol_resolver().resolve(ticker_code)
+        if self.symbol:
+            return self.symbol['code']
 
         try:
-            df = fdr.DataReader(ticker_code)
-            if df.empty or math.isnan(df.iloc[-1]['Close']):
+            # 이미 받아 둔 시세가 있으면 그대로 사용합니다.
+            latest_row = price_store.latest(ticker_code, refresh=False)
+            if latest_row is None or math.isnan(latest_row['Close']):
+                latest_row = io_pool.call(price_store.latest, ticker_code, timeout=VALIDATION_TIMEOUT)
+            if latest_row is None or math.isnan(latest_row['Close']):
                 raise forms.ValidationError(f"'{ticker_code}' 종목 데이터를 찾을 수 없습니다. 올바른 종목 코드를 입력해주세요.")
+        except forms.ValidationError:
+            raise
+        except TimeoutError:
+            raise forms.ValidationError(f"'{ticker_code}' 종목 데이터 조회가 지연되고 있습니다. 잠시 후 다시 시도해주세요.")
         except Exception:
             raise forms.ValidationError(f"'{ticker_code}' 종목 데이터를 찾을 수 없습니다.")
 
@@ -65,18 +120,9 @@ class StockHoldingForm(forms.ModelForm):
         currency = cleaned_data.get('currency')
 
         if ticker_code and currency:
-            # FinanceDataReader가 주식 코드를 판별하는 간단한 로직을 적용
-            is_korean_stock = ticker_code.isdigit()
-            
-            if is_korean_stock and currency == '달러':
-                raise forms.ValidationError("한국 주식 종목은 '원화'를 선택해야 합니다.")
-            
-            if not is_korean_stock and currency == '원화':
-                # 'BTC/KRW'와 같이 원화로 거래되는 종목도 있으므로 추가적인 검증이 필요
-                korean_currency_tickers = ['BTC/KRW', 'ETH/KRW', 'USD/KRW']
-                if ticker_code not in korean_currency_tickers:
-                    raise forms.ValidationError("해외 주식 종목은 '달러'를 선택해야 합니다.")
-                    
+            error = currency_error(ticker_code, currency, self.symbol)
+            if error:
+                raise forms.ValidationError(error)
         return cleaned_data
     def clean_share(self):
         """
@@ -134,4 +180,161 @@ class SearchForm(forms.Form):
             today = date.today()
             five_days_ago = today - timedelta(days=5)
             self.initial['end_date'] = today
-            self.initial['start_date'] = five_days_ago
\ No newline at end of file
+            self.initial['start_date'] = five_days_ago
+
+class PortfolioHistoryForm(forms.Form):
+    account = forms.ModelChoiceField(
+        queryset=StockAccount.objects.none(),
+        label='주식 계좌',
+        required=False,
+        empty_label='전체 계좌',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    start_date = forms.DateField(
+        label='시작일',
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+    end_date = forms.DateField(
+        label='종료일',
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        if user:
+            # 현재 로그인한 사용자의 주식 계좌만 선택지로 제공
+            self.fields['account'].queryset = StockAccount.objects.filter(st_user_id=user)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # 기간을 주지 않으면 최근 1년
+        end_date = cleaned_data.get('end_date') or date.today()
+        start_date = cleaned_data.get('start_date') or end_date - timedelta(days=365)
+        if start_date > end_date:
+            raise forms.ValidationError("시작일은 종료일보다 이전이어야 합니다.")
+        cleaned_data['start_date'] = start_date
+        cleaned_data['end_date'] = end_date
+        return cleaned_data
+
+
+class PriceHistoryForm(forms.Form):
+    INTERVAL_CHOICES = [
+        ('daily', '일'),
+        ('weekly', '주'),
+        ('monthly', '월'),
+    ]
+
+    ticker = forms.CharField(label='종목', max_length=50)
+    start_date = forms.DateField(label='시작일', required=False)
+    end_date = forms.DateField(label='종료일', required=False)
+    interval = forms.ChoiceField(label='주기', choices=INTERVAL_CHOICES, required=False)
+    columns = forms.CharField(label='컬럼', required=False)
+    max_points = forms.IntegerField(label='최대 개수', required=False, min_value=2, max_value=5000)
+
+    def clean_columns(self):
+        """
+        'Open,Close'처럼 쉼표로 구분한 컬럼 목록을 검증합니다. 비어 있으면 전체 컬럼.
+        """
+        columns = [column.strip().capitalize() for column in self.cleaned_data.get('columns', '').split(',') if column.strip()]
+        unknown = [column for column in columns if column not in price_store.PRICE_COLUMNS]
+        if unknown:
+            raise forms.ValidationError(f"알 수 없는 컬럼입니다: {', '.join(unknown)}")
+        return columns or list(price_store.PRICE_COLUMNS)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # 기간을 주지 않으면 최근 1년, 주기는 일, 최대 개수는 500
+        end_date = cleaned_data.get('end_date') or date.today()
+        start_date = cleaned_data.get('start_date') or end_date - timedelta(days=365)
+        if start_date > end_date:
+            raise forms.ValidationError("시작일은 종료일보다 이전이어야 합니다.")
+        cleaned_data['start_date'] = start_date
+        cleaned_data['end_date'] = end_date
+        cleaned_data['interval'] = cleaned_data.get('interval') or 'daily'
+        cleaned_data['max_points'] = cleaned_data.get('max_points') or 500
+        return cleaned_data
+
+
+class PortfolioRiskForm(forms.Form):
+    PERIOD_CHOICES = [
+        ('90', '3개월'),
+        ('182', '6개월'),
+        ('365', '1년'),
+        ('1095', '3년'),
+    ]
+
+    account = forms.ModelChoiceField(
+        queryset=StockAccount.objects.none(),
+        label='주식 계좌',
+        required=False,
+        empty_label='전체 계좌',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    as_of = forms.DateField(
+        label='기준일',
+        required=False,
+        widget=forms.DateInput(attrs={'type': 'date', 'class': 'form-control'})
+    )
+    days = forms.TypedChoiceField(
+        label='기간',
+        choices=PERIOD_CHOICES,
+        coerce=int,
+        required=False,
+        empty_value=None,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        if user:
+            # 현재 로그인한 사용자의 주식 계좌만 선택지로 제공
+            self.fields['account'].queryset = StockAccount.objects.filter(st_user_id=user)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        # 기준일을 주지 않으면 오늘, 기간은 최근 1년
+        as_of = cleaned_data.get('as_of') or date.today()
+        if as_of > date.today():
+            raise forms.ValidationError("기준일은 오늘 이전이어야 합니다.")
+        cleaned_data['as_of'] = as_of
+        cleaned_data['days'] = cleaned_data.get('days') or 365
+        return cleaned_data
+
+
+class HoldingsImportForm(forms.Form):
+    file = forms.FileField(
+        label='보유 종목 파일 (CSV, XLSX)',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.xlsx'})
+    )
+    account = forms.ModelChoiceField(
+        queryset=StockAccount.objects.none(),
+        label='기본 계좌',
+        required=False,
+        empty_label='파일의 계좌번호 사용',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    skip_invalid = forms.BooleanField(
+        label='오류가 없는 줄만 저장',
+        required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+
+    def __init__(self, *args, **kwargs):
+        user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        if user:
+            # 현재 로그인한 사용자의 주식 계좌만 선택지로 제공
+            self.fields['account'].queryset = StockAccount.objects.filter(st_user_id=user)
+
+    def clean_file(self):
+        """
+        CSV, XLSX 파일만 받습니다. (내용은 holdings_import.read_holdings_file에서 확인)
+        """
+        uploaded = self.cleaned_data['file']
+        if not uploaded.name.lower().endswith(('.csv', '.xlsx')):
+            raise forms.ValidationError("CSV 또는 XLSX 파일만 올릴 수 있습니다.")
+        return uploaded
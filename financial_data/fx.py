@@ -0,0 +1,153 @@
+# financial_data/fx.py
+# 환율(USD/KRW, EUR/KRW) 캐시와 원화 환산
+#
+# 보유 현황은 원화/달러 합계를 따로 보여 주기만 하고 서로 환산하지 않았습니다.
+# 환율도 시세와 같은 방식으로 로컬 시세 저장소(DailyPrice, 종목 코드 'USD/KRW' 등)에 일별로 쌓아 두고,
+#   - 프로세스 안에서는 FX_TTL 동안 메모리의 환율 이력을 그대로 사용하고
+#   - FX_TTL이 지나면 저장소를 다시 읽으며, 저장소도 FX_TTL보다 오래되었으면 백그라운드에서 한 번만 새로 받습니다.
+# 날짜별 환산은 저장된 일별 환율에서 그 날짜 이전 가장 가까운 환율(휴일이면 직전 영업일)을 사용하므로,
+# 기간 전체를 환산해도 외부 호출은 없습니다.
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.utils import timezone
+
+from . import price_store
+from .models import PriceSeries
+from .quotes import schedule_refresh
+
+# 환율 이력을 다시 읽기 전까지 기다리는 시간(초)
+FX_TTL = getattr(settings, 'FINDATA_FX_TTL', 60 * 60)
+
+# 보유 현황 통화 -> 원화 환율 종목 코드 (원화는 환율 1)
+BASE_CURRENCY = '원화'
+FX_PAIRS = {
+    '달러': 'USD/KRW',
+    '유로': 'EUR/KRW',
+}
+
+_rates = {}   # 환율 종목 코드 -> (읽은 시각, 종가 Series)
+_rates_lock = threading.Lock()
+
+
+def _needs_refresh(pair):
+    series = PriceSeries.objects.filter(ticker=pair).first()
+    if series is None or series.synced_at is None:
+        return True
+    return (timezone.now() - series.synced_at).total_seconds() > FX_TTL
+
+
+def rate_history(currency):
+    """
+    통화의 일별 원화 환율(날짜 인덱스 종가 Series)을 반환합니다. 원화면 None, 아직 받은 환율이 없으면 빈 Series.
+    FX_TTL 동안은 메모리에 있는 이력을 그대로 사용합니다.
+    """
+    pair = FX_PAIRS.get(currency)
+    if pair is None:
+        return None
+
+    now = time.monotonic()
+    with _rates_lock:
+        entry = _rates.get(pair)
+    if entry is not None and now - entry[0] < FX_TTL:
+        return entry[1]
+
+    try:
+        rates = price_store.load_history(pair)['Close'].dropna()
+        if rates.empty or _needs_refresh(pair):
+            # 요청은 기다리지 않고, 갱신은 백그라운드에서 한 번만 진행합니다.
+            schedule_refresh(pair)
+    except Exception as e:
+        print(f"Error loading FX rates for {pair}: {e}")
+        return entry[1] if entry is not None else pd.Series(dtype=float)
+
+    # 아직 받은 환율이 없으면 짧게만 기억해 두고 곧 다시 읽습니다.
+    fetched_at = now if not rates.empty else now - FX_TTL + 5
+    with _rates_lock:
+        _rates[pair] = (fetched_at, rates)
+    return rates
+
+
+def rate(currency, on=None):
+    """
+    on 날짜(기본: 가장 최근)의 원화 환율을 반환합니다. 원화면 1.0, 환율이 없으면 None.
+    """
+    if currency == BASE_CURRENCY:
+        return 1.0
+    rates = rate_history(currency)
+    if rates is None or rates.empty:
+        return None
+    if on is None:
+        return float(rates.iloc[-1])
+    value = rates.asof(pd.Timestamp(on))
+    return None if pd.isna(value) else float(value)
+
+
+def rates_on(currency, dates):
+    """
+    날짜 배열 각각의 원화 환율 배열을 반환합니다. (직전 영업일 환율로 채움, 없으면 NaN)
+    """
+    dates = pd.DatetimeIndex(dates)
+    if currency == BASE_CURRENCY:
+        return np.ones(len(dates))
+    rates = rate_history(currency)
+    if rates is None or rates.empty:
+        return np.full(len(dates), np.nan)
+    return rates.reindex(rates.index.union(dates)).ffill().reindex(dates).to_numpy(dtype=float)
+
+
+def to_krw(amounts, currency, dates=None):
+    """
+    금액(숫자 또는 배열)을 원화로 환산합니다.
+    dates를 주면 금액마다 그 날짜의 환율을, 없으면 가장 최근 환율을 사용합니다. 환율이 없으면 NaN.
+    """
+    amounts = np.asarray(amounts, dtype=float)
+    if dates is not None:
+        return amounts * rates_on(currency, dates)
+    current = rate(currency)
+    return amounts * (np.nan if current is None else current)
+
+
+def consolidate_totals(total_by_currency, on=None):
+    """
+    통화별 합계(portfolio.value_holdings)를 on 날짜(기본: 최근) 환율로 원화 환산해 하나로 합칩니다.
+    매수 금액도 같은 환율로 환산합니다. (매수 당시 환율은 저장하지 않으므로)
+    환율을 구하지 못한 통화가 있으면 None을 반환합니다.
+    """
+    purchase_amount = 0.0
+    current_value = 0.0
+    rates = {}
+    for currency, totals in total_by_currency.items():
+        if not totals['purchase_amount'] and not totals['current_value']:
+            continue
+        fx_rate = rate(currency, on)
+        if fx_rate is None:
+            return None
+        rates[currency] = fx_rate
+        purchase_amount += totals['purchase_amount'] * fx_rate
+        current_value += totals['current_value'] * fx_rate
+
+    profit_loss = 0
+    profit_rate = 0
+    if purchase_amount != 0:
+        profit_loss = current_value - purchase_amount
+        profit_rate = (profit_loss / purchase_amount) * 100
+    return {
+        'purchase_amount': purchase_amount,
+        'current_value': current_value,
+        'profit_loss': profit_loss,
+        'profit_rate': profit_rate,
+        'rates': {currency: fx_rate for currency, fx_rate in rates.items() if currency != BASE_CURRENCY},
+    }
+
+
+def invalidate(currency=None):
+    with _rates_lock:
+        if currency is None:
+            _rates.clear()
+        else:
+            _rates.pop(FX_PAIRS.get(currency), None)
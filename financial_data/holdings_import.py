@@ -0,0 +1,269 @@
+# financial_data/holdings_import.py
+# 보유 종목 일괄 등록 (CSV / XLSX 업로드)
+#
+# 보유 종목 추가 화면은 한 번에 한 종목씩, 종목마다 네트워크 확인과 평균 매수가 읽기-수정-쓰기를 합니다.
+# 일괄 등록은 파일 전체를
+#   1. 한 번에 읽어 줄마다 값(계좌, 수량, 매수가, 통화)을 검증하고
+#   2. 종목 코드를 모아 종목 목록(SymbolResolver)과 로컬 시세 저장소에서 한 번에 확인하고 (네트워크 사용 없음)
+#   3. (계좌, 종목 코드, 통화)가 같은 줄과 이미 보유 중인 종목을 메모리에서 합친 뒤 (수량 합계, 가중 평균 매수가)
+#   4. 한 트랜잭션 안에서 bulk_create / bulk_update로 저장합니다.
+# 오류가 있는 줄은 줄 번호와 함께 보고하고, 기본값으로는 아무것도 저장하지 않습니다. (skip_invalid=True면 오류 없는 줄만 저장)
+
+import math
+from io import StringIO
+from pathlib import Path
+
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+
+from manage_account.models import StockAccount, StockContent
+from .forms import currency_error, expected_currency
+from .models import DailyPrice
+from .symbols import get_symbol_resolver
+
+# 한 번에 올릴 수 있는 최대 줄 수
+IMPORT_MAX_ROWS = getattr(settings, 'FINDATA_IMPORT_MAX_ROWS', 2000)
+
+# 파일 머리글 -> 필드 이름 (공백, 밑줄, 대소문자 무시)
+COLUMN_ALIASES = {
+    'account': 'account',
+    'accountnumber': 'account',
+    'staccnum': 'account',
+    '계좌': 'account',
+    '계좌번호': 'account',
+    'ticker': 'ticker_code',
+    'tickercode': 'ticker_code',
+    'symbol': 'ticker_code',
+    'code': 'ticker_code',
+    '종목': 'ticker_code',
+    '종목코드': 'ticker_code',
+    'share': 'share',
+    'shares': 'share',
+    'quantity': 'share',
+    '수량': 'share',
+    '보유수량': 'share',
+    '매수수량': 'share',
+    'puramount': 'pur_amount',
+    'price': 'pur_amount',
+    'cost': 'pur_amount',
+    '매수가': 'pur_amount',
+    '매수평균가': 'pur_amount',
+    'currency': 'currency',
+    '통화': 'currency',
+}
+
+# 꼭 있어야 하는 컬럼 -> 오류 메시지에 쓰는 이름
+REQUIRED_COLUMNS = {
+    'ticker_code': '종목코드',
+    'share': '수량',
+    'pur_amount': '매수가',
+}
+
+CURRENCIES = [code for code, _ in StockContent.CURRENCY_CHOICES]
+
+
+class ImportFileError(ValueError):
+    """파일을 읽을 수 없거나 필요한 컬럼이 없을 때"""
+
+
+def _header_key(name):
+    return ''.join(str(name).split()).replace('_', '').casefold()
+
+
+def read_holdings_file(uploaded_file):
+    """
+    업로드한 CSV / XLSX 파일을 문자열 DataFrame으로 읽고 머리글을 필드 이름으로 바꿉니다.
+    """
+    suffix = Path(uploaded_file.name).suffix.lower()
+    try:
+        if suffix == '.xlsx':
+            df = pd.read_excel(uploaded_file, dtype=str)
+        elif suffix == '.csv':
+            raw = uploaded_file.read()
+            for encoding in ('utf-8-sig', 'cp949'):
+                try:
+                    text = raw.decode(encoding)
+                    break
+                except UnicodeDecodeError:
+                    continue
+            else:
+                raise ImportFileError("파일 인코딩을 알 수 없습니다. UTF-8 또는 CP949로 저장해주세요.")
+            df = pd.read_csv(StringIO(text), dtype=str, skip_blank_lines=True)
+        else:
+            raise ImportFileError("CSV 또는 XLSX 파일만 올릴 수 있습니다.")
+    except ImportFileError:
+        raise
+    except Exception as e:
+        raise ImportFileError(f"파일을 읽을 수 없습니다: {e}")
+
+    renamed = {}
+    for column in df.columns:
+        name = COLUMN_ALIASES.get(_header_key(column))
+        if name and name not in renamed.values():
+            renamed[column] = name
+    df = df[list(renamed)].rename(columns=renamed)
+
+    missing = [label for name, label in REQUIRED_COLUMNS.items() if name not in df.columns]
+    if missing:
+        raise ImportFileError(f"필요한 컬럼이 없습니다: {', '.join(missing)}")
+    df = df.dropna(how='all')
+    if len(df) > IMPORT_MAX_ROWS:
+        raise ImportFileError(f"한 번에 {IMPORT_MAX_ROWS:,}줄까지 올릴 수 있습니다. (파일: {len(df):,}줄)")
+    for column in ('account', 'currency'):
+        if column not in df.columns:
+            df[column] = None
+    return df
+
+
+def _positive_int(value, label, errors, whole=False):
+    # '1,200', '1200.0' 같은 표기도 받습니다. whole=True면 소수를 받지 않고, 아니면 반올림합니다.
+    try:
+        number = float(str(value).replace(',', '').strip())
+    except (TypeError, ValueError):
+        errors.append(f"{label} 값이 숫자가 아닙니다.")
+        return None
+    if not math.isfinite(number):
+        errors.append(f"{label} 값이 숫자가 아닙니다.")
+        return None
+    if whole and number != int(number):
+        errors.append(f"{label}은(는) 정수여야 합니다.")
+        return None
+    # 반올림한 값으로 확인합니다. (0.4 같은 값이 0으로 저장되지 않도록)
+    rounded = int(round(number))
+    if rounded <= 0:
+        errors.append(f"{label}은(는) 0보다 커야 합니다.")
+        return None
+    return rounded
+
+
+def validate_rows(df, accounts, default_account=None):
+    """
+    줄마다 값을 검증하고, 종목 코드는 모아서 한 번에 확인합니다.
+    accounts: {계좌번호: StockAccount} (사용자의 계좌만)
+    반환값: (유효한 줄 [{'account', 'ticker_code', 'share', 'pur_amount', 'currency'}], 오류 목록)
+    """
+    def text(value):
+        return '' if value is None or (isinstance(value, float) and value != value) else str(value).strip()
+
+    records = df.to_dict('records')
+    tickers = {text(record['ticker_code']).upper() for record in records} - {''}
+
+    # 종목 코드 일괄 확인: 종목 목록 -> 로컬 시세 저장소 (쿼리 한 번)
+    symbols = get_symbol_resolver().resolve_many(tickers)
+    unlisted = [ticker for ticker, info in symbols.items() if info is None]
+    stored = set(
+        DailyPrice.objects.filter(ticker__in=unlisted, close__isnull=False)
+        .values_list('ticker', flat=True).distinct()
+    ) if unlisted else set()
+
+    valid, errors = [], []
+    for number, record in zip((df.index + 2).tolist(), records):   # 파일의 줄 번호 (1번째 줄은 머리글)
+        row_errors = []
+        raw_ticker = text(record['ticker_code'])
+        ticker_code = raw_ticker.upper()
+        symbol = symbols.get(ticker_code)
+
+        account_number = text(record['account'])
+        account = accounts.get(account_number) if account_number else default_account
+        if account is None:
+            row_errors.append(f"계좌 '{account_number}'를 찾을 수 없습니다." if account_number else "계좌를 지정해주세요.")
+
+        if not ticker_code:
+            row_errors.append("종목 코드를 입력해주세요.")
+        elif symbol is not None:
+            ticker_code = symbol['code']
+        elif ticker_code not in stored:
+            row_errors.append(f"'{ticker_code}' 종목을 종목 목록에서 찾을 수 없습니다. (목록에 없는 종목은 한 종목씩 추가해주세요)")
+        elif len(ticker_code) > StockContent._meta.get_field('ticker_code').max_length:
+            row_errors.append(f"'{ticker_code}' 종목 코드가 너무 깁니다.")
+
+        share = _positive_int(record['share'], '수량', row_errors, whole=True)
+        pur_amount = _positive_int(record['pur_amount'], '매수가', row_errors)
+
+        currency = text(record['currency'])
+        if ticker_code and not currency:
+            currency = expected_currency(ticker_code, symbol)
+        if currency and currency not in CURRENCIES:
+            row_errors.append(f"통화는 {', '.join(CURRENCIES)} 중 하나여야 합니다.")
+        elif ticker_code and currency:
+            error = currency_error(ticker_code, currency, symbol)
+            if error:
+                row_errors.append(error)
+
+        if row_errors:
+            errors.append({'row': number, 'ticker_code': raw_ticker, 'errors': row_errors})
+        else:
+            valid.append({
+                'account': account,
+                'ticker_code': ticker_code,
+                'share': share,
+                'pur_amount': pur_amount,
+                'currency': currency,
+            })
+    return valid, errors
+
+
+def merge_positions(rows, existing):
+    """
+    (계좌, 종목 코드, 통화)가 같은 줄을 합치고 이미 보유 중인 종목에 더합니다. (수량 합계, 가중 평균 매수가)
+    existing: {(계좌 id, 종목 코드, 통화): StockContent}
+    반환값: (새로 만들 StockContent 목록, 수정할 StockContent 목록)
+    """
+    merged = {}
+    for row in rows:
+        key = (row['account'].pk, row['ticker_code'], row['currency'])
+        entry = merged.setdefault(key, {'account': row['account'], 'share': 0, 'cost': 0})
+        entry['share'] += row['share']
+        entry['cost'] += row['pur_amount'] * row['share']
+
+    to_create, to_update = [], []
+    for (account_id, ticker_code, currency), entry in merged.items():
+        holding = existing.get((account_id, ticker_code, currency))
+        if holding is not None:
+            total_value = holding.pur_amount * holding.share + entry['cost']
+            total_share = holding.share + entry['share']
+            holding.pur_amount = int(total_value / total_share)
+            holding.share = total_share
+            to_update.append(holding)
+        else:
+            to_create.append(StockContent(
+                st_id=entry['account'],
+                ticker_code=ticker_code,
+                share=entry['share'],
+                pur_amount=int(entry['cost'] / entry['share']),
+                currency=currency,
+            ))
+    return to_create, to_update
+
+
+def import_holdings(user, df, default_account=None, skip_invalid=False):
+    """
+    read_holdings_file로 읽은 DataFrame을 검증하고 사용자의 보유 종목에 한 트랜잭션으로 반영합니다.
+    오류가 있는 줄이 있으면 skip_invalid=True일 때만 나머지 줄을 저장합니다.
+
+    반환값: {'saved': 저장 여부, 'created': 새로 만든 보유 종목 수, 'updated': 합친 보유 종목 수,
+            'imported_rows': 저장한 줄 수, 'errors': [{'row': 줄 번호, 'ticker_code': 입력값, 'errors': [메시지]}]}
+    """
+    accounts = {account.st_acc_num: account for account in StockAccount.objects.filter(st_user_id=user)}
+    rows, errors = validate_rows(df, accounts, default_account)
+    result = {'saved': False, 'created': 0, 'updated': 0, 'imported_rows': 0, 'errors': errors}
+    if not rows or (errors and not skip_invalid):
+        return result
+
+    with transaction.atomic():
+        # 같은 (계좌, 종목, 통화)의 기존 보유 종목은 보유 현황 추가 화면과 같이 가장 먼저 만든 것에 합칩니다.
+        existing = {}
+        queryset = StockContent.objects.select_for_update().filter(
+            st_id__in={row['account'].pk for row in rows},
+            ticker_code__in={row['ticker_code'] for row in rows},
+        ).order_by('created_at', 'pk')
+        for holding in queryset:
+            existing.setdefault((holding.st_id_id, holding.ticker_code, holding.currency), holding)
+
+        to_create, to_update = merge_positions(rows, existing)
+        StockContent.objects.bulk_create(to_create, batch_size=500)
+        StockContent.objects.bulk_update(to_update, ['pur_amount', 'share'], batch_size=500)
+
+    result.update(saved=True, created=len(to_create), updated=len(to_update), imported_rows=len(rows))
+    return result
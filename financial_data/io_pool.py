@@ -0,0 +1,117 @@
+# financial_data/io_pool.py
+# 금융 데이터 I/O 전용 프로세스 공용 스레드 풀
+#
+# 예전에는 보유 현황 요청마다 ThreadPoolExecutor(10)를 새로 만들고, 호출마다 제한 시간도 없어서
+# 외부 API 하나가 멈추면 요청 전체가 끝없이 기다렸습니다.
+# 이제 financial_data의 모든 경로가 이 모듈 하나를 사용합니다.
+#   - io_executor: 프로세스당 하나인 스레드 풀 (FINDATA_IO_MAX_WORKERS)
+#   - upstream_call: 외부 API(FinanceDataReader) 동시 호출 수 상한 (FINDATA_UPSTREAM_MAX_INFLIGHT)
+#   - call / run_all: 작업별 제한 시간(FINDATA_IO_TIMEOUT). 시간 안에 끝난 결과만 돌려줍니다.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, TimeoutError, wait
+
+from django.conf import settings
+from django.db import close_old_connections
+
+# 스레드 풀 최대 크기
+IO_MAX_WORKERS = getattr(settings, 'FINDATA_IO_MAX_WORKERS', 16)
+
+# 외부 API 동시 호출 상한 (프로세스 전체)
+UPSTREAM_MAX_INFLIGHT = getattr(settings, 'FINDATA_UPSTREAM_MAX_INFLIGHT', 8)
+
+# 작업 하나를 기다리는 기본 제한 시간(초)
+IO_TIMEOUT = getattr(settings, 'FINDATA_IO_TIMEOUT', 10)
+
+io_executor = ThreadPoolExecutor(max_workers=IO_MAX_WORKERS, thread_name_prefix='findata-io')
+
+_upstream_slots = threading.BoundedSemaphore(UPSTREAM_MAX_INFLIGHT)
+
+
+class UpstreamBusy(TimeoutError):
+    """외부 API 동시 호출 상한에 걸려 제한 시간 안에 호출하지 못했을 때 발생합니다."""
+
+
+def _with_connection_cleanup(fn, *args, **kwargs):
+    # 풀 스레드는 요청/응답 주기가 없으므로 DB 연결을 직접 정리합니다.
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+def submit(fn, *args, **kwargs):
+    """
+    공용 스레드 풀에 작업을 넣고 Future를 반환합니다.
+    """
+    return io_executor.submit(_with_connection_cleanup, fn, *args, **kwargs)
+
+
+def upstream_call(fn, *args, wait_timeout=None, **kwargs):
+    """
+    외부 API 호출을 동시 호출 상한 안에서 실행합니다.
+    wait_timeout 안에 빈 자리가 나지 않으면 UpstreamBusy를 발생시킵니다.
+    """
+    if not _upstream_slots.acquire(timeout=IO_TIMEOUT if wait_timeout is None else wait_timeout):
+        raise UpstreamBusy(f"외부 API 동시 호출 상한({UPSTREAM_MAX_INFLIGHT})에 걸렸습니다.")
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _upstream_slots.release()
+
+
+def call(fn, *args, timeout=None, **kwargs):
+    """
+    작업 하나를 공용 풀에서 실행하고 결과를 기다립니다.
+    제한 시간을 넘기면 concurrent.futures.TimeoutError를 발생시킵니다. (작업은 뒤에서 계속 진행)
+    """
+    return submit(fn, *args, **kwargs).result(timeout=IO_TIMEOUT if timeout is None else timeout)
+
+
+def run_all(fn, items, timeout=None, max_concurrency=None):
+    """
+    items 각각에 fn을 공용 풀에서 실행하고, 제한 시간 안에 성공한 결과만 {item: 결과}로 반환합니다.
+    시간을 넘기거나 실패한 항목은 결과에서 빠집니다. (부분 결과)
+    max_concurrency를 주면 동시에 그 개수만큼만 실행합니다.
+    timeout=0 이면 제한 시간 없이 모두 기다립니다.
+    """
+    items = list(dict.fromkeys(items))
+    timeout = IO_TIMEOUT if timeout is None else timeout
+    deadline = None if not timeout else time.monotonic() + timeout
+    window = max_concurrency or len(items) or 1
+
+    results = {}
+    pending = {}
+    queue = iter(items)
+
+    def fill():
+        while len(pending) < window:
+            item = next(queue, _END)
+            if item is _END:
+                return
+            pending[submit(fn, item)] = item
+
+    fill()
+    while pending:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            break
+        done, _ = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        if not done:
+            break
+        for future in done:
+            item = pending.pop(future)
+            try:
+                results[item] = future.result()
+            except Exception as e:
+                print(f"Error running {getattr(fn, '__name__', fn)} for {item}: {e}")
+        fill()
+
+    for future in pending:
+        future.cancel()
+    return results
+
+
+_END = object()
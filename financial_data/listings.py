@@ -0,0 +1,350 @@
+# financial_data/listings.py
+# 종목 목록(KRX, NASDAQ, NYSE, AMEX) 스냅샷 관리 모듈
+#
+# 예전에는 views.py가 import 될 때마다 fdr.StockListing을 4번 호출했기 때문에
+# 워커가 새로 뜨거나 manage.py 명령을 실행할 때마다 네트워크 다운로드를 기다려야 했습니다.
+# 이제는 `python manage.py refresh_stock_listings` 명령으로 목록을 받아 디스크에 스냅샷으로 저장하고,
+# 워커는 그 스냅샷 파일만 열어서 사용합니다. (import 시점에는 네트워크 호출이 없습니다.)
+#
+# 스냅샷 구조 (settings.FINDATA_DIR/listings/)
+#   CURRENT                 -> 현재 사용 중인 스냅샷 버전 이름이 적힌 파일
+#   <version>/manifest.json -> 포맷 버전, 생성 시각, 거래소별 종목 수
+#   <version>/code.npy      -> 모든 거래소의 종목 코드 배열 (고정폭 유니코드, mmap 가능)
+#   <version>/name.npy      -> 회사 이름 배열
+#   <version>/exchange.npy  -> 거래소 번호 배열 (uint8, LISTING_EXCHANGES 순서)
+#
+# 워커는 이 세 배열을 mmap으로 열어 CompactListings 하나로 사용합니다.
+# (예전처럼 거래소마다 FinanceDataReader DataFrame 전체를 메모리에 들고 있지 않습니다.)
+
+import json
+import os
+import shutil
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+
+from . import io_pool
+from .providers import get_provider
+
+LISTING_EXCHANGES = ['KRX', 'NASDAQ', 'NYSE', 'AMEX']
+
+# 거래소 -> 거래소 번호 (CompactListings.exchange_ids에 저장하는 값)
+EXCHANGE_IDS = {exchange: i for i, exchange in enumerate(LISTING_EXCHANGES)}
+
+# 거래소별 종목 코드 컬럼 이름 (KRX는 'Code', 미국 거래소는 'Symbol')
+CODE_COLUMNS = {
+    'KRX': 'Code',
+    'NASDAQ': 'Symbol',
+    'NYSE': 'Symbol',
+    'AMEX': 'Symbol',
+}
+
+# 스냅샷 파일 포맷이 바뀌면 올립니다. 포맷이 다른 스냅샷은 읽지 않습니다.
+# (1: 거래소별 <거래소>.code.npy / <거래소>.name.npy 파일, 읽을 때 한 벌로 합칩니다)
+SNAPSHOT_FORMAT = 2
+LEGACY_SNAPSHOT_FORMATS = (1,)
+
+# 스냅샷에 저장하는 컬럼 (뷰에서 실제로 사용하는 컬럼만 저장)
+SNAPSHOT_COLUMNS = ('code', 'name')
+
+# 다른 워커가 새 스냅샷을 만들었는지 CURRENT 파일을 다시 확인하는 주기(초)
+# (보통은 공용 캐시의 버전 키로 바로 알게 되고, 이 주기는 캐시가 비었을 때를 위한 것입니다.)
+RELOAD_INTERVAL = 60
+
+# 현재 스냅샷 버전을 모든 워커에 알리는 공용 캐시 키
+VERSION_CACHE_KEY = 'listings:version'
+
+
+def snapshot_root():
+    return Path(settings.FINDATA_DIR) / 'listings'
+
+
+def fetch_listings():
+    """
+    시세 공급자(기본 FinanceDataReader)에서 거래소별 종목 목록을 내려받습니다. (네트워크 호출)
+    실패한 거래소는 None으로 반환합니다.
+    """
+    provider = get_provider()
+    listings = {}
+    for exchange in LISTING_EXCHANGES:
+        try:
+            listings[exchange] = io_pool.upstream_call(provider.listing, exchange)
+        except Exception as e:
+            print(f"{exchange} 종목 목록 로드 중 오류 발생: {e}")
+            listings[exchange] = None
+    return listings
+
+
+def current_version():
+    """
+    CURRENT 파일에 기록된 스냅샷 버전을 반환합니다. 스냅샷이 없으면 None.
+    """
+    try:
+        return (snapshot_root() / 'CURRENT').read_text(encoding='utf-8').strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def read_manifest(version):
+    with open(snapshot_root() / version / 'manifest.json', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _to_columns(exchange, df):
+    """
+    FinanceDataReader DataFrame에서 스냅샷에 저장할 컬럼만 numpy 배열로 꺼냅니다.
+    """
+    code_column = CODE_COLUMNS[exchange]
+    if df is None or df.empty or code_column not in df.columns or 'Name' not in df.columns:
+        return None
+    df = df.dropna(subset=[code_column])
+    return {
+        'code': df[code_column].astype(str).str.strip().to_numpy(dtype=str),
+        'name': df['Name'].fillna('').astype(str).str.strip().to_numpy(dtype=str),
+    }
+
+
+class CompactListings:
+    """
+    모든 거래소의 종목 목록을 이어 붙인 연속 배열 세 개로 보관합니다.
+      - codes: 종목 코드 (고정폭 유니코드 배열)
+      - names: 회사 이름
+      - exchange_ids: 거래소 번호 (uint8, EXCHANGE_IDS)
+    종목 순서는 스냅샷 순서(KRX -> NASDAQ -> NYSE -> AMEX)라서 거래소마다 연속된 구간입니다.
+    get(exchange)는 예전 dict[거래소] = DataFrame과 같은 모양의 DataFrame을 돌려줍니다. (배열을 복사하지 않음)
+    """
+
+    def __init__(self, codes, names, exchange_ids):
+        self.codes = codes
+        self.names = names
+        self.exchange_ids = exchange_ids
+        counts = np.bincount(exchange_ids, minlength=len(LISTING_EXCHANGES))[:len(LISTING_EXCHANGES)]
+        self.offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    @classmethod
+    def empty(cls):
+        return cls(np.array([], dtype='<U1'), np.array([], dtype='<U1'), np.array([], dtype=np.uint8))
+
+    @classmethod
+    def from_columns(cls, columns):
+        """
+        {거래소: {'code': 배열, 'name': 배열} 또는 None}을 한 벌로 합칩니다.
+        """
+        codes, names, exchange_ids = [], [], []
+        for exchange in LISTING_EXCHANGES:
+            data = columns.get(exchange)
+            if data is None or not len(data['code']):
+                continue
+            codes.append(np.asarray(data['code'], dtype=str))
+            names.append(np.asarray(data['name'], dtype=str))
+            exchange_ids.append(np.full(len(data['code']), EXCHANGE_IDS[exchange], dtype=np.uint8))
+        if not codes:
+            return cls.empty()
+        return cls(np.concatenate(codes), np.concatenate(names), np.concatenate(exchange_ids))
+
+    @classmethod
+    def from_frames(cls, listings):
+        """
+        {거래소: FinanceDataReader DataFrame}에서 종목 코드와 회사 이름만 꺼내 만듭니다.
+        """
+        return cls.from_columns({exchange: _to_columns(exchange, listings.get(exchange)) for exchange in LISTING_EXCHANGES})
+
+    def __len__(self):
+        return len(self.codes)
+
+    def exchange(self, idx):
+        """
+        종목 번호의 거래소 이름
+        """
+        return LISTING_EXCHANGES[self.exchange_ids[idx]]
+
+    def span(self, exchange):
+        """
+        거래소의 종목 번호 구간 (slice)
+        """
+        i = EXCHANGE_IDS[exchange]
+        return slice(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def columns(self, exchange):
+        span = self.span(exchange)
+        return {'code': self.codes[span], 'name': self.names[span]}
+
+    def counts(self):
+        return {exchange: int(self.offsets[i + 1] - self.offsets[i]) for i, exchange in enumerate(LISTING_EXCHANGES)}
+
+    def get(self, exchange, default=None):
+        """
+        거래소의 종목 목록을 FinanceDataReader와 같은 컬럼 이름('Code' 또는 'Symbol', 'Name')의 DataFrame으로 반환합니다.
+        """
+        if exchange not in EXCHANGE_IDS:
+            return default
+        data = self.columns(exchange)
+        return pd.DataFrame({CODE_COLUMNS[exchange]: data['code'], 'Name': data['name']}, copy=False)
+
+    def __getitem__(self, exchange):
+        if exchange not in EXCHANGE_IDS:
+            raise KeyError(exchange)
+        return self.get(exchange)
+
+    def nbytes(self):
+        """
+        세 배열의 크기(바이트). mmap으로 연 스냅샷이면 워커들이 페이지를 나눠 씁니다.
+        """
+        return int(self.codes.nbytes + self.names.nbytes + self.exchange_ids.nbytes + self.offsets.nbytes)
+
+
+def write_snapshot(listings, keep=3):
+    """
+    거래소별 DataFrame을 새 스냅샷으로 저장하고 CURRENT를 새 버전으로 교체합니다.
+
+    다운로드에 실패한 거래소(None 또는 빈 DataFrame)는 직전 스냅샷의 데이터를 그대로 이어받습니다.
+    파일은 임시 디렉터리에 먼저 쓰고 rename 하므로, 읽는 쪽은 항상 완성된 스냅샷만 보게 됩니다.
+    """
+    root = snapshot_root()
+    root.mkdir(parents=True, exist_ok=True)
+
+    previous = current_version()
+    previous_listings = None
+    version = datetime.now().strftime('%Y%m%d%H%M%S%f')
+    tmp_dir = root / f'.tmp-{version}-{os.getpid()}'
+    tmp_dir.mkdir()
+
+    try:
+        columns = {}
+        for exchange in LISTING_EXCHANGES:
+            columns[exchange] = _to_columns(exchange, listings.get(exchange))
+            if columns[exchange] is None and previous:
+                # 이번에 받지 못한 거래소는 직전 스냅샷의 데이터를 유지
+                if previous_listings is None:
+                    previous_listings = read_snapshot(previous)
+                columns[exchange] = previous_listings.columns(exchange)
+        compact = CompactListings.from_columns(columns)
+
+        np.save(tmp_dir / 'code.npy', compact.codes, allow_pickle=False)
+        np.save(tmp_dir / 'name.npy', compact.names, allow_pickle=False)
+        np.save(tmp_dir / 'exchange.npy', compact.exchange_ids, allow_pickle=False)
+        manifest = {
+            'format': SNAPSHOT_FORMAT,
+            'version': version,
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'exchanges': compact.counts(),
+        }
+        with open(tmp_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+        os.replace(tmp_dir, root / version)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+    # CURRENT 파일도 임시 파일에 쓴 뒤 교체해서 원자적으로 바꿉니다.
+    pointer_tmp = root / f'.CURRENT.{os.getpid()}'
+    pointer_tmp.write_text(version, encoding='utf-8')
+    os.replace(pointer_tmp, root / 'CURRENT')
+    publish_version(version)
+
+    prune_snapshots(keep=keep)
+    return version
+
+
+def prune_snapshots(keep=3):
+    """
+    최신 스냅샷 `keep`개만 남기고 오래된 스냅샷 디렉터리를 삭제합니다.
+    """
+    root = snapshot_root()
+    current = current_version()
+    versions = sorted(p.name for p in root.iterdir() if p.is_dir() and not p.name.startswith('.'))
+    for version in versions[:-keep] if keep > 0 else versions:
+        if version != current:
+            shutil.rmtree(root / version, ignore_errors=True)
+
+
+def read_snapshot(version=None):
+    """
+    스냅샷을 읽어 CompactListings로 반환합니다. 스냅샷이 없거나 포맷이 다르면 빈 목록.
+    배열 파일을 mmap으로 열기 때문에 거의 즉시 로드되고, 같은 장비의 워커들이 페이지를 나눠 씁니다.
+    """
+    version = version or current_version()
+    if not version:
+        return CompactListings.empty()
+
+    manifest = read_manifest(version)
+    directory = snapshot_root() / version
+    if manifest.get('format') in LEGACY_SNAPSHOT_FORMATS:
+        # 거래소별 파일을 읽어 한 벌로 합칩니다. (메모리에 복사됨, 새 스냅샷을 만들면 다시 mmap)
+        columns = {}
+        for exchange in LISTING_EXCHANGES:
+            paths = {column: directory / f'{exchange}.{column}.npy' for column in SNAPSHOT_COLUMNS}
+            if all(path.exists() for path in paths.values()):
+                columns[exchange] = {column: np.load(path, allow_pickle=False) for column, path in paths.items()}
+        return CompactListings.from_columns(columns)
+    if manifest.get('format') != SNAPSHOT_FORMAT:
+        print(f"종목 목록 스냅샷 포맷이 다릅니다. (스냅샷: {manifest.get('format')}, 필요: {SNAPSHOT_FORMAT})")
+        return CompactListings.empty()
+
+    return CompactListings(*(
+        np.load(directory / f'{name}.npy', mmap_mode='r', allow_pickle=False)
+        for name in ('code', 'name', 'exchange')
+    ))
+
+
+_loaded = {'version': None, 'listings': None, 'checked_at': 0.0}
+
+
+def get_stock_listings():
+    """
+    현재 스냅샷의 종목 목록을 반환합니다. 프로세스마다 한 번만 읽고,
+    공용 캐시의 버전 키가 바뀌었거나 RELOAD_INTERVAL이 지나면 CURRENT를 다시 확인해 새 스냅샷으로 교체합니다.
+    """
+    now = time.monotonic()
+    published = cache.get(VERSION_CACHE_KEY)
+    if (
+        _loaded['listings'] is None
+        or (published is not None and published != _loaded['version'])
+        or now - _loaded['checked_at'] > RELOAD_INTERVAL
+    ):
+        reload_stock_listings()
+    return _loaded['listings']
+
+
+def publish_version(version):
+    """
+    새 스냅샷 버전을 공용 캐시에 기록해 모든 워커가 다음 요청에서 다시 읽게 합니다.
+    """
+    try:
+        cache.set(VERSION_CACHE_KEY, version, None)
+    except Exception as e:
+        print(f"종목 목록 스냅샷 버전 공유 중 오류 발생: {e}")
+
+
+def reload_stock_listings(publish=False):
+    """
+    CURRENT가 가리키는 스냅샷을 다시 확인하고, 버전이 바뀌었으면 새로 읽습니다.
+    publish=True면 읽은 버전을 공용 캐시에 기록해 다른 워커도 다시 읽게 합니다.
+    """
+    version = current_version()
+    if _loaded['listings'] is None or version != _loaded['version']:
+        try:
+            listings = read_snapshot(version)
+        except Exception as e:
+            print(f"종목 목록 스냅샷 로드 중 오류 발생: {e}")
+            version = _loaded['version']
+            listings = _loaded['listings'] if _loaded['listings'] is not None else CompactListings.empty()
+        if version is None and _loaded['listings'] is None:
+            print("종목 목록 스냅샷이 없습니다. 'python manage.py refresh_stock_listings'를 실행해주세요.")
+        _loaded['version'] = version
+        _loaded['listings'] = listings
+    _loaded['checked_at'] = time.monotonic()
+    if publish and _loaded['version']:
+        publish_version(_loaded['version'])
+    return _loaded['listings']
+
+
+def get_listings_version():
+    get_stock_listings()
+    return _loaded['version']
@@ -0,0 +1,99 @@
+# financial_data/management/commands/listings_memory.py
+# 종목 목록과 검색 인덱스가 워커 하나에서 차지하는 메모리를 보여 줍니다.
+#
+# 사용 방법:
+#    > python manage.py listings_memory
+#    > python manage.py listings_memory --frames    # 거래소별 DataFrame으로 들고 있을 때와 비교
+#
+# 단계마다 프로세스 상주 메모리(RSS)가 얼마나 늘었는지와, 그중 워커 전용(익명 메모리) / 파일 매핑 부분을 출력합니다.
+# 스냅샷 배열은 mmap이라 파일 매핑 부분에 잡히고(같은 장비의 워커들이 페이지를 나눠 씀),
+# 검색 인덱스는 워커 전용 부분에 잡힙니다.
+
+import gc
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from financial_data import listings, symbols
+
+
+def _memory():
+    """
+    (RSS, 워커 전용(익명), 파일 매핑) 바이트. /proc/self/smaps_rollup이 없는 OS에서는 RSS만 (나머지 None)
+    """
+    try:
+        with open('/proc/self/smaps_rollup', encoding='ascii') as f:
+            fields = {}
+            for line in f:
+                name, _, value = line.partition(':')
+                if value.strip().endswith('kB'):
+                    fields[name] = int(value.split()[0]) * 1024
+        rss = fields.get('Rss', 0)
+        anonymous = fields.get('Anonymous', 0)
+        return rss, anonymous, rss - anonymous
+    except OSError:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024, None, None
+
+
+def _touch(array):
+    # mmap 배열의 페이지를 한 번씩 읽어 상주시킵니다.
+    if array.nbytes:
+        int(np.frombuffer(array, dtype=np.uint8)[::4096].sum())
+
+
+def _mb(value):
+    return 'N/A' if value is None else f"{value / 2 ** 20:,.1f}MB"
+
+
+class Command(BaseCommand):
+    help = '종목 목록, 검색 인덱스, SymbolResolver의 메모리 사용량을 출력합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--frames',
+            action='store_true',
+            help='거래소별 DataFrame(종목 코드, 이름 object 컬럼)으로 만들었을 때의 크기도 출력',
+        )
+
+    def _step(self, label, before):
+        gc.collect()
+        after = _memory()
+        delta = [None if b is None or a is None else a - b for a, b in zip(after, before)]
+        self.stdout.write(f"  {label}: RSS +{_mb(delta[0])} (전용 +{_mb(delta[1])}, 파일 매핑 +{_mb(delta[2])})")
+        return after
+
+    def handle(self, *args, **options):
+        gc.collect()
+        before = _memory()
+        self.stdout.write(f"시작: RSS {_mb(before[0])} (전용 {_mb(before[1])}, 파일 매핑 {_mb(before[2])})")
+
+        compact = listings.get_stock_listings()
+        for array in (compact.codes, compact.names, compact.exchange_ids):
+            _touch(array)
+        current = self._step('종목 목록 (mmap 배열)', before)
+
+        index = symbols.get_search_index()
+        current = self._step('검색 인덱스', current)
+
+        symbols.get_symbol_resolver()
+        current = self._step('SymbolResolver', current)
+
+        self.stdout.write(f"종목 수: {len(compact):,} ({listings.get_listings_version()})")
+        for exchange, count in compact.counts().items():
+            self.stdout.write(f"  {exchange}: {count:,}종목")
+        self.stdout.write(f"종목 목록 배열: {_mb(compact.nbytes())}")
+        self.stdout.write(f"검색 인덱스 배열: {_mb(index.nbytes())}")
+
+        if options['frames']:
+            frames = {exchange: compact[exchange].astype(object) for exchange in listings.LISTING_EXCHANGES}
+            deep = sum(int(df.memory_usage(deep=True).sum()) for df in frames.values())
+            self._step('거래소별 DataFrame', current)
+            self.stdout.write(f"거래소별 DataFrame (코드, 이름만): {_mb(deep)}")
+            del frames
+
+        total = _memory()
+        self.stdout.write(self.style.SUCCESS(
+            f"합계: RSS +{_mb(total[0] - before[0])}"
+            + (f" (전용 +{_mb(total[1] - before[1])})" if total[1] is not None and before[1] is not None else '')
+        ))
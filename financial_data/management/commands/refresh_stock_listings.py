@@ -0,0 +1,48 @@
+# financial_data/management/commands/refresh_stock_listings.py
+# FinanceDataReader에서 종목 목록을 내려받아 디스크 스냅샷(settings.FINDATA_DIR/listings)을 새로 만듭니다.
+#
+# 사용 방법:
+#    > python manage.py refresh_stock_listings
+#    > python manage.py refresh_stock_listings --keep 5
+#
+# 실행 중인 워커들은 RELOAD_INTERVAL(60초) 안에 새 스냅샷을 자동으로 읽어 들입니다.
+# cron 등으로 하루 한 번 실행하는 것을 권장합니다.
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from financial_data import listings
+
+
+class Command(BaseCommand):
+    help = '종목 목록(KRX, NASDAQ, NYSE, AMEX)을 내려받아 로컬 스냅샷을 갱신합니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--keep',
+            type=int,
+            default=3,
+            help='남겨둘 스냅샷 개수 (기본값: 3)',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write("종목 목록을 API에서 내려받는 중...")
+        started = time.monotonic()
+        fetched = listings.fetch_listings()
+        elapsed = time.monotonic() - started
+
+        failed = [exchange for exchange, df in fetched.items() if df is None or df.empty]
+        if len(failed) == len(listings.LISTING_EXCHANGES) and not listings.current_version():
+            raise CommandError("모든 거래소의 종목 목록을 내려받지 못했습니다. 네트워크 상태를 확인해주세요.")
+        for exchange in failed:
+            self.stdout.write(self.style.WARNING(f"{exchange}: 다운로드 실패, 직전 스냅샷 데이터를 유지합니다."))
+
+        version = listings.write_snapshot(fetched, keep=options['keep'])
+        manifest = listings.read_manifest(version)
+
+        for exchange, count in manifest['exchanges'].items():
+            self.stdout.write(f"  {exchange}: {count:,}종목")
+        self.stdout.write(self.style.SUCCESS(
+            f"스냅샷 {version} 저장 완료 (다운로드 {elapsed:.1f}초)"
+        ))
@@ -0,0 +1,92 @@
+# financial_data/management/commands/warm_quotes.py
+# 사용자들이 보유한 모든 종목(StockContent.ticker_code)의 시세를 주기적으로 미리 받아 두는 워머입니다.
+# 보유 현황 페이지(my_stock_holdings)는 이 워머가 채운 로컬 시세 저장소만 읽습니다.
+#
+# 사용 방법:
+#    > python manage.py warm_quotes                       # 계속 실행 (기본 5분 주기)
+#    > python manage.py warm_quotes --once                # 한 번만 실행
+#    > python manage.py warm_quotes --interval 60 --workers 4
+#
+# 원화 환산에 쓰는 환율(USD/KRW, EUR/KRW)도 함께 받습니다.
+# 종목별 조회 시간과 연속 실패 횟수는 PriceSeries(admin: 시세저장상태)에 기록됩니다.
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from financial_data import fx, io_pool, price_store
+from manage_account.models import StockContent
+
+
+class Command(BaseCommand):
+    help = '보유 종목 시세를 주기적으로 로컬 시세 저장소에 미리 받아 둡니다.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=int,
+            default=getattr(settings, 'FINDATA_QUOTE_WARM_INTERVAL', 300),
+            help='갱신 주기(초) (기본값: 300)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'FINDATA_QUOTE_WARM_WORKERS', 8),
+            help='동시에 조회할 최대 종목 수 (기본값: 8)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='한 번만 갱신하고 종료합니다.',
+        )
+        parser.add_argument(
+            '--slowest',
+            type=int,
+            default=5,
+            help='회차마다 출력할 느린 종목 수 (기본값: 5)',
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        try:
+            while True:
+                started = time.monotonic()
+                self.warm(options['workers'], options['slowest'])
+                if options['once']:
+                    break
+                time.sleep(max(0, interval - (time.monotonic() - started)))
+        except KeyboardInterrupt:
+            self.stdout.write("워머를 종료합니다.")
+
+    def warm(self, workers, slowest):
+        close_old_connections()
+        tickers = sorted(set(StockContent.objects.values_list('ticker_code', flat=True)))
+        if tickers:
+            # 원화 환산에 쓰는 환율도 함께 받아 둡니다.
+            tickers += list(fx.FX_PAIRS.values())
+        if not tickers:
+            self.stdout.write("보유 종목이 없습니다.")
+            return
+
+        started = time.monotonic()
+        # 공용 I/O 풀에서 최대 workers개씩 실행합니다. (제한 시간 없음)
+        results = io_pool.run_all(price_store.refresh, tickers, timeout=0, max_concurrency=max(1, workers))
+        elapsed = time.monotonic() - started
+
+        failed = [(ticker, error) for ticker, (_, error) in results.items() if error is not None]
+        for ticker, error in failed:
+            self.stdout.write(self.style.WARNING(f"  {ticker}: 실패 - {error}"))
+
+        slow = sorted(
+            ((ticker, took, error) for ticker, (took, error) in results.items()),
+            key=lambda result: result[1],
+            reverse=True,
+        )[:slowest]
+        if slow:
+            self.stdout.write("  느린 종목: " + ", ".join(f"{ticker} {took * 1000:.0f}ms" for ticker, took, _ in slow))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(tickers)}종목 갱신 완료 (실패 {len(failed)}, {elapsed:.1f}초)"
+        ))
@@ -0,0 +1,109 @@
+# financial_data/market.py
+# 금융 데이터 검색 화면 상단의 주요 지표(지수, 금리, 환율) 스냅샷
+#
+# 예전에는 10분 캐시가 만료되면 그때 들어온 요청이 다섯 지표를 모두 받을 때까지 기다렸습니다.
+# 이제는 마지막으로 받은 스냅샷을 캐시에 만료 없이 보관하고,
+#   - 요청은 항상 마지막 스냅샷(과 그 나이)을 바로 받고
+#   - 스냅샷이 MARKET_TTL보다 오래되었으면 백그라운드에서 모든 지표를 병렬로 한 번만 새로 받습니다.
+# 새로 받지 못한 지표는 이전 값을 그대로 유지합니다.
+# 갱신 작업 자체는 전용 스레드 하나(_refresh_executor)에서 돌고, 지표 요청만 공용 I/O 풀에 넣습니다.
+# (공용 풀 스레드 안에서 같은 풀의 결과를 기다리면 풀이 찼을 때 서로를 기다리며 멈출 수 있습니다.)
+# 보여 줄 지표 목록은 FINDATA_MARKET_TICKERS 설정으로 바꿀 수 있습니다.
+
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+
+from . import io_pool, price_store
+
+# 검색 화면 상단에 보여줄 주요 지표
+MARKET_TICKERS = getattr(settings, 'FINDATA_MARKET_TICKERS', ['KS11', 'IXIC', 'US10YT', 'USD/KRW', 'EUR/KRW'])
+
+# 스냅샷을 새로 받기 전까지 그대로 쓰는 시간(초)
+MARKET_TTL = getattr(settings, 'FINDATA_MARKET_TTL', 600)
+
+CACHE_KEY = 'market_data'
+
+_refreshing = threading.Lock()
+
+# 스냅샷 갱신을 조율하는 전용 스레드 (지표 요청은 io_pool에서 실행)
+_refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='findata-market')
+
+
+def _format(ticker, latest_row):
+    if latest_row is None or math.isnan(latest_row['Close']):
+        return None
+    return {
+        'name': ticker,
+        'price': f"{latest_row['Close']:,.2f}",
+        'date': latest_row.name.date() if latest_row.name is not None else None,
+    }
+
+
+def refresh_snapshot():
+    """
+    모든 지표를 공용 I/O 풀에서 병렬로 받아 스냅샷을 갱신합니다. (받지 못한 지표는 이전 값 유지)
+    공용 풀의 결과를 기다리므로 공용 풀 스레드 안에서 호출하지 않습니다.
+    """
+    previous = cache.get(CACHE_KEY) or {}
+    previous_items = {item['name']: item for item in previous.get('items', [])}
+    latest_rows = io_pool.run_all(price_store.latest, MARKET_TICKERS)
+
+    items = []
+    for ticker in MARKET_TICKERS:
+        item = _format(ticker, latest_rows.get(ticker)) or previous_items.get(ticker)
+        if item is not None:
+            items.append(item)
+
+    if not items:
+        return previous or None
+    snapshot = {'items': items, 'updated_at': time.time()}
+    cache.set(CACHE_KEY, snapshot, None)
+    return snapshot
+
+
+def _refresh_in_background():
+    # 전용 스레드도 요청/응답 주기가 없으므로 DB 연결을 직접 정리합니다.
+    close_old_connections()
+    try:
+        refresh_snapshot()
+    except Exception as e:
+        print(f"Error refreshing market data: {e}")
+    finally:
+        close_old_connections()
+        _refreshing.release()
+
+
+def schedule_refresh():
+    """
+    스냅샷 갱신을 전용 스레드에 맡깁니다. 이미 갱신 중이면 아무것도 하지 않습니다.
+    """
+    if _refreshing.acquire(blocking=False):
+        _refresh_executor.submit(_refresh_in_background)
+
+
+def get_overview():
+    """
+    마지막 스냅샷을 바로 반환합니다.
+    (items: [{'name', 'price', 'date'}], age: 스냅샷 나이(초), updated_at: 받은 시각, 스냅샷이 없으면 둘 다 None)
+    스냅샷이 없거나 MARKET_TTL보다 오래되었으면 백그라운드 갱신을 예약합니다.
+    """
+    snapshot = cache.get(CACHE_KEY)
+    if snapshot is None:
+        schedule_refresh()
+        return {'items': [], 'age': None, 'updated_at': None}
+
+    age = time.time() - snapshot['updated_at']
+    if age > MARKET_TTL:
+        schedule_refresh()
+    return {
+        'items': snapshot['items'],
+        'age': age,
+        'updated_at': datetime.fromtimestamp(snapshot['updated_at'], tz=timezone.utc),
+    }
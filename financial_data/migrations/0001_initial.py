@@ -0,0 +1,48 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=20, unique=True, verbose_name='종목 코드')),
+                ('covered_from', models.DateField(blank=True, null=True, verbose_name='조회 시작일')),
+                ('last_date', models.DateField(blank=True, null=True, verbose_name='마지막 시세일')),
+                ('synced_at', models.DateTimeField(blank=True, null=True, verbose_name='마지막 동기화 시각')),
+            ],
+            options={
+                'verbose_name': '시세저장상태',
+                'verbose_name_plural': '시세저장상태 목록',
+                'ordering': ['ticker'],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('ticker', models.CharField(max_length=20, verbose_name='종목 코드')),
+                ('date', models.DateField(verbose_name='날짜')),
+                ('open', models.FloatField(blank=True, null=True, verbose_name='시가')),
+                ('high', models.FloatField(blank=True, null=True, verbose_name='고가')),
+                ('low', models.FloatField(blank=True, null=True, verbose_name='저가')),
+                ('close', models.FloatField(blank=True, null=True, verbose_name='종가')),
+                ('volume', models.FloatField(blank=True, null=True, verbose_name='거래량')),
+            ],
+            options={
+                'verbose_name': '일별시세',
+                'verbose_name_plural': '일별시세 목록',
+                'ordering': ['ticker', 'date'],
+                'constraints': [models.UniqueConstraint(fields=('ticker', 'date'), name='unique_daily_price_ticker_date')],
+            },
+        ),
+    ]
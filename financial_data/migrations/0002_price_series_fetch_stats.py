@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-18 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('financial_data', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='priceseries',
+            name='fail_count',
+            field=models.PositiveIntegerField(default=0, verbose_name='연속 실패 횟수'),
+        ),
+        migrations.AddField(
+            model_name='priceseries',
+            name='fetch_ms',
+            field=models.FloatField(blank=True, null=True, verbose_name='마지막 조회 시간(ms)'),
+        ),
+        migrations.AddField(
+            model_name='priceseries',
+            name='last_error',
+            field=models.CharField(blank=True, default='', max_length=300, verbose_name='마지막 오류'),
+        ),
+    ]
@@ -1,3 +1,42 @@
 from django.db import models
 
-# Create your models here.
+
+class PriceSeries(models.Model):
+    """종목별 시세 저장 상태 모델 (어디까지 받아 두었는지 기록)"""
+    ticker = models.CharField('종목 코드', max_length=20, unique=True)
+    covered_from = models.DateField('조회 시작일', null=True, blank=True)
+    last_date = models.DateField('마지막 시세일', null=True, blank=True)
+    synced_at = models.DateTimeField('마지막 동기화 시각', null=True, blank=True)
+    fetch_ms = models.FloatField('마지막 조회 시간(ms)', null=True, blank=True)
+    fail_count = models.PositiveIntegerField('연속 실패 횟수', default=0)
+    last_error = models.CharField('마지막 오류', max_length=300, blank=True, default='')
+
+    def __str__(self):
+        return f"{self.ticker} ({self.covered_from} ~ {self.last_date})"
+
+    class Meta:
+        verbose_name = "시세저장상태"
+        verbose_name_plural = "시세저장상태 목록"
+        ordering = ['ticker']
+
+
+class DailyPrice(models.Model):
+    """종목별 일별 시세(OHLCV) 모델"""
+    ticker = models.CharField('종목 코드', max_length=20)
+    date = models.DateField('날짜')
+    open = models.FloatField('시가', null=True, blank=True)
+    high = models.FloatField('고가', null=True, blank=True)
+    low = models.FloatField('저가', null=True, blank=True)
+    close = models.FloatField('종가', null=True, blank=True)
+    volume = models.FloatField('거래량', null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.ticker} {self.date} 종가 {self.close}"
+
+    class Meta:
+        verbose_name = "일별시세"
+        verbose_name_plural = "일별시세 목록"
+        ordering = ['ticker', 'date']
+        constraints = [
+            models.UniqueConstraint(fields=['ticker', 'date'], name='unique_daily_price_ticker_date'),
+        ]
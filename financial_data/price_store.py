@@ -0,0 +1,265 @@
+# financial_data/price_store.py
+# 종목별 일별 시세(OHLCV) 로컬 저장소
+#
+# 예전에는 현재가 하나를 보기 위해 fdr.DataReader(ticker)로 전체 시세 이력을 매번 내려받았습니다.
+# 이제는 받은 시세를 DailyPrice 테이블에 쌓아 두고,
+#   - 마지막 저장일 이후의 데이터만 추가로 받고 (delta fetch)
+#   - 같은 종목은 SYNC_INTERVAL 안에 다시 받지 않으며
+#   - 기간 조회는 로컬 DB에서 바로 응답합니다.
+# 저장 상태(어디부터 어디까지 받았는지)는 PriceSeries에 기록합니다.
+
+import math
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import io_pool
+from .providers import get_provider
+from .models import DailyPrice, PriceSeries
+
+# 같은 종목을 다시 받기 전까지 기다리는 시간(초)
+SYNC_INTERVAL = getattr(settings, 'FINDATA_PRICE_SYNC_INTERVAL', 600)
+
+# 처음 받는 종목은 최근 몇 년치 시세를 받을지
+HISTORY_YEARS = getattr(settings, 'FINDATA_PRICE_HISTORY_YEARS', 5)
+
+# 기간 집계 주기 -> pandas resample 규칙
+RESAMPLE_RULES = {
+    'daily': None,
+    'weekly': 'W-FRI',
+    'monthly': 'ME',
+}
+
+# 기간 집계할 때 컬럼별 집계 방법 (OHLC + 거래량 합계)
+RESAMPLE_AGGREGATIONS = {
+    'Open': 'first',
+    'High': 'max',
+    'Low': 'min',
+    'Close': 'last',
+    'Volume': 'sum',
+}
+
+# DataFrame 컬럼 이름 -> DailyPrice 필드 이름
+PRICE_COLUMNS = {
+    'Open': 'open',
+    'High': 'high',
+    'Low': 'low',
+    'Close': 'close',
+    'Volume': 'volume',
+}
+
+
+def _clean(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(value) else value
+
+
+def _default_start():
+    return timezone.localdate() - timedelta(days=365 * HISTORY_YEARS)
+
+
+def fetch_history(ticker, start=None, end=None):
+    """
+    시세 공급자(기본 FinanceDataReader)에서 시세를 내려받습니다. (네트워크 호출, 외부 API 동시 호출 상한 적용)
+    """
+    return io_pool.upstream_call(get_provider().history, ticker, start, end)
+
+
+def _save_rows(ticker, df):
+    """
+    내려받은 DataFrame을 DailyPrice에 저장합니다. 같은 날짜가 있으면 덮어씁니다.
+    (오늘 시세는 장중에 계속 바뀌므로 마지막 날짜는 항상 다시 저장합니다.)
+    """
+    rows = []
+    for day, values in zip(pd.to_datetime(df.index).date, df.to_dict('records')):
+        fields = {field: _clean(values.get(column)) for column, field in PRICE_COLUMNS.items()}
+        rows.append(DailyPrice(ticker=ticker, date=day, **fields))
+    if rows:
+        DailyPrice.objects.bulk_create(
+            rows,
+            batch_size=1000,
+            update_conflicts=True,
+            unique_fields=['ticker', 'date'],
+            update_fields=list(PRICE_COLUMNS.values()),
+        )
+    return rows
+
+
+def is_stale(series, now=None):
+    """
+    마지막 동기화 후 SYNC_INTERVAL이 지났는지 확인합니다. (한 번도 받지 않았으면 True)
+    """
+    if series is None or series.synced_at is None:
+        return True
+    return ((now or timezone.now()) - series.synced_at).total_seconds() > SYNC_INTERVAL
+
+
+def needs_sync(ticker):
+    return is_stale(PriceSeries.objects.filter(ticker=ticker).first())
+
+
+def sync(ticker, start=None, force=False, raise_errors=False):
+    """
+    종목 시세를 로컬 저장소와 맞춥니다.
+
+    - start가 지금까지 받아 둔 기간보다 이전이면 그 앞부분만 추가로 받습니다.
+    - 마지막 동기화 후 SYNC_INTERVAL이 지났으면(또는 force) 마지막 저장일부터 오늘까지만 받습니다.
+    네트워크 오류가 나면 저장된 데이터를 그대로 사용합니다. (raise_errors=True면 예외를 그대로 올립니다.)
+    저장된 시세가 있으면 True.
+    """
+    start = start or _default_start()
+    series = PriceSeries.objects.filter(ticker=ticker).first()
+    now = timezone.now()
+
+    try:
+        if series is None or series.covered_from is None:
+            df = fetch_history(ticker, start)
+            if df is None or df.empty:
+                if raise_errors:
+                    raise ValueError("시세 데이터 없음")
+                return False
+            with transaction.atomic():
+                _save_rows(ticker, df)
+                series, _ = PriceSeries.objects.update_or_create(
+                    ticker=ticker,
+                    defaults={
+                        'covered_from': start,
+                        'last_date': pd.to_datetime(df.index).max().date(),
+                        'synced_at': now,
+                    },
+                )
+            return True
+
+        if start < series.covered_from:
+            # 앞쪽 기간 보충 (covered_from 전날까지)
+            df = fetch_history(ticker, start, series.covered_from - timedelta(days=1))
+            with transaction.atomic():
+                if df is not None and not df.empty:
+                    _save_rows(ticker, df)
+                PriceSeries.objects.filter(pk=series.pk).update(covered_from=start)
+            series.covered_from = start
+
+        if force or is_stale(series, now):
+            # 마지막 저장일부터 받습니다. (마지막 날 시세가 장중 값이었을 수 있으므로 포함)
+            df = fetch_history(ticker, series.last_date or series.covered_from)
+            last_date = series.last_date
+            with transaction.atomic():
+                if df is not None and not df.empty:
+                    _save_rows(ticker, df)
+                    last_date = max(filter(None, [last_date, pd.to_datetime(df.index).max().date()]))
+                PriceSeries.objects.filter(pk=series.pk).update(last_date=last_date, synced_at=now)
+    except Exception as e:
+        if raise_errors:
+            raise
+        print(f"Error syncing price data for {ticker}: {e}")
+
+    return series is not None and series.last_date is not None
+
+
+def load_history(ticker, start=None, end=None):
+    """
+    로컬 저장소에서 시세를 읽어 DataFrame(Open, High, Low, Close, Volume, 날짜 인덱스)으로 반환합니다.
+    네트워크를 사용하지 않습니다.
+    """
+    queryset = DailyPrice.objects.filter(ticker=ticker)
+    if start:
+        queryset = queryset.filter(date__gte=start)
+    if end:
+        queryset = queryset.filter(date__lte=end)
+    fields = ['date'] + list(PRICE_COLUMNS.values())
+    rows = list(queryset.order_by('date').values_list(*fields))
+    df = pd.DataFrame(rows, columns=['Date'] + list(PRICE_COLUMNS.keys()))
+    df = df.astype({column: float for column in PRICE_COLUMNS})
+    df['Date'] = pd.to_datetime(df['Date'])
+    return df.set_index('Date')
+
+
+def history(ticker, start=None, end=None):
+    """
+    필요한 부분만 동기화한 뒤 로컬 저장소에서 기간 시세를 반환합니다.
+    """
+    if isinstance(start, str):
+        start = date.fromisoformat(start)
+    sync(ticker, start=start if start and start < _default_start() else None)
+    return load_history(ticker, start, end)
+
+
+def record_fetch(ticker, elapsed, error=None):
+    """
+    시세 조회 소요 시간과 실패 여부를 PriceSeries에 기록합니다. (느리거나 자주 실패하는 종목 확인용)
+    """
+    series, _ = PriceSeries.objects.get_or_create(ticker=ticker)
+    series.fetch_ms = round(elapsed * 1000, 1)
+    if error is None:
+        series.fail_count = 0
+        series.last_error = ''
+    else:
+        series.fail_count += 1
+        series.last_error = str(error)[:300]
+    series.save(update_fields=['fetch_ms', 'fail_count', 'last_error'])
+
+
+def refresh(ticker):
+    """
+    종목 시세를 강제로 동기화하고 소요 시간과 오류를 기록합니다. (elapsed 초, 오류 또는 None)
+    """
+    started = time.monotonic()
+    error = None
+    try:
+        sync(ticker, force=True, raise_errors=True)
+    except Exception as e:
+        error = e
+    elapsed = time.monotonic() - started
+    record_fetch(ticker, elapsed, error)
+    return elapsed, error
+
+
+def latest(ticker, refresh=True):
+    """
+    가장 최근 시세 한 줄(pandas Series: Open, High, Low, Close, Volume)을 반환합니다. 없으면 None.
+    refresh=False면 동기화 없이 로컬 저장소만 읽습니다.
+    """
+    if refresh:
+        sync(ticker)
+    row = DailyPrice.objects.filter(ticker=ticker).order_by('-date').values_list(
+        'date', *PRICE_COLUMNS.values()
+    ).first()
+    if row is None:
+        return None
+    values = [float('nan') if value is None else value for value in row[1:]]
+    return pd.Series(dict(zip(PRICE_COLUMNS.keys(), values)), name=pd.Timestamp(row[0]))
+
+
+def resample(df, interval='daily'):
+    """
+    일별 시세를 주(금요일 기준) / 월 단위 OHLC로 집계합니다. 거래가 없는 기간은 빠집니다.
+    """
+    rule = RESAMPLE_RULES[interval]
+    if rule is None or df.empty:
+        return df
+    columns = {column: how for column, how in RESAMPLE_AGGREGATIONS.items() if column in df.columns}
+    resampled = df.resample(rule).agg(columns)
+    return resampled[resampled['Close'].notna()] if 'Close' in resampled.columns else resampled.dropna(how='all')
+
+
+def downsample(df, max_points):
+    """
+    행이 max_points보다 많으면 연속한 행을 같은 개수씩 묶어 OHLC로 집계합니다. (묶음의 마지막 날짜 사용)
+    """
+    if max_points is None or len(df) <= max_points:
+        return df
+    size = -(-len(df) // max_points)
+    groups = np.arange(len(df)) // size
+    columns = {column: how for column, how in RESAMPLE_AGGREGATIONS.items() if column in df.columns}
+    grouped = df.groupby(groups)
+    result = grouped.agg(columns)
+    result.index = df.index[grouped.size().cumsum().to_numpy() - 1]
+    return result
@@ -0,0 +1,263 @@
+# financial_data/providers.py
+# 시세/종목 목록 공급자(provider) 계층
+#
+# financial_data는 외부 데이터를 이 모듈의 get_provider()로만 받습니다. (FinanceDataReader 직접 호출 없음)
+# settings.FINDATA_PROVIDER로 공급자를 고릅니다.
+#   - 'fdr'       : FinanceDataReader (기본값, 네트워크 사용)
+#   - 'record'    : 다른 공급자(기본 fdr)의 응답을 파일로 저장하면서 그대로 반환
+#   - 'replay'    : 'record'로 저장한 파일만 읽음 (네트워크 없음)
+#   - 'synthetic' : 종목 목록과 시세를 규칙적으로 만들어 냄 (네트워크 없음, 지연 시간 설정 가능)
+# 공급자별 옵션은 settings.FINDATA_PROVIDER_OPTIONS로 넘깁니다. 예)
+#   FINDATA_PROVIDER = 'synthetic'
+#   FINDATA_PROVIDER_OPTIONS = {'latency': 0.2, 'listing_sizes': {'KRX': 2700, 'NASDAQ': 3500}}
+# 인터넷이 없는 장비에서도 보유 현황/검색 경로를 대량 데이터로 부하 테스트할 수 있습니다.
+
+import os
+import tempfile
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from pathlib import Path
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+import FinanceDataReader as fdr
+from django.conf import settings
+
+class MarketDataProvider:
+    """
+    공급자 인터페이스. listing / history는 FinanceDataReader와 같은 모양의 DataFrame을 반환합니다.
+      - listing(exchange): 'Code'(KRX) 또는 'Symbol'(미국 거래소), 'Name' 컬럼
+      - history(ticker, start, end): 날짜 인덱스, Open/High/Low/Close/Volume 컬럼
+    """
+
+    name = 'base'
+
+    def listing(self, exchange):
+        raise NotImplementedError
+
+    def history(self, ticker, start=None, end=None):
+        raise NotImplementedError
+
+    def latest(self, ticker):
+        """
+        가장 최근 시세 한 줄(pandas Series)을 반환합니다. 없으면 None.
+        """
+        df = self.history(ticker, date.today() - timedelta(days=14))
+        if df is None or df.empty:
+            return None
+        return df.iloc[-1]
+
+
+class FdrProvider(MarketDataProvider):
+    """FinanceDataReader 공급자 (네트워크 사용)"""
+
+    name = 'fdr'
+
+    def listing(self, exchange):
+        return fdr.StockListing(exchange)
+
+    def history(self, ticker, start=None, end=None):
+        return fdr.DataReader(ticker, start, end)
+
+
+class FileRecordingProvider(MarketDataProvider):
+    """
+    파일 기록/재생 공급자.
+    mode='record'면 inner 공급자의 응답을 directory에 저장하고 그대로 반환합니다.
+    mode='replay'면 저장된 파일만 읽고, 없는 데이터는 LookupError를 발생시킵니다.
+    시세는 종목마다 파일 하나에 받은 날짜를 모두 합쳐 저장하고, 재생할 때 기간으로 잘라 냅니다.
+    """
+
+    def __init__(self, directory, mode='replay', inner=None):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"알 수 없는 모드입니다: {mode}")
+        if mode == 'record' and inner is None:
+            raise ValueError("record 모드에는 inner 공급자가 필요합니다.")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.inner = inner
+        self.name = mode
+        self._lock = threading.Lock()
+
+    def _path(self, kind, key):
+        return self.directory / kind / f"{quote(str(key), safe='')}.csv"
+
+    def _write(self, path, df):
+        # 임시 파일에 쓴 뒤 교체합니다. (읽는 쪽이 반쯤 쓴 파일을 보지 않도록)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        os.close(fd)
+        try:
+            df.to_csv(tmp)
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def _read(self, kind, key, **kwargs):
+        path = self._path(kind, key)
+        if not path.exists():
+            raise LookupError(f"기록된 데이터가 없습니다: {kind}/{key}")
+        return pd.read_csv(path, **kwargs)
+
+    def listing(self, exchange):
+        if self.mode == 'replay':
+            return self._read('listings', exchange, index_col=0, dtype={'Code': str, 'Symbol': str})
+        df = self.inner.listing(exchange)
+        if df is not None:
+            with self._lock:
+                self._write(self._path('listings', exchange), df)
+        return df
+
+    def _recorded_history(self, ticker):
+        df = self._read('history', ticker, index_col=0, parse_dates=True)
+        df.index.name = 'Date'
+        return df
+
+    def history(self, ticker, start=None, end=None):
+        if self.mode == 'record':
+            df = self.inner.history(ticker, start, end)
+            if df is not None and not df.empty:
+                with self._lock:
+                    try:
+                        recorded = self._recorded_history(ticker)
+                        merged = pd.concat([recorded, df])
+                        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+                    except LookupError:
+                        merged = df
+                    self._write(self._path('history', ticker), merged)
+            return df
+
+        df = self._recorded_history(ticker)
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        if end is not None:
+            df = df[df.index <= pd.Timestamp(end)]
+        return df
+
+
+class SyntheticProvider(MarketDataProvider):
+    """
+    규칙적으로 만든 종목 목록과 시세를 돌려주는 공급자. (같은 종목은 항상 같은 시세)
+    latency: 호출마다 기다리는 시간(초), jitter: latency에 더하는 0 ~ jitter초의 임의 지연
+    listing_sizes: 거래소별 종목 수
+    """
+
+    name = 'synthetic'
+
+    # 시세를 만들기 시작하는 날짜 (기간과 상관없이 같은 종목은 같은 시세가 나오도록)
+    ORIGIN = date(2000, 1, 3)
+
+    DEFAULT_LISTING_SIZES = {
+        'KRX': 2700,
+        'NASDAQ': 3500,
+        'NYSE': 2500,
+        'AMEX': 300,
+    }
+
+    _US_PREFIXES = {'NASDAQ': 'Q', 'NYSE': 'Y', 'AMEX': 'X'}
+    _SYLLABLES = '가나다라마바사아자차카타파하한국대신삼성현대전자화학제약금융'
+    _WORDS = ['Global', 'Tech', 'Holdings', 'Energy', 'Capital', 'Systems', 'Bio', 'Motors', 'Foods', 'Networks']
+
+    def __init__(self, latency=0.0, jitter=0.0, seed=0, listing_sizes=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.seed = seed
+        self.listing_sizes = {**self.DEFAULT_LISTING_SIZES, **(listing_sizes or {})}
+
+    def _sleep(self, key):
+        delay = self.latency
+        if self.jitter:
+            delay += self.jitter * (self._seed_for(key) % 1000) / 1000
+        if delay > 0:
+            time.sleep(delay)
+
+    def _seed_for(self, key):
+        return zlib.crc32(f"{self.seed}:{key}".encode('utf-8'))
+
+    def listing(self, exchange):
+        self._sleep(f"listing:{exchange}")
+        size = self.listing_sizes.get(exchange, 0)
+        rng = np.random.default_rng(self._seed_for(f"listing:{exchange}"))
+        if exchange == 'KRX':
+            codes = [f"{i:06d}" for i in range(5930, 5930 + size * 10, 10)]
+            syllables = rng.integers(0, len(self._SYLLABLES), size=(size, 4))
+            names = [''.join(self._SYLLABLES[j] for j in row) + f"{i}" for i, row in enumerate(syllables)]
+            return pd.DataFrame({'Code': codes, 'Name': names})
+
+        # 거래소 접두 문자 + 번호를 알파벳 세 자리로 바꾼 코드 (거래소 안에서 겹치지 않음)
+        prefix = self._US_PREFIXES.get(exchange, 'Z')
+        codes = [prefix + ''.join(chr(65 + (i // 26 ** k) % 26) for k in (2, 1, 0)) for i in range(size)]
+        words = rng.integers(0, len(self._WORDS), size=(size, 2))
+        names = [f"{self._WORDS[a]} {self._WORDS[b]} {code} Inc" for code, (a, b) in zip(codes, words)]
+        return pd.DataFrame({'Symbol': codes, 'Name': names})
+
+    def history(self, ticker, start=None, end=None):
+        self._sleep(f"history:{ticker}")
+        end = pd.Timestamp(end or date.today())
+        days = pd.bdate_range(self.ORIGIN, end)
+        # 값마다 따로 만든 난수열을 써서, 종료일이 달라도 같은 날짜의 시세는 같게 나옵니다.
+        seed = self._seed_for(f"history:{ticker}")
+        walk, noise, volume = (np.random.default_rng([seed, stream]) for stream in range(3))
+
+        base = 10 + (seed % 4900) / 10
+        close = base * np.exp(np.cumsum(walk.normal(0.0002, 0.02, len(days))))
+        spread = np.abs(noise.normal(0, 0.01, len(days))) * close
+        df = pd.DataFrame({
+            'Open': close - spread / 2,
+            'High': close + spread,
+            'Low': close - spread,
+            'Close': close,
+            'Volume': volume.integers(1_000, 1_000_000, len(days)).astype(float),
+        }, index=pd.DatetimeIndex(days, name='Date'))
+        if start is not None:
+            df = df[df.index >= pd.Timestamp(start)]
+        return df
+
+
+def build_provider(name, options=None):
+    """
+    이름과 옵션으로 공급자를 만듭니다.
+    """
+    options = dict(options or {})
+    if name == 'fdr':
+        return FdrProvider()
+    if name == 'synthetic':
+        return SyntheticProvider(**options)
+    if name in ('record', 'replay'):
+        directory = options.pop('directory', Path(settings.FINDATA_DIR) / 'recordings')
+        inner = build_provider(options.pop('inner', 'fdr'), options.pop('inner_options', None)) if name == 'record' else None
+        return FileRecordingProvider(directory, mode=name, inner=inner)
+    raise ValueError(f"알 수 없는 공급자입니다: {name}")
+
+
+_provider = None
+_provider_lock = threading.Lock()
+
+
+def get_provider():
+    """
+    설정(FINDATA_PROVIDER, FINDATA_PROVIDER_OPTIONS)에 맞는 프로세스 공용 공급자를 반환합니다.
+    """
+    global _provider
+    if _provider is None:
+        with _provider_lock:
+            if _provider is None:
+                _provider = build_provider(
+                    getattr(settings, 'FINDATA_PROVIDER', 'fdr'),
+                    getattr(settings, 'FINDATA_PROVIDER_OPTIONS', {}),
+                )
+    return _provider
+
+
+def set_provider(provider):
+    """
+    공급자를 바꿉니다. (부하 테스트, 관리 명령용) 이전 공급자를 반환합니다.
+    """
+    global _provider
+    with _provider_lock:
+        previous, _provider = _provider, provider
+    return previous
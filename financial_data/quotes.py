@@ -0,0 +1,229 @@
+# financial_data/quotes.py
+# 종목별 최신 시세(현재가) 공유 캐시
+#
+# 여러 사용자가 동시에 보유 현황 페이지를 열면 같은 인기 종목(005930, AAPL, TSLA ...)을
+# 요청마다 따로 받아 오던 문제를 막기 위한 캐시입니다.
+#   - TTL 안의 시세는 그대로 반환합니다.
+#   - 종목마다 동시에 하나의 조회만 진행하고(single-flight), 같은 종목을 기다리는 요청은 그 결과를 함께 받습니다.
+#   - TTL이 지났지만 STALE_TTL 안의 시세는 바로 반환하고, 뒤에서 한 번만 새로 받아 옵니다.
+# 따라서 외부 호출 수는 동시 사용자 수가 아니라 서로 다른 종목 수에 비례합니다.
+#
+# 시세는 로컬 시세 저장소(DB)에서만 읽고, 요청 처리 중에는 FinanceDataReader를 기다리지 않습니다.
+# 저장소 갱신은 `python manage.py warm_quotes` 워머가 맡고, 워머가 아직 받지 않았거나
+# 오래된 종목은 백그라운드에서 한 번만 갱신합니다.
+#
+# 비동기 뷰는 aget_many()로 종목별 조회 Future를 이벤트 루프에서 바로 기다립니다.
+# (공용 I/O 풀에는 실제 조회만 들어가고, 기다리는 쪽이 풀 스레드를 차지하지 않습니다.)
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, wait
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import io_pool, price_store
+
+# 시세를 새로 받지 않고 그대로 쓰는 시간(초)
+QUOTE_TTL = getattr(settings, 'FINDATA_QUOTE_TTL', 60)
+
+# TTL이 지난 시세를 새로 받는 동안 대신 보여 줄 수 있는 최대 시간(초)
+QUOTE_STALE_TTL = getattr(settings, 'FINDATA_QUOTE_STALE_TTL', 60 * 60 * 24)
+
+# 모든 워커의 시세 캐시를 한 번에 비우기 위한 공용 캐시 키 (값이 바뀌면 각 워커가 자기 캐시를 비움)
+GENERATION_CACHE_KEY = 'quotes:generation'
+
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+
+def _refresh_in_background(ticker):
+    try:
+        elapsed, error = price_store.refresh(ticker)
+        if error is not None:
+            print(f"Error fetching data for {ticker}: {error} ({elapsed:.2f}s)")
+        quote_cache.invalidate(ticker)
+    except Exception as e:
+        print(f"Error fetching data for {ticker}: {e}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(ticker)
+
+
+def schedule_refresh(ticker):
+    """
+    종목 시세 저장소 갱신을 백그라운드에 맡깁니다. 같은 종목은 한 번만 진행합니다.
+    """
+    with _refreshing_lock:
+        if ticker in _refreshing:
+            return
+        _refreshing.add(ticker)
+    io_pool.submit(_refresh_in_background, ticker)
+
+
+def load_quote(ticker):
+    """
+    시세 저장소(DB)에서 종목의 최신 시세(pandas Series)를 가져옵니다. 없거나 실패하면 None.
+    저장소가 비었거나 오래되었으면 백그라운드 갱신만 예약하고 기다리지 않습니다.
+    """
+    try:
+        quote = price_store.latest(ticker, refresh=False)
+        if quote is None or price_store.needs_sync(ticker):
+            schedule_refresh(ticker)
+        return quote
+    except Exception as e:
+        print(f"Error fetching data for {ticker}: {e}")
+        return None
+
+
+class _Flight:
+    """진행 중인 조회 하나. 같은 종목을 기다리는 요청들이 future(결과: 시세 또는 None)를 공유합니다."""
+
+    def __init__(self):
+        self.future = Future()
+
+
+class QuoteCache:
+    """
+    종목 코드를 키로 하는 TTL + single-flight + stale-while-revalidate 캐시.
+    """
+
+    def __init__(self, loader=load_quote, ttl=QUOTE_TTL, stale_ttl=QUOTE_STALE_TTL):
+        self.loader = loader
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._entries = {}   # ticker -> (quote, 받은 시각)
+        self._flights = {}   # ticker -> _Flight
+        self._generation = None
+        self._lock = threading.Lock()
+
+    def _sync_generation(self):
+        """
+        다른 워커가 invalidate_all()을 호출했으면 이 워커의 캐시도 비웁니다.
+        """
+        try:
+            generation = cache.get(GENERATION_CACHE_KEY)
+        except Exception:
+            return
+        if generation != self._generation:
+            with self._lock:
+                if self._generation is not None:
+                    self._entries.clear()
+                self._generation = generation
+
+    def _run(self, ticker, flight):
+        """
+        실제 조회를 한 번 실행하고 기다리던 요청들에게 결과를 알립니다.
+        """
+        quote = None
+        try:
+            quote = self.loader(ticker)
+        finally:
+            with self._lock:
+                # 실패했는데 이전 시세가 있으면 그 시세를 유지합니다.
+                if quote is not None or ticker not in self._entries:
+                    self._entries[ticker] = (quote, time.monotonic())
+                self._flights.pop(ticker, None)
+            flight.future.set_result(quote)
+        return quote
+
+    def _lookup(self, ticker):
+        """
+        (바로 쓸 수 있는 시세, 기다려야 할 flight, 새로 시작해야 하는지) 를 반환합니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(ticker)
+            flight = self._flights.get(ticker)
+            if entry is not None:
+                quote, fetched_at = entry
+                age = now - fetched_at
+                if age < self.ttl:
+                    return quote, None, False
+                if age < self.stale_ttl and quote is not None:
+                    # 오래된 시세를 먼저 돌려주고, 아직 갱신 중이 아니면 뒤에서 한 번만 갱신
+                    if flight is None:
+                        flight = self._flights[ticker] = _Flight()
+                        io_pool.submit(self._run, ticker, flight)
+                    return quote, None, False
+            if flight is not None:
+                return None, flight, False
+            flight = self._flights[ticker] = _Flight()
+            return None, flight, True
+
+    def get(self, ticker, timeout=None):
+        """
+        종목 하나의 최신 시세를 반환합니다. 없거나 제한 시간을 넘기면 None.
+        """
+        return self.get_many([ticker], timeout=timeout).get(ticker)
+
+    def start_many(self, tickers):
+        """
+        여러 종목의 조회를 시작만 하고 기다리지 않습니다.
+        반환값: ({종목 코드: 바로 쓸 수 있는 시세}, {종목 코드: 조회 결과 Future})
+        캐시에 없는 종목만 공용 I/O 풀에 조회를 넣고, 다른 요청이 받고 있는 종목은 그 조회의 Future를 돌려줍니다.
+        """
+        self._sync_generation()
+        results = {}
+        waiting = {}
+        for ticker in dict.fromkeys(tickers):
+            quote, flight, leader = self._lookup(ticker)
+            if flight is None:
+                results[ticker] = quote
+                continue
+            if leader:
+                io_pool.submit(self._run, ticker, flight)
+            waiting[ticker] = flight.future
+        return results, waiting
+
+    def get_many(self, tickers, timeout=None):
+        """
+        여러 종목의 최신 시세를 {종목 코드: 시세 또는 None}으로 반환합니다.
+        캐시에 없는 종목만 공용 I/O 풀에서 병렬로 받아 오고, 다른 요청이 받고 있는 종목은 그 결과를 기다립니다.
+        제한 시간(기본 FINDATA_IO_TIMEOUT) 안에 받지 못한 종목은 None입니다. (부분 결과)
+        """
+        results, waiting = self.start_many(tickers)
+        if waiting:
+            wait(waiting.values(), timeout=io_pool.IO_TIMEOUT if timeout is None else timeout)
+        for ticker, future in waiting.items():
+            results[ticker] = future.result() if future.done() else None
+        return results
+
+    async def aget_many(self, tickers, timeout=None):
+        """
+        get_many의 비동기 버전. 조회 Future를 이벤트 루프에서 기다리므로 풀 스레드를 차지하지 않습니다.
+        """
+        results, waiting = self.start_many(tickers)
+        if waiting:
+            futures = {ticker: asyncio.wrap_future(future) for ticker, future in waiting.items()}
+            await asyncio.wait(futures.values(), timeout=io_pool.IO_TIMEOUT if timeout is None else timeout)
+            for ticker, future in futures.items():
+                results[ticker] = future.result() if future.done() else None
+        return results
+
+    def peek(self, ticker):
+        """
+        조회 없이 캐시에 있는 시세만 반환합니다. (오래된 시세 포함)
+        """
+        with self._lock:
+            entry = self._entries.get(ticker)
+        return entry[0] if entry is not None else None
+
+    def invalidate(self, ticker=None):
+        with self._lock:
+            if ticker is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(ticker, None)
+
+    def invalidate_all(self):
+        """
+        모든 워커의 시세 캐시를 비웁니다. (공용 캐시의 세대 키를 바꿉니다)
+        """
+        cache.set(GENERATION_CACHE_KEY, time.time_ns(), None)
+        self.invalidate()
+
+
+# 프로세스 전체에서 공유하는 시세 캐시
+quote_cache = QuoteCache()
@@ -0,0 +1,271 @@
+# financial_data/shared_cache.py
+# 프로세스 메모리 LRU + 노드 공용 SQLite 파일, 두 단계 Django 캐시 백엔드
+#
+# LocMemCache는 워커마다 따로라서 주요 지표 스냅샷 등을 워커마다 따로 받아 두고,
+# '데이터 갱신'도 그 요청을 처리한 워커에만 반영되었습니다.
+# 이 백엔드는
+#   - 1단계: 워커 메모리의 LRU (LOCAL_MAX_ENTRIES개)
+#   - 2단계: 같은 장비의 모든 워커가 여는 SQLite 파일 (WAL 모드, 쓰기는 트랜잭션 단위로 원자적)
+# 으로 동작합니다. 키는 ':' 앞부분을 이름공간으로 보고, 이름공간마다 버전 번호(stamp)를 SQLite에 둡니다.
+# 값을 쓰거나 지우면 그 이름공간의 버전이 올라가고, 다른 워커는 STAMP_CHECK_INTERVAL초 안에
+# 버전이 바뀐 것을 보고 자기 LRU의 해당 이름공간을 버립니다. (한 워커의 갱신이 모든 워커에 전달)
+# 메모리 LRU에는 pickle된 값을 두고 꺼낼 때마다 새로 풀어서, 받은 값을 고쳐도 캐시에 남은 값은 바뀌지 않습니다. (LocMemCache와 같음)
+# 항목 수(MAX_ENTRIES)는 쓰기 CULL_CHECK_INTERVAL번마다 확인하고, 넘으면 만료가 가까운 항목부터 지웁니다.
+# (만료 시간이 없는 항목 - 스냅샷/카테고리 버전 키 등 - 은 가장 나중에 지웁니다.)
+#
+# 설정 예)
+#   CACHES = {'default': {
+#       'BACKEND': 'financial_data.shared_cache.TwoTierCache',
+#       'LOCATION': BASE_DIR / 'findata_store' / 'cache.sqlite3',
+#       'OPTIONS': {'LOCAL_MAX_ENTRIES': 1000, 'STAMP_CHECK_INTERVAL': 1.0, 'CULL_CHECK_INTERVAL': 100},
+#   }}
+
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL
+);
+CREATE TABLE IF NOT EXISTS stamps (
+    namespace TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+"""
+
+
+def namespace_of(key):
+    """
+    캐시 키의 이름공간 ('quote:AAPL' -> 'quote', 'market_data' -> 'market_data')
+    """
+    return str(key).split(':', 1)[0]
+
+
+class TwoTierCache(BaseCache):
+    """
+    메모리 LRU 앞단 + SQLite 공용 저장소, 이름공간별 버전으로 워커 간 무효화.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS', {})
+        self._path = Path(location)
+        self._local_max = options.get('LOCAL_MAX_ENTRIES', 1000)
+        self._stamp_interval = options.get('STAMP_CHECK_INTERVAL', 1.0)
+        self._cull_interval = max(1, options.get('CULL_CHECK_INTERVAL', 100))
+        self._writes_since_cull = 0
+        self._local = OrderedDict()   # 전체 키 -> (pickle된 값, 만료 시각, 이름공간, 버전)
+        self._stamps = {}             # 이름공간 -> (버전, 확인한 시각)
+        self._lock = threading.RLock()
+        self._connections = threading.local()
+
+    # --- SQLite ---
+
+    def _db(self):
+        conn = getattr(self._connections, 'conn', None)
+        if conn is None:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            self._connections.conn = conn
+        return conn
+
+    def _read_stamp(self, namespace):
+        row = self._db().execute('SELECT version FROM stamps WHERE namespace = ?', (namespace,)).fetchone()
+        return row[0] if row else 0
+
+    def _bump(self, conn, namespace):
+        conn.execute(
+            'INSERT INTO stamps (namespace, version) VALUES (?, 1) '
+            'ON CONFLICT(namespace) DO UPDATE SET version = version + 1',
+            (namespace,),
+        )
+        version = conn.execute('SELECT version FROM stamps WHERE namespace = ?', (namespace,)).fetchone()[0]
+        with self._lock:
+            self._stamps[namespace] = (version, time.monotonic())
+        return version
+
+    def _write(self, statements, namespace):
+        """
+        여러 문장을 한 트랜잭션으로 실행하고 이름공간 버전을 올립니다. 새 버전과 마지막 문장의 변경 행 수를 반환합니다.
+        """
+        conn = self._db()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rowcount = 0
+            for sql, args in statements:
+                rowcount = conn.execute(sql, args).rowcount
+            version = self._bump(conn, namespace) if rowcount else self._read_stamp(namespace)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return version, rowcount
+
+    # --- 메모리 LRU ---
+
+    def _stamp(self, namespace):
+        """
+        이름공간의 현재 버전. STAMP_CHECK_INTERVAL 안에는 마지막으로 확인한 값을 사용합니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._stamps.get(namespace)
+        if cached is not None and now - cached[1] < self._stamp_interval:
+            return cached[0]
+        version = self._read_stamp(namespace)
+        with self._lock:
+            self._stamps[namespace] = (version, now)
+        return version
+
+    def _remember(self, key, blob, expires, namespace, version):
+        with self._lock:
+            self._local[key] = (blob, expires, namespace, version)
+            self._local.move_to_end(key)
+            while len(self._local) > self._local_max:
+                self._local.popitem(last=False)
+
+    def _forget(self, key):
+        with self._lock:
+            self._local.pop(key, None)
+
+    # --- Django 캐시 API ---
+
+    def get(self, key, default=None, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        namespace = namespace_of(key)
+        stamp = self._stamp(namespace)
+        now = time.time()
+
+        with self._lock:
+            local = self._local.get(full_key)
+            if local is not None:
+                blob, expires, _, local_stamp = local
+                if local_stamp == stamp and (expires is None or expires > now):
+                    self._local.move_to_end(full_key)
+                    return pickle.loads(blob)
+                del self._local[full_key]
+
+        row = self._db().execute('SELECT value, expires FROM entries WHERE key = ?', (full_key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= now):
+            return default
+        blob = bytes(row[0])
+        self._remember(full_key, blob, row[1], namespace, stamp)
+        return pickle.loads(blob)
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        namespace = namespace_of(key)
+        expires = self.get_backend_timeout(timeout)
+        if expires is not None and expires <= time.time():
+            self.delete(key, version=version)
+            return
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        new_version, _ = self._write([(
+            'INSERT OR REPLACE INTO entries (key, value, expires) VALUES (?, ?, ?)',
+            (full_key, blob, expires),
+        )], namespace)
+        self._remember(full_key, blob, expires, namespace, new_version)
+        self._maybe_cull()
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        namespace = namespace_of(key)
+        expires = self.get_backend_timeout(timeout)
+        blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        new_version, added = self._write([
+            ('DELETE FROM entries WHERE key = ? AND expires IS NOT NULL AND expires <= ?', (full_key, time.time())),
+            ('INSERT OR IGNORE INTO entries (key, value, expires) VALUES (?, ?, ?)', (full_key, blob, expires)),
+        ], namespace)
+        if added:
+            self._remember(full_key, blob, expires, namespace, new_version)
+            self._maybe_cull()
+        return bool(added)
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        expires = self.get_backend_timeout(timeout)
+        _, touched = self._write([
+            ('UPDATE entries SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)',
+             (expires, full_key, time.time())),
+        ], namespace_of(key))
+        self._forget(full_key)
+        return bool(touched)
+
+    def delete(self, key, version=None):
+        full_key = self.make_and_validate_key(key, version=version)
+        _, deleted = self._write([('DELETE FROM entries WHERE key = ?', (full_key,))], namespace_of(key))
+        self._forget(full_key)
+        return bool(deleted)
+
+    def has_key(self, key, version=None):
+        sentinel = object()
+        return self.get(key, sentinel, version=version) is not sentinel
+
+    def clear(self):
+        conn = self._db()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM entries')
+            conn.execute('UPDATE stamps SET version = version + 1')
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        with self._lock:
+            self._local.clear()
+            self._stamps.clear()
+
+    def invalidate(self, namespace):
+        """
+        이름공간의 버전만 올려 모든 워커의 메모리 LRU에서 해당 이름공간을 버리게 합니다. (저장된 값은 유지)
+        """
+        conn = self._db()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._bump(conn, namespace)
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _maybe_cull(self):
+        # 항목 수는 쓰기 CULL_CHECK_INTERVAL번마다 한 번만 셉니다. (쓰기마다 COUNT(*)를 하지 않음)
+        with self._lock:
+            self._writes_since_cull += 1
+            if self._writes_since_cull < self._cull_interval:
+                return
+            self._writes_since_cull = 0
+        self._cull()
+
+    def _cull(self):
+        """
+        MAX_ENTRIES를 넘으면 만료된 항목을 지우고, 그래도 많으면 1/CULL_FREQUENCY를 지웁니다.
+        만료가 가까운 항목부터 지우고, 만료 시간이 없는 항목(버전 키 등)은 가장 나중에 지웁니다.
+        """
+        conn = self._db()
+        count = conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        if count <= self._max_entries:
+            return
+        conn.execute('DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?', (time.time(),))
+        count = conn.execute('SELECT COUNT(*) FROM entries').fetchone()[0]
+        if count > self._max_entries and self._cull_frequency:
+            conn.execute(
+                'DELETE FROM entries WHERE rowid IN ('
+                'SELECT rowid FROM entries ORDER BY expires IS NULL, expires, rowid LIMIT ?)',
+                (max(1, count // self._cull_frequency),),
+            )
+
+    def close(self, **kwargs):
+        # 연결은 스레드마다 계속 재사용합니다. (요청이 끝날 때마다 닫지 않음)
+        pass
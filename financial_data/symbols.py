@@ -0,0 +1,467 @@
+# financial_data/symbols.py
+# 종목 목록 스냅샷 위에 만드는 검색용 인덱스 모듈
+#
+# 자동 완성(search_stock_ticker)은 키를 누를 때마다 호출되므로,
+# 매번 DataFrame 전체에 str.contains를 돌리는 대신 스냅샷당 한 번 만든 인덱스를 사용합니다.
+#   - 정규화한 종목 코드 / 회사 이름을 정렬해 둔 배열 -> 정확히 일치, 접두어 검색 (이진 탐색)
+#   - 2글자, 3글자 n-gram -> 종목 번호 목록 -> 부분 문자열 검색
+# 종목 번호는 스냅샷 순서(KRX -> NASDAQ -> NYSE -> AMEX, 거래소 안에서는 시가총액 순)이므로
+# 번호가 작을수록 우선 순위가 높고, 결과가 limit개 모이면 바로 멈춥니다.
+# 인덱스는 워커마다 하나씩 있으므로 파이썬 객체(list, dict) 대신 numpy 배열 몇 개로만 구성합니다.
+# (n-gram 목록도 정렬한 n-gram 배열 + 구간 오프셋 + 종목 번호 배열, CSR 형태)
+#
+# SymbolResolver는 같은 인덱스로 종목 코드 -> (회사 이름, 거래소, 통화)를 찾고,
+# 검색어(종목 코드, 회사 이름, 한글 별칭, 오타가 섞인 이름)를 종목 하나로 바꿉니다. (네트워크 사용 없음)
+
+import difflib
+import threading
+import unicodedata
+from array import array
+from itertools import repeat
+
+import numpy as np
+from django.conf import settings
+
+from .listings import EXCHANGE_IDS, LISTING_EXCHANGES, get_stock_listings
+
+# 접두어 검색의 상한값으로 쓰는 가장 큰 유니코드 문자
+_MAX_CHAR = '\U0010ffff'
+
+NGRAM_SIZES = (2, 3)
+
+# 거래소별 거래 통화 (StockContent.CURRENCY_CHOICES 값과 같은 표기)
+EXCHANGE_CURRENCIES = {
+    'KRX': '원화',
+    'NASDAQ': '달러',
+    'NYSE': '달러',
+    'AMEX': '달러',
+}
+
+# 'AAPL.US', '005930.KS'처럼 종목 코드 뒤에 붙는 거래소 접미사
+EXCHANGE_SUFFIXES = {
+    'KS': 'KRX',
+    'KQ': 'KRX',
+    'KRX': 'KRX',
+    'US': None,
+    'NASDAQ': 'NASDAQ',
+    'NYSE': 'NYSE',
+    'AMEX': 'AMEX',
+}
+
+
+# 한글 이름 -> 종목 코드 별칭 (FINDATA_SYMBOL_ALIASES 설정으로 추가할 수 있습니다)
+NAME_ALIASES = {
+    '삼성전자': '005930',
+    '애플': 'AAPL',
+    '테슬라': 'TSLA',
+    '아마존': 'AMZN',
+    '엔비디아': 'NVDA',
+    **getattr(settings, 'FINDATA_SYMBOL_ALIASES', {}),
+}
+
+# 비슷한 이름 찾기에서 인정하는 최소 유사도 (0 ~ 1)
+FUZZY_CUTOFF = 0.8
+
+# 비슷한 이름 찾기에서 유사도를 직접 계산해 볼 후보 수
+FUZZY_CANDIDATES = 50
+
+
+def normalize_key(text):
+    """
+    검색 비교용 키를 만듭니다. (전각/반각 통일, 대소문자 무시, 앞뒤 공백 제거)
+    """
+    return unicodedata.normalize('NFKC', str(text)).casefold().strip()
+
+
+def _ngrams(text, size):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def _bisect(keys, value, side='left'):
+    """
+    정렬한 고정폭 문자열 배열에서 value가 들어갈 위치.
+    value가 배열 폭보다 길면 numpy가 배열 전체를 더 넓은 dtype으로 복사하므로, 잘라서 비교합니다.
+    (폭보다 긴 값은 어떤 키와도 같지 않고, 잘라 낸 값과 같은 키보다 뒤에 옵니다.)
+    """
+    width = keys.dtype.itemsize // 4
+    if len(value) <= width:
+        return int(np.searchsorted(keys, value, side=side))
+    return int(np.searchsorted(keys, value[:width], side='right'))
+
+
+class TickerSearchIndex:
+    """
+    종목 코드와 회사 이름에 대한 자동 완성 인덱스.
+    결과 순서: 종목 코드 일치 -> 종목 코드 접두어 -> 회사 이름 접두어 -> 부분 문자열
+    codes, names: 종목 번호 순 배열, exchange_ids: 거래소 번호 배열 (listings.EXCHANGE_IDS)
+    """
+
+    def __init__(self, codes, names, exchange_ids):
+        self.codes = np.asarray(codes, dtype=str)
+        self.names = np.asarray(names, dtype=str)
+        self.exchange_ids = np.asarray(exchange_ids, dtype=np.uint8)
+
+        norm_codes = [normalize_key(code) for code in self.codes.tolist()]
+        norm_names = [normalize_key(name) for name in self.names.tolist()]
+        self._code_keys, self._code_order, self._code_rank = self._sorted_keys(norm_codes)
+        self._name_keys, self._name_order, self._name_rank = self._sorted_keys(norm_names)
+
+        # n-gram마다 임시 번호를 붙여 (n-gram 번호, 종목 번호) 쌍을 모은 뒤 n-gram 순으로 정렬합니다.
+        # (파이썬 int 리스트 대신 array를 써서 만드는 동안의 메모리도 줄입니다.)
+        gram_numbers = {}
+        pairs_gram, pairs_id = array('i'), array('i')
+        for idx, (code, name) in enumerate(zip(norm_codes, norm_names)):
+            row = set()
+            for size in NGRAM_SIZES:
+                row |= _ngrams(code, size) | _ngrams(name, size)
+            pairs_gram.extend(gram_numbers.setdefault(gram, len(gram_numbers)) for gram in row)
+            pairs_id.extend(repeat(idx, len(row)))
+
+        grams = np.array(list(gram_numbers), dtype=str) if gram_numbers else np.array([], dtype='<U1')
+        gram_order = np.argsort(grams, kind='stable')
+        gram_rank = np.empty(len(grams), dtype=np.int32)
+        gram_rank[gram_order] = np.arange(len(grams), dtype=np.int32)
+        pairs_gram = gram_rank[np.frombuffer(pairs_gram, dtype=np.int32)]
+        # 같은 n-gram 안에서는 종목 번호 순입니다. (stable)
+        order = np.argsort(pairs_gram, kind='stable')
+        self._gram_keys = grams[gram_order]
+        self._gram_offsets = np.concatenate([[0], np.cumsum(np.bincount(pairs_gram, minlength=len(grams)))]).astype(np.int64)
+        self._gram_ids = np.frombuffer(pairs_id, dtype=np.int32)[order]
+
+    @classmethod
+    def from_listings(cls, listings):
+        """
+        종목 목록(listings.CompactListings)으로 인덱스를 만듭니다.
+        """
+        return cls(listings.codes, listings.names, listings.exchange_ids)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @staticmethod
+    def _sorted_keys(keys):
+        """
+        (정렬한 키 배열, 정렬 순서 -> 종목 번호, 종목 번호 -> 정렬 순서)
+        """
+        array = np.asarray(keys, dtype=str) if keys else np.array([], dtype='<U1')
+        order = np.argsort(array, kind='stable').astype(np.int32)
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order), dtype=np.int32)
+        return array[order], order, rank
+
+    def norm_code(self, idx):
+        return str(self._code_keys[self._code_rank[idx]])
+
+    def norm_name(self, idx):
+        return str(self._name_keys[self._name_rank[idx]])
+
+    def exchange(self, idx):
+        return LISTING_EXCHANGES[self.exchange_ids[idx]]
+
+    def _exact(self, keys, order, key):
+        lo = _bisect(keys, key, side='left')
+        hi = _bisect(keys, key, side='right')
+        return order[lo:hi]
+
+    def code_ids(self, code):
+        """
+        정규화한 종목 코드가 같은 종목 번호들 (작은 번호부터)
+        """
+        return self._exact(self._code_keys, self._code_order, normalize_key(code))
+
+    def name_ids(self, name):
+        """
+        정규화한 회사 이름이 같은 종목 번호들 (작은 번호부터)
+        """
+        return self._exact(self._name_keys, self._name_order, normalize_key(name))
+
+    def _postings(self, gram):
+        i = _bisect(self._gram_keys, gram)
+        if i >= len(self._gram_keys) or self._gram_keys[i] != gram:
+            return None
+        return self._gram_ids[self._gram_offsets[i]:self._gram_offsets[i + 1]]
+
+    def nbytes(self):
+        """
+        인덱스 배열의 크기(바이트). (codes, names가 스냅샷 mmap이면 그 부분은 워커들이 나눠 씁니다)
+        """
+        return int(sum(
+            array.nbytes for array in (
+                self._code_keys, self._code_order, self._code_rank,
+                self._name_keys, self._name_order, self._name_rank,
+                self._gram_keys, self._gram_offsets, self._gram_ids,
+            )
+        ))
+
+    def _collect(self, candidates, limit, seen, found):
+        """
+        종목 번호(우선 순위) 순으로 후보를 결과에 추가합니다. limit개가 차면 True.
+        """
+        need = limit - len(found) + len(seen)
+        if len(candidates) > need:
+            candidates = np.partition(candidates, need - 1)[:need]
+        for idx in np.sort(candidates):
+            idx = int(idx)
+            if idx not in seen:
+                seen.add(idx)
+                found.append(idx)
+                if len(found) >= limit:
+                    return True
+        return False
+
+    def _prefix_candidates(self, keys, order, query):
+        lo = _bisect(keys, query, side='left')
+        hi = _bisect(keys, query + _MAX_CHAR, side='left')
+        return order[lo:hi]
+
+    def _substring_candidates(self, query):
+        size = min(len(query), max(NGRAM_SIZES))
+        if size < min(NGRAM_SIZES):
+            return np.array([], dtype=np.int32)
+        grams = _ngrams(query, size)
+        lists = [self._postings(gram) for gram in grams]
+        if any(ids is None for ids in lists):
+            return np.array([], dtype=np.int32)
+        lists.sort(key=len)
+        candidates = lists[0]
+        for ids in lists[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+            if not len(candidates):
+                break
+        return candidates
+
+    def search_ids(self, query, limit=20):
+        """
+        검색어에 맞는 종목 번호 목록을 우선 순위대로 최대 limit개 반환합니다.
+        """
+        query = normalize_key(query)
+        if not query or not len(self.codes) or limit <= 0:
+            return []
+
+        found, seen = [], set()
+
+        exact = self._exact(self._code_keys, self._code_order, query)
+        if len(exact):
+            seen.add(int(exact[0]))
+            found.append(int(exact[0]))
+            if len(found) >= limit:
+                return found
+
+        if self._collect(self._prefix_candidates(self._code_keys, self._code_order, query), limit, seen, found):
+            return found
+        if self._collect(self._prefix_candidates(self._name_keys, self._name_order, query), limit, seen, found):
+            return found
+
+        # n-gram 교집합은 후보일 뿐이므로 실제로 부분 문자열인지 확인합니다.
+        for idx in self._substring_candidates(query):
+            idx = int(idx)
+            if idx in seen:
+                continue
+            if query in self.norm_code(idx) or query in self.norm_name(idx):
+                seen.add(idx)
+                found.append(idx)
+                if len(found) >= limit:
+                    break
+        return found
+
+    def closest_name_id(self, query, cutoff=FUZZY_CUTOFF):
+        """
+        회사 이름이 검색어와 가장 비슷한 종목 번호를 반환합니다. 유사도가 cutoff 미만이면 None.
+        n-gram이 많이 겹치는 FUZZY_CANDIDATES개 후보만 유사도를 직접 계산합니다.
+        """
+        query = normalize_key(query)
+        size = min(NGRAM_SIZES)
+        if len(query) < size:
+            return None
+        lists = [self._postings(gram) for gram in _ngrams(query, size)]
+        lists = [ids for ids in lists if ids is not None]
+        if not lists:
+            return None
+
+        ids, overlaps = np.unique(np.concatenate(lists), return_counts=True)
+        if len(ids) > FUZZY_CANDIDATES:
+            ids = ids[np.argpartition(-overlaps, FUZZY_CANDIDATES - 1)[:FUZZY_CANDIDATES]]
+
+        best, best_score = None, cutoff
+        matcher = difflib.SequenceMatcher(b=query, autojunk=False)
+        for idx in np.sort(ids):
+            matcher.set_seq1(self.norm_name(int(idx)))
+            if matcher.real_quick_ratio() < best_score or matcher.quick_ratio() < best_score:
+                continue
+            score = matcher.ratio()
+            if (best is None and score >= best_score) or score > best_score:
+                best, best_score = int(idx), score
+        return best
+
+    def search(self, query, limit=20):
+        """
+        자동 완성(Select2) 응답 형식으로 검색 결과를 반환합니다.
+        """
+        results = []
+        for idx in self.search_ids(query, limit):
+            code, name = str(self.codes[idx]), str(self.names[idx])
+            results.append({'id': code, 'text': f"{name} ({code})"})
+        return results
+
+
+class SymbolResolver:
+    """
+    종목 코드 -> {'code', 'name', 'exchange', 'currency'} 조회. (검색 인덱스의 정렬 배열을 이진 탐색)
+    'KRX:005930', 'NASDAQ:AAPL', '005930.KS', 'AAPL.US' 같은 거래소 표기도 받습니다.
+    find()는 회사 이름, 한글 별칭, 비슷한 이름까지 찾습니다.
+    여러 거래소에 같은 코드가 있으면 스냅샷 순서상 앞선 거래소를 기본으로 사용합니다.
+    """
+
+    def __init__(self, index, aliases=None):
+        self._index = index
+        self._aliases = {
+            normalize_key(alias): str(code).strip().upper()
+            for alias, code in (NAME_ALIASES if aliases is None else aliases).items()
+        }
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, ticker):
+        return self.resolve(ticker) is not None
+
+    def _info(self, idx):
+        exchange = self._index.exchange(idx)
+        return {
+            'code': str(self._index.codes[idx]),
+            'name': str(self._index.names[idx]),
+            'exchange': exchange,
+            'currency': EXCHANGE_CURRENCIES.get(exchange),
+        }
+
+    def resolve(self, ticker):
+        """
+        종목 코드 하나를 조회합니다. 목록에 없으면 None.
+        정렬한 종목 코드 배열을 이진 탐색하므로 종목 수 n에 대해 O(log n)입니다. (dict를 따로 두지 않습니다)
+        """
+        if not ticker:
+            return None
+        key = str(ticker).strip().upper()
+
+        ids = self._index.code_ids(key)
+        if len(ids):
+            return self._info(int(ids[0]))
+
+        # 'KRX:005930' 형태
+        if ':' in key:
+            exchange, _, code = key.partition(':')
+            return self._lookup(exchange, code)
+
+        # '005930.KS', 'AAPL.US' 형태
+        if '.' in key:
+            code, _, suffix = key.rpartition('.')
+            if suffix in EXCHANGE_SUFFIXES:
+                return self._lookup(EXCHANGE_SUFFIXES[suffix], code)
+        return None
+
+    def _lookup(self, exchange, code):
+        if exchange == 'US':
+            exchange = None
+        if exchange is not None and exchange not in EXCHANGE_IDS:
+            return None
+        ids = self._index.code_ids(code)
+        if not len(ids):
+            return None
+        if exchange is None:
+            # 거래소 없이 'AAPL.US'처럼 미국 표기로 찾은 경우, 기본 종목이 KRX면 찾지 못한 것으로 봅니다.
+            idx = int(ids[0])
+            return self._info(idx) if self._index.exchange(idx) != 'KRX' else None
+        matches = ids[self._index.exchange_ids[ids] == EXCHANGE_IDS[exchange]]
+        return self._info(int(matches[0])) if len(matches) else None
+
+    def resolve_many(self, tickers):
+        """
+        여러 종목 코드를 한 번에 조회합니다. {입력 코드: 정보 또는 None}
+        """
+        return {ticker: self.resolve(ticker) for ticker in tickers}
+
+    def company_name(self, ticker, default="이름 없음"):
+        info = self.resolve(ticker)
+        return info['name'] if info is not None else default
+
+    def find(self, query):
+        """
+        검색어를 종목 하나로 바꿉니다. 찾지 못하면 None.
+        반환값은 resolve()와 같은 dict에 어떻게 찾았는지('match')를 더한 것입니다.
+
+        순서: 종목 코드 -> 한글 별칭 -> 회사 이름 (그대로, 대소문자 무시) -> 비슷한 이름
+              -> 목록에 없지만 종목 코드처럼 생긴 검색어 ('BTC/KRW', 'US5Y' 등)
+        소문자로만 된 단어('apple')는 회사 이름으로 먼저 찾습니다.
+        """
+        query = str(query or '').strip()
+        if not query:
+            return None
+        key = normalize_key(query)
+        name_first = query.isalpha() and not query.isupper()
+
+        if not name_first:
+            info = self.resolve(query)
+            if info is not None:
+                return {**info, 'match': 'code'}
+
+        code = self._aliases.get(key)
+        if code is not None:
+            info = self.resolve(code) or {'code': code, 'name': query, 'exchange': None, 'currency': None}
+            return {**info, 'match': 'alias'}
+
+        ids = self._index.name_ids(key)
+        if len(ids):
+            return {**self._info(int(ids[0])), 'match': 'name'}
+
+        if name_first:
+            info = self.resolve(query)
+            if info is not None:
+                return {**info, 'match': 'code'}
+
+        info = self._fuzzy(key)
+        if info is not None:
+            return {**info, 'match': 'fuzzy'}
+
+        # 목록에 없는 암호화폐 거래쌍, 점(.)이 들어간 코드, 숫자 코드, 짧은 대문자 코드
+        if '/' in query or '.' in query or query.isdigit() or (query.isupper() and len(query) < 5):
+            code = query.upper()
+            return {'code': code, 'name': None, 'exchange': None, 'currency': None, 'match': 'pattern'}
+        return None
+
+    def _fuzzy(self, key):
+        idx = self._index.closest_name_id(key)
+        return self._info(idx) if idx is not None else None
+
+
+_search_index = {'listings': None, 'index': None}
+_search_index_lock = threading.Lock()
+
+
+def get_search_index():
+    """
+    현재 종목 목록 스냅샷에 대한 검색 인덱스를 반환합니다.
+    스냅샷이 바뀌었을 때만 다시 만듭니다.
+    """
+    listings = get_stock_listings()
+    if _search_index['listings'] is not listings:
+        with _search_index_lock:
+            if _search_index['listings'] is not listings:
+                _search_index['index'] = TickerSearchIndex.from_listings(listings)
+                _search_index['listings'] = listings
+    return _search_index['index']
+
+
+_symbol_resolver = {'index': None, 'resolver': None}
+
+
+def get_symbol_resolver():
+    """
+    현재 종목 목록 스냅샷에 대한 SymbolResolver를 반환합니다.
+    """
+    index = get_search_index()
+    if _symbol_resolver['index'] is not index:
+        with _search_index_lock:
+            if _symbol_resolver['index'] is not index:
+                _symbol_resolver['resolver'] = SymbolResolver(index)
+                _symbol_resolver['index'] = index
+    return _symbol_resolver['resolver']
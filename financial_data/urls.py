@@ -1,6 +1,8 @@
 from django.urls import path
 from .views import my_stock_holdings, add_stock_holding, add_stock_account, search_data, search_stock_ticker, add_stock_holding_new
-from .views import geoguessr_game, refresh_stock_cache
+from .views import geoguessr_game, refresh_stock_cache, portfolio_history, portfolio_history_data, price_history_data
+from .views import portfolio_risk, portfolio_risk_data, import_stock_holdings
+from .async_views import my_stock_holdings_async, search_data_async, search_stock_ticker_async
 
 app_name = 'financial_data'
 
@@ -8,9 +10,19 @@ urlpatterns = [
     path('', my_stock_holdings, name='my_stock_holdings'),
     path('add/', add_stock_holding, name='add_stock_holding'),
     path('add_holding_new/', add_stock_holding_new, name='add_stock_holding_new'),
+    path('import/', import_stock_holdings, name='import_stock_holdings'),
     path('add_stock_account/', add_stock_account, name='add_stock_account'),
     path('search/', search_data, name='search_data'),
     path("geoguessr/", geoguessr_game, name='geoguessr_game'),
     path('search_ticker/', search_stock_ticker, name='search_stock_ticker'),
     path('refresh-cache/', refresh_stock_cache, name='refresh_stock_cache'),
+    path('history/', portfolio_history, name='portfolio_history'),
+    path('history/data/', portfolio_history_data, name='portfolio_history_data'),
+    path('risk/', portfolio_risk, name='portfolio_risk'),
+    path('risk/data/', portfolio_risk_data, name='portfolio_risk_data'),
+    path('prices/', price_history_data, name='price_history_data'),
+    # 비동기(ASGI) 버전
+    path('async/', my_stock_holdings_async, name='my_stock_holdings_async'),
+    path('async/search/', search_data_async, name='search_data_async'),
+    path('async/search_ticker/', search_stock_ticker_async, name='search_stock_ticker_async'),
 ]
\ No newline at end of file
@@ -1,98 +1,53 @@
-import FinanceDataReader as fdr
 from django.shortcuts import render,redirect
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse
 from django.db.models import Q # 검색을 위해 Q 객체를 import 합니다.
-from .forms import StockHoldingForm, StockAccountForm, SearchForm
+from .forms import StockHoldingForm, StockAccountForm, SearchForm, PortfolioHistoryForm, PortfolioRiskForm, PriceHistoryForm
+from .forms import HoldingsImportForm
+from .holdings_import import IMPORT_MAX_ROWS, ImportFileError, import_holdings, read_holdings_file
 from manage_account.models import StockContent, StockAccount
 from django.db.models import Sum, F
 from django.contrib import messages
 from django.db import IntegrityError
-import math
 import random
-import pandas as pd
-from concurrent.futures import ThreadPoolExecutor
-from django.core.cache import cache
-
-# 전역 변수로 종목 리스트 캐시.
-# 서버가 시작될 때 데이터를 한 번만 로드하여 효율성을 높입니다.
-# 오류 방지를 위해 try-except 블록을 사용합니다.
-def load_stock_listings():
-    # 캐시에서 'stock_listings' 데이터를 가져옵니다.
-    listings = cache.get('stock_listings')
-    if listings:
-        print("종목 목록을 캐시에서 로드했습니다.")
-        return listings
-        
-    print("종목 목록을 API에서 로드합니다.")
-    listings = {}
-    try:
-        listings['KRX'] = fdr.StockListing('KRX')
-    except Exception as e:
-        print(f"KRX 종목 목록 로드 중 오류 발생: {e}")
-        listings['KRX'] = pd.DataFrame()
-    # ... (기존 NASDAQ, NYSE, AMEX 로직 동일) ...
-    try:
-        listings['NASDAQ'] = fdr.StockListing('NASDAQ')
-    except Exception as e:
-        print(f"NASDAQ 종목 목록 로드 중 오류 발생: {e}")
-        listings['NASDAQ'] = pd.DataFrame()
+from datetime import date, timedelta
+from . import analytics, fx, io_pool, market, price_store
+from .quotes import quote_cache
+from .portfolio import (
+    ensure_coverage, holding_rows, holdings_queryset, load_holdings, nav_history, value_holdings,
+)
 
-    try:
-        listings['NYSE'] = fdr.StockListing('NYSE')
-    except Exception as e:
-        print(f"NYSE 종목 목록 로드 중 오류 발생: {e}")
-        listings['NYSE'] = pd.DataFrame()
-
-    try:
-        listings['AMEX'] = fdr.StockListing('AMEX')
-        print("AMEX 종목 목록을 성공적으로 로드했습니다.")
-    except Exception as e:
-        print(f"AMEX 종목 목록 로드 중 오류 발생: {e}")
-        listings['AMEX'] = pd.DataFrame()
-
-    # 캐시에 저장합니다. (예: 1일 = 86400초)
-    # 캐시는 서버 재시작 시 초기화됩니다.
-    cache.set('stock_listings', listings, 60*60*24)
-    return listings
-
-STOCK_LISTINGS = load_stock_listings()
+# 종목 목록은 디스크 스냅샷에서 읽습니다. (import 시점에 네트워크 호출 없음)
+# 스냅샷 갱신: python manage.py refresh_stock_listings
+from .listings import reload_stock_listings
+from .symbols import get_search_index, get_symbol_resolver
 
 
 def get_company_name(ticker_code):
     """
-    주어진 종목 코드에 해당하는 회사 이름을 캐시된 데이터에서 빠르게 조회합니다.
+    주어진 종목 코드에 해당하는 회사 이름을 검색 인덱스의 정렬한 종목 코드 배열에서 이진 탐색으로 조회합니다.
     """
-    # 한국 주식 (KRX)에서 먼저 찾기
-    kor_stocks = STOCK_LISTINGS.get('KRX')
-    if not kor_stocks.empty and 'Code' in kor_stocks.columns:
-        matched_kor = kor_stocks[kor_stocks['Code'] == ticker_code]
-        if not matched_kor.empty and 'Name' in matched_kor.columns:
-            return matched_kor['Name'].iloc[0]
-
-    # 미국 주식 (NASDAQ, NYSE, AMEX)에서 찾기
-    for exchange in ['NASDAQ', 'NYSE', 'AMEX']:
-        stocks = STOCK_LISTINGS.get(exchange)
-        if not stocks.empty and 'Symbol' in stocks.columns:
-            matched_stock = stocks[stocks['Symbol'] == ticker_code]
-            if not matched_stock.empty and 'Name' in matched_stock.columns:
-                return matched_stock['Name'].iloc[0]
-
-    return "이름 없음"
-
-# 병렬 처리를 위한 헬퍼 함수
-def fetch_stock_data(ticker):
+    return get_symbol_resolver().company_name(ticker_code)
+
+def build_holdings_context(holdings, price_data):
     """
-    단일 종목 코드로 주식 데이터를 가져오는 함수.
+    보유 종목 DataFrame(portfolio.load_holdings)과 {종목 코드: 최신 시세}로 보유 현황 템플릿 context를 만듭니다.
+    (동기 뷰와 비동기 뷰가 함께 사용합니다.)
     """
-    try:
-        df = fdr.DataReader(ticker)
-        if not df.empty:
-            return ticker, df.iloc[-1]
-    except Exception as e:
-        print(f"Error fetching data for {ticker}: {e}")
-    return ticker, None
+    # 평가금액, 수익률, 통화별 합계를 한 번에 계산합니다.
+    positions, total_by_currency = value_holdings(holdings, price_data)
+
+    # 회사 이름도 종목 코드별로 한 번에 조회합니다.
+    symbol_info = get_symbol_resolver().resolve_many(set(holdings['ticker_code']))
+    names = {ticker: info['name'] for ticker, info in symbol_info.items() if info}
+
+    return {
+        'holdings': holding_rows(positions, names),
+        'total_by_currency': total_by_currency,
+        # 전체 보유 종목을 원화로 환산한 합계 (환율이 아직 없으면 None)
+        'krw_total': fx.consolidate_totals(total_by_currency),
+    }
 
 @login_required
 def my_stock_holdings(request):
@@ -101,77 +56,18 @@ def my_stock_holdings(request):
     """
     user = request.user
     
-    stock_accounts = StockAccount.objects.filter(st_user_id=user)
-    
-    # 사용자가 보유한 모든 종목을 가져옵니다.
-    holdings = StockContent.objects.filter(st_id__in=stock_accounts).select_related('st_id')
-    
-    holding_data_with_prices = []
-    total_by_currency = {
-        '원화': {'purchase_amount': 0, 'current_value': 0, 'profit_loss': 0, 'profit_rate': 0},
-        '달러': {'purchase_amount': 0, 'current_value': 0, 'profit_loss': 0, 'profit_rate': 0},
-    }
+    # 사용자가 보유한 모든 종목을 컬럼 단위로 한 번에 가져옵니다.
+    holdings = load_holdings(holdings_queryset(user))
 
     # 보유 종목의 고유한 종목 코드 목록을 생성합니다.
-    unique_tickers = list(holdings.values_list('ticker_code', flat=True).distinct())
+    unique_tickers = holdings['ticker_code'].unique().tolist()
 
-    # 병렬 처리를 사용하여 모든 종목 데이터를 동시에 가져옵니다.
-    # 최대 워커 수를 10으로 설정하여 동시에 10개의 API 호출을 처리합니다.
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        # map 함수는 각 ticker에 대해 fetch_stock_data 함수를 병렬로 실행합니다.
-        # 결과는 제출된 순서대로 반환됩니다.
-        price_data = list(executor.map(fetch_stock_data, unique_tickers))
-
-    # 가져온 가격 데이터를 딕셔너리 형태로 변환하여 빠른 조회를 가능하게 합니다.
-    price_dict = {ticker: data for ticker, data in price_data if data is not None}
-    
-    # 각 보유 종목에 대해 가격 데이터를 합칩니다.
-    for holding in holdings:
-        ticker = holding.ticker_code
-        currency = holding.currency
-        company_name = get_company_name(ticker)
-        
-        latest_price = None
-        total_value = None
-        profit_rate = None
-        
-        if ticker in price_dict:
-            latest_price_series = price_dict[ticker]
-            latest_price = latest_price_series.get('Close')
-            
-            if latest_price is not None and not math.isnan(latest_price):
-                total_value = latest_price * holding.share
-                total_purchase_amount = holding.pur_amount * holding.share
-                
-                profit_rate = 0
-                if total_purchase_amount != 0:
-                    profit_rate = ((total_value - total_purchase_amount) / total_purchase_amount) * 100
-
-                if currency in total_by_currency:
-                    total_by_currency[currency]['purchase_amount'] += total_purchase_amount
-                    total_by_currency[currency]['current_value'] += total_value
-
-        holding_data_with_prices.append({
-            'account_info': holding.st_id,
-            'ticker_code': ticker,
-            'company_name': company_name,
-            'share': holding.share,
-            'purchase_amount': holding.pur_amount,
-            'currency': currency,
-            'current_price': round(latest_price, 2) if latest_price is not None else 'N/A',
-            'total_value': round(total_value, 2) if total_value is not None else 'N/A',
-            'profit_rate': round(profit_rate, 2) if profit_rate is not None else 'N/A'
-        })
-    
-    for currency, totals in total_by_currency.items():
-        if totals['purchase_amount'] != 0:
-            totals['profit_loss'] = totals['current_value'] - totals['purchase_amount']
-            totals['profit_rate'] = (totals['profit_loss'] / totals['purchase_amount']) * 100
+    # 공유 시세 캐시에서 모든 종목의 최신 시세를 가져옵니다.
+    # 캐시에 없는 종목만 병렬로 받아 오고, 다른 요청이 이미 받고 있는 종목은 그 결과를 함께 씁니다.
+    # 제한 시간(FINDATA_IO_TIMEOUT) 안에 받지 못한 종목은 'N/A'로 표시됩니다.
+    price_data = quote_cache.get_many(unique_tickers)
 
-    context = {
-        'holdings': holding_data_with_prices,
-        'total_by_currency': total_by_currency,
-    }
+    context = build_holdings_context(holdings, price_data)
     return render(request, 'financial_data/stock_holdings.html', context)
 
 @login_required
@@ -250,32 +146,40 @@ def add_stock_account(request):
     }
     return render(request, 'financial_data/add_stock_account.html', context)
 
+def resolve_search_query(query):
+    """
+    검색어(회사 이름, 한글 별칭, 종목 코드)를 종목 코드로 바꿉니다. 찾지 못하면 None.
+    종목 목록 스냅샷으로 만든 SymbolResolver에서 찾으므로 네트워크를 사용하지 않습니다.
+    """
+    symbol = get_symbol_resolver().find(query)
+    return symbol['code'] if symbol else None
+
+
+def load_search_history(ticker, start_date=None, end_date=None):
+    """
+    검색 결과로 보여줄 기간 시세를 가져옵니다. (최신 날짜가 위로 오도록 정렬)
+    시작일과 종료일이 유효하면 해당 기간으로 검색, 아니면 최근 5일만 검색합니다.
+    로컬 시세 저장소에서 읽고, 모자란 기간만 새로 받습니다. 데이터가 없으면 ValueError.
+    """
+    if start_date and end_date:
+        df = price_store.history(ticker, start=start_date, end=end_date)
+    else:
+        df = price_store.history(ticker, start=date.today() - timedelta(days=30))
+        df = df.tail(5)
+    if df.empty:
+        raise ValueError("시세 데이터 없음")
+
+    # 검색 결과를 날짜 기준으로 내림차순 정렬
+    return df.sort_index(ascending=False)
+
+
 def search_data(request):
     form = SearchForm(request.GET or None)
     results = None
     query = None
     
-    # 캐시에서 'market_data'를 먼저 가져옵니다.
-    market_data = cache.get('market_data')
-    if not market_data:
-        # 캐시가 없으면 API를 호출하여 데이터를 가져옵니다.
-        market_data_tickers = ['KS11', 'IXIC', 'US10YT', 'USD/KRW', 'EUR/KRW']
-        market_data = []
-
-        for ticker in market_data_tickers:
-            try:
-                df = fdr.DataReader(ticker)
-                if not df.empty and 'Close' in df.columns:
-                    latest_price = df.iloc[-1]['Close']
-                    market_data.append({
-                        'name': ticker,
-                        'price': f'{latest_price:,.2f}'
-                    })
-            except Exception as e:
-                print(f"Error fetching data for {ticker}: {e}")
-                continue
-        # 데이터를 캐시에 저장합니다. (예: 10분 = 600초)
-        cache.set('market_data', market_data, 600)
+    # 주요 지표는 마지막 스냅샷을 바로 보여주고, 오래되었으면 백그라운드에서 새로 받습니다.
+    market_overview = market.get_overview()
 
     if form.is_valid():
         query = form.cleaned_data.get('query')
@@ -284,66 +188,12 @@ def search_data(request):
 
         if query:
             original_query = query
-            found_ticker = None
-            
-            # 한글-영문 회사 이름 매핑
-            name_to_ticker_mapping = {
-                '삼성전자': '005930',
-                '애플': 'AAPL',
-                '테슬라': 'TSLA',
-                '아마존': 'AMZN',
-                '엔비디아': 'NVDA',
-            }
-            
-            # 매핑 딕셔너리에서 먼저 검색 (소문자로 변환하여 검색)
-            if query.lower() in [name.lower() for name in name_to_ticker_mapping.keys()]:
-                # 딕셔너리에서 검색어와 일치하는 키를 찾아서 종목 코드를 가져옴
-                for name, ticker in name_to_ticker_mapping.items():
-                    if query.lower() == name.lower():
-                        found_ticker = ticker
-                        break
-            
-            # 매핑에 없으면 기존 로직대로 검색
-            if not found_ticker:
-                # 검색할 거래소 목록
-                exchange_list = ['KRX', 'NASDAQ', 'NYSE', 'AMEX']
-                
-                # 사용자가 입력한 검색어가 암호화폐 거래쌍인지 또는 점(.)이 포함된 종목 코드인지 확인
-                if '/' in query or '.' in query:
-                    found_ticker = query.upper()
-                # 사용자가 입력한 검색어가 주식 종목 코드인지 확인
-                elif query.isdigit() or (query.isupper() and len(query) < 5):
-                    found_ticker = query.upper()
-                else:
-                    # 종목 코드가 아니면 회사 이름으로 검색
-                    for exchange in exchange_list:
-                        try:
-                            stock_list = fdr.StockListing(exchange)
-                            # 대소문자 구분 없이 회사 이름 검색
-                            matched_stock = stock_list[stock_list['Name'].str.lower() == query.lower()]
-                            if not matched_stock.empty:
-                                try:
-                                    found_ticker = matched_stock.iloc[0]['Symbol']
-                                except KeyError:
-                                    found_ticker = matched_stock.iloc[0]['Code']
-                                break  # 종목을 찾았으면 루프 종료
-                        except Exception as e:
-                            print(f"Error fetching stock list for {exchange}: {e}")
-                            continue
+            found_ticker = resolve_search_query(query)
             
             if found_ticker:
                 query = found_ticker
                 try:
-                    # 시작일과 종료일이 유효하면 해당 기간으로 검색, 아니면 최근 5일만 검색
-                    if start_date and end_date:
-                        df = fdr.DataReader(query, start=start_date, end=end_date)
-                    else:
-                        df = fdr.DataReader(query)
-                        df = df.tail(5)
-
-                    # 검색 결과를 날짜 기준으로 내림차순 정렬
-                    df = df.sort_index(ascending=False)
-
+                    df = io_pool.call(load_search_history, query, start_date, end_date)
                     results = df.to_html(classes='table table-striped table-hover', border=0)
                 except Exception as e:
                     messages.error(request, f"'{original_query}'에 대한 데이터를 찾을 수 없습니다. 올바른 검색어를 입력해주세요.")
@@ -356,16 +206,20 @@ def search_data(request):
         'form': form,
         'results': results,
         'query': query,
-        'market_data': market_data,
+        'market_data': market_overview['items'],
+        'market_data_updated_at': market_overview['updated_at'],
     }
     return render(request, 'financial_data/search.html', context)
 
 def refresh_stock_cache(request):
     """
-    주요 지수 및 종목 목록 캐시를 수동으로 삭제하는 뷰
+    주요 지표를 백그라운드에서 새로 받고 종목 목록 스냅샷을 다시 읽는 뷰
+    (종목 목록 자체의 다운로드는 refresh_stock_listings 명령이 담당합니다.)
     """
-    cache.delete('stock_listings')
-    cache.delete('market_data')
+    # 새 스냅샷 버전과 시세 캐시 세대를 공용 캐시에 기록하므로 모든 워커에 반영됩니다.
+    reload_stock_listings(publish=True)
+    quote_cache.invalidate_all()
+    market.schedule_refresh()
     messages.success(request, '데이터가 성공적으로 갱신되었습니다.')
     return redirect('financial_data:search_data')
 
@@ -417,37 +271,10 @@ def search_stock_ticker(request):
     results = []
 
     if query:
-        # FinanceDataReader를 사용하여 종목 목록 캐시를 가져옵니다.
-        kor_stocks = STOCK_LISTINGS.get('KRX')
-        us_stocks = pd.concat([STOCK_LISTINGS.get('NASDAQ'), STOCK_LISTINGS.get('NYSE'), STOCK_LISTINGS.get('AMEX')])
-
-        # 한글 또는 영문 검색어에 따라 필터링
-        # 한국 주식 검색 (Code와 Name을 모두 검사)
-        if not kor_stocks.empty:
-            matched_kor = kor_stocks[
-                kor_stocks['Code'].str.contains(query, case=False, na=False) |
-                kor_stocks['Name'].str.contains(query, case=False, na=False)
-            ]
-            for _, row in matched_kor.iterrows():
-                results.append({
-                    'id': row['Code'],
-                    'text': f"{row['Name']} ({row['Code']})"
-                })
-
-        # 미국 주식 검색 (Symbol과 Name을 모두 검사)
-        if not us_stocks.empty:
-            matched_us = us_stocks[
-                us_stocks['Symbol'].str.contains(query, case=False, na=False) |
-                us_stocks['Name'].str.contains(query, case=False, na=False)
-            ]
-            for _, row in matched_us.iterrows():
-                results.append({
-                    'id': row['Symbol'],
-                    'text': f"{row['Name']} ({row['Symbol']})"
-                })
-        
-    # 결과 개수 제한
-    return JsonResponse({'results': results[:20]}, safe=False)
+        # 스냅샷마다 한 번 만들어 둔 검색 인덱스에서 상위 20개만 찾습니다.
+        results = get_search_index().search(query, limit=20)
+
+    return JsonResponse({'results': results}, safe=False)
 
 @login_required
 def add_stock_holding_new(request):
@@ -499,4 +326,164 @@ def add_stock_holding_new(request):
     }
     return render(request, 'financial_data/add_holding_new.html', context) # 이 부분을 수정
 
-# 여기까지가 자동완성 기능 
\ No newline at end of file
+# 여기까지가 자동완성 기능 
+
+
+@login_required
+def import_stock_holdings(request):
+    """
+    CSV / XLSX 파일로 보유 종목을 한 번에 등록하는 뷰 (줄별 오류를 함께 보여 줍니다)
+    """
+    user = request.user
+    if not StockAccount.objects.filter(st_user_id=user).exists():
+        messages.error(request, '주식 계좌가 없어 보유 종목을 추가할 수 없습니다. 먼저 계좌를 등록해주세요.')
+        return redirect('financial_data:add_stock_account')
+
+    result = None
+    if request.method == 'POST':
+        form = HoldingsImportForm(request.POST, request.FILES, user=user)
+        if form.is_valid():
+            try:
+                frame = read_holdings_file(form.cleaned_data['file'])
+            except ImportFileError as e:
+                form.add_error('file', str(e))
+            else:
+                result = import_holdings(
+                    user,
+                    frame,
+                    default_account=form.cleaned_data.get('account'),
+                    skip_invalid=form.cleaned_data.get('skip_invalid', False),
+                )
+                if result['saved'] and not result['errors']:
+                    messages.success(request, f"{result['imported_rows']}개 종목이 성공적으로 추가되었습니다.")
+                    return redirect('financial_data:my_stock_holdings')
+    else:
+        form = HoldingsImportForm(user=user)
+
+    context = {
+        'form': form,
+        'result': result,
+        'max_rows': IMPORT_MAX_ROWS,
+    }
+    return render(request, 'financial_data/import_holdings.html', context)
+
+def portfolio_history_result(user, account=None, start_date=None, end_date=None):
+    """
+    보유 종목의 일별 원화 평가액(NAV)과 수익률을 계산해 JSON으로 보낼 수 있는 dict로 반환합니다.
+    로컬 시세 저장소의 종가를 쓰고, 기간 앞부분이 없는 종목만 새로 받습니다.
+    """
+    queryset = holdings_queryset(user)
+    if account is not None:
+        queryset = queryset.filter(st_id=account)
+    holdings = load_holdings(queryset)
+    if holdings.empty:
+        return {'dates': [], 'nav': [], 'daily_return': [], 'cumulative_return': [], 'missing': [], 'missing_fx': []}
+
+    ensure_coverage(holdings['ticker_code'].unique(), holdings['currency'].unique(), start_date)
+    history, missing, missing_fx = nav_history(holdings, start_date, end_date)
+    history = history.round({'nav': 0, 'daily_return': 4, 'cumulative_return': 4})
+    history = history.astype(object).where(history.notna(), None)
+    return {
+        'dates': history.index.strftime('%Y-%m-%d').tolist(),
+        'nav': history['nav'].tolist(),
+        'daily_return': history['daily_return'].tolist(),
+        'cumulative_return': history['cumulative_return'].tolist(),
+        'missing': missing,
+        'missing_fx': missing_fx,
+    }
+
+
+@login_required
+def portfolio_history(request):
+    """
+    보유 종목의 기간별 원화 평가액(NAV) 추이 화면 (데이터는 portfolio_history_data에서 받아 옵니다)
+    """
+    form = PortfolioHistoryForm(request.GET or None, user=request.user)
+    return render(request, 'financial_data/portfolio_history.html', {'form': form})
+
+
+@login_required
+def portfolio_history_data(request):
+    """
+    보유 종목의 일별 원화 평가액(NAV)과 일간/누적 수익률(%)을 JSON으로 반환하는 뷰
+    """
+    form = PortfolioHistoryForm(request.GET, user=request.user)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    result = portfolio_history_result(
+        request.user,
+        account=form.cleaned_data.get('account'),
+        start_date=form.cleaned_data['start_date'],
+        end_date=form.cleaned_data['end_date'],
+    )
+    return JsonResponse(result)
+
+
+
+@login_required
+def portfolio_risk(request):
+    """
+    보유 종목 위험 지표 화면 (변동성, 최대 낙폭, 베타, 상관계수, 데이터는 portfolio_risk_data에서 받아 옵니다)
+    """
+    form = PortfolioRiskForm(request.GET or None, user=request.user)
+    return render(request, 'financial_data/portfolio_risk.html', {'form': form, 'benchmarks': analytics.BENCHMARKS})
+
+
+@login_required
+def portfolio_risk_data(request):
+    """
+    보유 종목 위험 지표를 JSON으로 반환하는 뷰 (같은 보유 현황, 기준일, 기간이면 캐시된 결과)
+    """
+    form = PortfolioRiskForm(request.GET, user=request.user)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    queryset = holdings_queryset(request.user)
+    if form.cleaned_data.get('account') is not None:
+        queryset = queryset.filter(st_id=form.cleaned_data['account'])
+    holdings = load_holdings(queryset)
+    if holdings.empty:
+        return JsonResponse({'errors': {'__all__': ["보유 종목이 없습니다."]}}, status=404)
+
+    result = analytics.portfolio_risk(
+        request.user, holdings, as_of=form.cleaned_data['as_of'], days=form.cleaned_data['days'],
+    )
+    resolver = get_symbol_resolver()
+    for row in result['tickers']:
+        row['name'] = resolver.company_name(row['ticker'])
+    return JsonResponse(result)
+
+def price_history_data(request):
+    """
+    종목의 기간 시세를 JSON으로 반환하는 뷰 (차트용)
+    주기(일/주/월) 집계, 컬럼 선택, 최대 개수(넘으면 묶어서 집계)를 지원합니다.
+    응답: {'ticker', 'interval', 'dates': [...], 'data': {컬럼: [...]}}
+    """
+    form = PriceHistoryForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+
+    query = form.cleaned_data['ticker']
+    ticker = resolve_search_query(query)
+    if not ticker:
+        return JsonResponse({'errors': {'ticker': [f"'{query}'에 대한 종목 코드를 찾을 수 없습니다."]}}, status=404)
+
+    try:
+        # 로컬 시세 저장소에서 읽고, 모자란 기간만 새로 받습니다.
+        df = io_pool.call(price_store.history, ticker, form.cleaned_data['start_date'], form.cleaned_data['end_date'])
+    except Exception as e:
+        print(f"Error fetching data for {ticker}: {e}")
+        return JsonResponse({'errors': {'ticker': [f"'{ticker}' 시세를 가져오지 못했습니다."]}}, status=503)
+
+    df = price_store.resample(df, form.cleaned_data['interval'])
+    df = price_store.downsample(df, form.cleaned_data['max_points'])
+    df = df[form.cleaned_data['columns']].round(4)
+    df = df.astype(object).where(df.notna(), None)
+
+    return JsonResponse({
+        'ticker': ticker,
+        'interval': form.cleaned_data['interval'],
+        'dates': df.index.strftime('%Y-%m-%d').tolist(),
+        'data': {column: df[column].tolist() for column in df.columns},
+    })
@@ -1,5 +1,7 @@
 from django.core.management.base import BaseCommand
+from django.db import transaction
 from manage_account.models import TransactionCash
+from account_book import balances, rollup
 
 class Command(BaseCommand):
     help = 'Changes cash_user_id from 6 to 1 for all TransactionCash records.'
@@ -12,8 +14,18 @@ class Command(BaseCommand):
         count = records_to_update.count()
 
         if count > 0:
-            # Update cash_user_id to 1
-            records_to_update.update(cash_user_id=1)
+            with transaction.atomic():
+                # 옮기기 전 두 사용자의 시작 잔액과, 옮기는 거래가 있던 위치를 기억해 둡니다.
+                openings = balances.capture_openings('cash', [6, 1])
+                moved_ids = list(records_to_update.values_list('pk', flat=True))
+                old_starts = balances.suffix_starts('cash', records_to_update)
+                # Update cash_user_id to 1
+                records_to_update.update(cash_user_id=1)
+                # queryset.update는 저장 시그널을 보내지 않으므로 월별 카테고리 합계를 다시 만들고,
+                # 두 사용자의 잔액을 옮긴 위치 뒤쪽부터 다시 계산합니다.
+                rollup.rebuild()
+                new_starts = balances.suffix_starts('cash', TransactionCash.objects.filter(pk__in=moved_ids))
+                balances.repropagate_all('cash', balances.merge_starts(old_starts, new_starts), openings)
             self.stdout.write(self.style.SUCCESS(f'Successfully changed {count} TransactionCash records from user_id 6 to 1.'))
         else:
             self.stdout.write(self.style.WARNING('No TransactionCash records found with user_id 6.'))
@@ -3,7 +3,9 @@ from datetime import datetime, timedelta
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 import pytz
+from django.db import transaction
 from manage_account.models import TransactionCash, AccountBookCategory, User
+from account_book import balances, rollup
 
 class Command(BaseCommand):
     help = 'Populates TransactionCash model with dummy data'
@@ -84,6 +86,13 @@ class Command(BaseCommand):
             )
         
         # Bulk create for efficiency
-        TransactionCash.objects.bulk_create(transactions_to_create)
+        # bulk_create는 저장 시그널을 보내지 않으므로 월별 카테고리 합계에 직접 반영하고,
+        # 날짜가 무작위라 위에서 목록 순서로 쌓은 잔액이 맞지 않으므로 넣은 위치 뒤쪽 잔액을 다시 계산합니다.
+        with transaction.atomic():
+            openings = balances.capture_openings('cash', [user.pk])
+            TransactionCash.objects.bulk_create(transactions_to_create)
+            rollup.record_objects('cash', transactions_to_create)
+            created = TransactionCash.objects.filter(pk__in=[obj.pk for obj in transactions_to_create])
+            balances.repropagate_all('cash', balances.suffix_starts('cash', created), openings)
 
         self.stdout.write(self.style.SUCCESS(f'Successfully populated 500 TransactionCash records.'))
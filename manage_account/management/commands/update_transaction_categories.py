@@ -1,6 +1,7 @@
 import random
 from django.core.management.base import BaseCommand
 from manage_account.models import TransactionAccount, AccountBookCategory
+from account_book import rollup
 from django.db import transaction
 
 class Command(BaseCommand):
@@ -50,6 +51,8 @@ class Command(BaseCommand):
         if transactions_to_update:
             self.stdout.write(f'Updating {len(transactions_to_update)} transactions in the database...')
             TransactionAccount.objects.bulk_update(transactions_to_update, ['txn_cat'])
+            # bulk_update는 저장 시그널을 보내지 않으므로 월별 카테고리 합계를 다시 만듭니다.
+            rollup.rebuild()
             self.stdout.write(self.style.SUCCESS(f'--- Successfully updated categories for {len(transactions_to_update)} transactions. ---'))
         else:
             self.stdout.write(self.style.WARNING('--- No transactions needed an update. ---'))
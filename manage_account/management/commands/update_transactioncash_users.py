@@ -1,7 +1,9 @@
 import random
 from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
 from manage_account.models import TransactionCash
 from acc_auth.models import User
+from account_book import balances, rollup
 
 class Command(BaseCommand):
     help = 'Updates cash_user for all TransactionCash records to a random valid user ID.'
@@ -36,8 +38,18 @@ class Command(BaseCommand):
                 updated_transactions.append(transaction)
 
         if updated_transactions:
-            # Use bulk_update for efficiency
-            TransactionCash.objects.bulk_update(updated_transactions, ['cash_user'])
+            with db_transaction.atomic():
+                # 옮기기 전 관련된 사용자들의 시작 잔액과, 옮기는 거래가 있던 위치를 기억해 둡니다.
+                moved = TransactionCash.objects.filter(pk__in=[t.pk for t in updated_transactions])
+                old_starts = balances.suffix_starts('cash', moved)
+                openings = balances.capture_openings('cash', set(old_starts) | set(valid_user_ids))
+                # Use bulk_update for efficiency
+                TransactionCash.objects.bulk_update(updated_transactions, ['cash_user'])
+                # bulk_update는 저장 시그널을 보내지 않으므로 월별 카테고리 합계를 다시 만들고,
+                # 거래가 빠지거나 들어간 사용자마다 그 위치 뒤쪽 잔액을 다시 계산합니다.
+                rollup.rebuild()
+                new_starts = balances.suffix_starts('cash', moved)
+                balances.repropagate_all('cash', balances.merge_starts(old_starts, new_starts), openings)
             self.stdout.write(self.style.SUCCESS(f'Successfully updated {len(updated_transactions)} TransactionCash records.'))
         else:
             self.stdout.write(self.style.WARNING('No TransactionCash records needed updating.'))
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.5 on 2026-10-18 14:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('manage_account', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='transactionaccount',
+            index=models.Index(fields=['my_acc', 'txn_date', 'id'], name='txn_account_balance_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='transactioncash',
+            index=models.Index(fields=['cash_user', 'use_date', 'id'], name='txn_cash_balance_idx'),
+        ),
+    ]
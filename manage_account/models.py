@@ -187,6 +187,10 @@ class TransactionAccount(models.Model):
         verbose_name = "계좌거래내역"
         verbose_name_plural = "계좌거래내역 목록"
         ordering = ['-txn_date']
+        indexes = [
+            # 계좌별 (날짜, id) 순서 조회: 잔액 다시 계산(account_book/balances.py), 최신 잔액
+            models.Index(fields=['my_acc', 'txn_date', 'id'], name='txn_account_balance_idx'),
+        ]
 
 
 class TransactionCash(models.Model):
@@ -230,3 +234,7 @@ class TransactionCash(models.Model):
         verbose_name = "현금거래내역"
         verbose_name_plural = "현금거래내역 목록"
         ordering = ['-use_date']
+        indexes = [
+            # 사용자별 (날짜, id) 순서 조회: 잔액 다시 계산(account_book/balances.py)
+            models.Index(fields=['cash_user', 'use_date', 'id'], name='txn_cash_balance_idx'),
+        ]